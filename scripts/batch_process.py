@@ -0,0 +1,302 @@
+"""AI processing of the articles not processed yet.
+
+Usage:
+    python scripts/batch_process.py [--chunk-size N] [--workers N] [--queue-size N] [--limit N]
+
+The articles flow through three stages connected by bounded queues, so that a
+slow stage holds back the ones before it instead of filling the memory:
+
+1. read: articles with `is_processed = false` are read by chunks of
+   `--chunk-size`, with keyset pagination on `id`; the text of each chunk is
+   handed to a pool of `--workers` processes for cleaning, which also
+   computes the word count, reading time and language of each article;
+2. infer: summaries go through the shared `SummarizationServer` (the texts of
+   a chunk are submitted together so that it batches them) and entities
+   through `NERExtractor.extract_batch`. Near-duplicates are processed once,
+   with the text of their canonical article, and results are cached by
+   content hash. Both models read their token ids from the token store when
+   it is enabled, so a rerun over the same texts does not tokenize them.
+   Each article then gets its embedding (title, summary and content) when
+   `EMBEDDINGS_ENABLED` is set;
+3. write: one transaction per chunk replaces the `Summary` and `Entity` rows
+   of its articles, stores `cleaned_content`, `word_count`, `reading_time`
+   and `language`, sets `is_processed` and
+   updates the daily digests and trends (see `services/trend_service.py`); the
+   embeddings are then added to the semantic search index and the cached API
+   responses are invalidated.
+
+A chunk is committed at once, so after a crash the next run resumes with the
+articles that were not flipped.
+"""
+
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Engine, bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import aliased
+
+from aiwatcher.ai_models.model_manager import get_model_manager
+from aiwatcher.ai_models.summarizer import get_summarization_server
+from aiwatcher.core.config import settings
+from aiwatcher.database.connection import get_engine
+from aiwatcher.database.models import Article, Entity, Summary
+from aiwatcher.preprocessing.text_cleaner import CleanedText, preprocess_texts
+from aiwatcher.preprocessing.tokenizer import get_token_store
+from aiwatcher.services.cache_service import get_inference_cache, invalidate_responses, model_cache_key
+from aiwatcher.services.embedding_service import embedding_text, encode, get_embedding_index
+from aiwatcher.services.trend_service import TrendAggregator
+
+logger = logging.getLogger(__name__)
+
+Canonical = aliased(Article)
+CLEANED_COLUMNS = ('cleaned_content', 'word_count', 'reading_time', 'language')
+
+
+@dataclass
+class Chunk:
+    """Articles processed together, and the results of each stage."""
+    rows: List[Dict[str, Any]]
+    cleaning: List[Tuple[List[int], Future]] = field(default_factory=list)
+    # Texte nettoyé par id d'article (y compris les articles canoniques)
+    cleaned: Dict[int, CleanedText] = field(default_factory=dict)
+    # Résultats par empreinte du texte source
+    summaries: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    entities: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    # Plongements, dans l'ordre de `rows`
+    embeddings: Optional[np.ndarray] = None
+
+
+def read_chunks(engine: Engine, chunk_size: int, limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the unprocessed articles by chunks, in id order."""
+    last_id, read = 0, 0
+    while limit is None or read < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - read)
+        stmt = (
+            select(
+                Article.id,
+                Article.title,
+                Article.raw_content,
+                func.coalesce(Article.canonical_id, Article.id).label('source_id'),
+                func.coalesce(Canonical.raw_content, Article.raw_content).label('source_content'),
+                func.coalesce(Canonical.content_hash, Article.content_hash).label('source_hash'),
+            )
+            .outerjoin(Canonical, Canonical.id == Article.canonical_id)
+            .where(Article.is_processed.is_(False), Article.id > last_id)
+            .order_by(Article.id)
+            .limit(size)
+        )
+        with engine.connect() as conn:
+            rows = [dict(row._mapping) for row in conn.execute(stmt)]
+        if not rows:
+            return
+        last_id = rows[-1]['id']
+        read += len(rows)
+        yield rows
+
+
+def start_cleaning(pool: ProcessPoolExecutor, chunk: Chunk, workers: int):
+    """Split the texts of a chunk over the process pool."""
+    texts = {row['id']: row['raw_content'] for row in chunk.rows}
+    for row in chunk.rows:
+        texts.setdefault(row['source_id'], row['source_content'])
+    ids = list(texts)
+    step = max(1, -(-len(ids) // workers))
+    for start in range(0, len(ids), step):
+        part = ids[start:start + step]
+        chunk.cleaning.append((part, pool.submit(preprocess_texts, [texts[i] for i in part])))
+
+
+def summarize_text(text: str) -> Dict[str, Any]:
+    *_, final = get_summarization_server().summarize_chunked(text, get_token_store())
+    return final['summary']
+
+
+def infer(chunk: Chunk, summarize_pool: ThreadPoolExecutor) -> Chunk:
+    """Clean, summarize and extract the entities of the source texts of a chunk."""
+    for ids, future in chunk.cleaning:
+        chunk.cleaned.update(zip(ids, future.result()))
+
+    sources = {}
+    for row in chunk.rows:
+        text = chunk.cleaned[row['source_id']].cleaned_content
+        if text:
+            sources.setdefault(row['source_hash'], text)
+    if not sources:
+        return chunk
+
+    cache = get_inference_cache()
+    hashes = list(sources)
+    summaries = summarize_pool.map(
+        lambda content_hash: cache.get_or_compute(
+            model_cache_key('summarizer', content_hash),
+            lambda: summarize_text(sources[content_hash]),
+        ),
+        hashes,
+    )
+
+    # Entités : les textes absents du cache passent en un seul lot
+    missing = []
+    for content_hash in hashes:
+        cached = cache.get(model_cache_key('ner', content_hash))
+        if cached is None:
+            missing.append(content_hash)
+        else:
+            chunk.entities[content_hash] = cached
+    if missing:
+        extractor = get_model_manager().get('ner')
+        results = extractor.extract_batch([sources[content_hash] for content_hash in missing], store=get_token_store())
+        for content_hash, entities in zip(missing, results):
+            chunk.entities[content_hash] = [entity.to_dict() for entity in entities]
+            cache.set(model_cache_key('ner', content_hash), chunk.entities[content_hash])
+
+    chunk.summaries = dict(zip(hashes, summaries))
+    if settings.EMBEDDINGS_ENABLED:
+        chunk.embeddings = encode([
+            embedding_text(
+                row['title'],
+                chunk.summaries.get(row['source_hash'], {}).get('medium_summary'),
+                chunk.cleaned[row['source_id']].cleaned_content,
+            )
+            for row in chunk.rows
+        ])
+    return chunk
+
+
+def write(engine: Engine, chunk: Chunk, aggregator: Optional[TrendAggregator] = None) -> int:
+    """Store the results of a chunk and mark its articles as processed."""
+    ids = [row['id'] for row in chunk.rows]
+    summary_rows, entity_rows = [], []
+    for row in chunk.rows:
+        summary = chunk.summaries.get(row['source_hash'])
+        if summary is not None:
+            summary_rows.append({'article_id': row['id'], **summary})
+        # Les positions ne valent que pour le texte de l'article canonique
+        same_text = row['source_id'] == row['id']
+        for entity in chunk.entities.get(row['source_hash'], ()):
+            entity_rows.append({
+                **entity,
+                'article_id': row['id'],
+                'entity_text': entity['entity_text'][:255],
+                'entity_type': entity['entity_type'][:50],
+                'position_start': entity['position_start'] if same_text else None,
+                'position_end': entity['position_end'] if same_text else None,
+                'sentence_index': entity['sentence_index'] if same_text else None,
+            })
+
+    aggregator = aggregator or TrendAggregator()
+    with engine.begin() as conn:
+        changes = aggregator.remove(conn, ids)
+        conn.execute(delete(Summary).where(Summary.article_id.in_(ids)))
+        conn.execute(delete(Entity).where(Entity.article_id.in_(ids)))
+        if summary_rows:
+            conn.execute(insert(Summary), summary_rows)
+        if entity_rows:
+            conn.execute(insert(Entity), entity_rows)
+        conn.execute(
+            update(Article)
+            .where(Article.id == bindparam('article_id'))
+            # Les paramètres ne peuvent pas porter le nom des colonnes mises à jour
+            .values(is_processed=True, **{name: bindparam(f'new_{name}') for name in CLEANED_COLUMNS}),
+            [
+                {'article_id': row['id'], **{f'new_{name}': value for name, value in chunk.cleaned[row['id']].columns().items()}}
+                for row in chunk.rows
+            ],
+        )
+        aggregator.refresh(conn, aggregator.add(conn, ids, changes))
+    if chunk.embeddings is not None:
+        get_embedding_index().add(ids, chunk.embeddings)
+    invalidate_responses()
+    return len(ids)
+
+
+def run_stage(target, inbox: queue.Queue, outbox: queue.Queue):
+    """Apply `target` to every chunk of `inbox`; a failed chunk is logged and left unprocessed."""
+    while True:
+        chunk = inbox.get()
+        if chunk is None:
+            outbox.put(None)
+            return
+        try:
+            outbox.put(target(chunk))
+        except Exception:
+            logger.exception("Chunk starting at article %s failed", chunk.rows[0]['id'])
+
+
+def process(
+    engine: Optional[Engine] = None,
+    chunk_size: int = 128,
+    workers: Optional[int] = None,
+    queue_size: int = 4,
+    limit: Optional[int] = None,
+) -> int:
+    """Process the unprocessed articles and return how many were processed."""
+    engine = engine or get_engine()
+    workers = workers or os.cpu_count() or 1
+    to_infer: queue.Queue = queue.Queue(maxsize=queue_size)
+    to_write: queue.Queue = queue.Queue(maxsize=queue_size)
+    processed = 0
+
+    server = get_summarization_server().start()
+    with ProcessPoolExecutor(max_workers=workers) as clean_pool, \
+            ThreadPoolExecutor(max_workers=2 * server.max_batch_size) as summarize_pool:
+
+        def read():
+            try:
+                for rows in read_chunks(engine, chunk_size, limit):
+                    chunk = Chunk(rows)
+                    start_cleaning(clean_pool, chunk, workers)
+                    to_infer.put(chunk)
+            finally:
+                to_infer.put(None)
+
+        threads = [
+            threading.Thread(target=read, name='batch-read', daemon=True),
+            threading.Thread(
+                target=run_stage, args=(lambda chunk: infer(chunk, summarize_pool), to_infer, to_write),
+                name='batch-infer', daemon=True,
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+
+        while True:
+            chunk = to_write.get()
+            if chunk is None:
+                break
+            try:
+                processed += write(engine, chunk)
+            except Exception:
+                logger.exception("Writing the chunk starting at article %s failed", chunk.rows[0]['id'])
+                continue
+            logger.info("Processed %d articles", processed)
+
+        for thread in threads:
+            thread.join()
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunk-size', type=int, default=128, help="articles read and written together")
+    parser.add_argument('--workers', type=int, default=None, help="cleaning processes (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=4, help="chunks buffered between two stages")
+    parser.add_argument('--limit', type=int, default=None, help="stop after this many articles")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    start = time.perf_counter()
+    count = process(chunk_size=args.chunk_size, workers=args.workers, queue_size=args.queue_size, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} articles in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.1f} articles/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,569 @@
+"""Performance benchmarks for AIWatcher.
+
+Usage:
+    python scripts/benchmark.py extraction [--pages DIR] [--repeat N]
+    python scripts/benchmark.py spiders [--fixtures DIR] [--repeat N]
+    python scripts/benchmark.py models [--texts N] [--summarizer-batch-sizes 1,4,8] [--ner-batch-sizes 1,8,16,32]
+    python scripts/benchmark.py database [--rows N] [--batch-sizes 100,500,1000] [--database-url URL]
+    python scripts/benchmark.py api [--requests N] [--concurrency N] [--url URL]
+    python scripts/benchmark.py all
+    python scripts/benchmark.py record [--fixtures DIR] [--articles N]
+
+Every benchmark command also takes `--output FILE`, `--baseline FILE`,
+`--tolerance T` and `--update-baseline`.
+
+- `extraction` compares the throughput (pages/second) of the shared lxml
+  extractor of `preprocessing/text_cleaner.py` with the former
+  `BeautifulSoup(html, 'html.parser').get_text()` path. Pages are read from
+  the `.html` files of `--pages`, or generated when no directory is given.
+- `spiders` runs the `parse()` method of each spider on its recorded listing
+  pages (`<fixtures>/<config_key>/*.html`) and its `parse_article()` on the
+  recorded article pages (`<fixtures>/<config_key>/articles/*.html`, or
+  generated pages when there are none). The fixtures in `tests/fixtures/pages`
+  reproduce the markup each spider reads, with the scripts, navigation and
+  footer of a real page; `record` replaces them with pages downloaded from the
+  live sites, following the links the spiders themselves extract.
+- `models` measures the input tokens/second of the summarizer and the NER
+  model for several batch sizes, with the models of `model_configs.json`.
+- `database` upserts generated articles through `ArticleWriter` (near-
+  duplicate detection and full-text index included) and reports rows/second,
+  for new rows and for rows that did not change. It uses a throwaway SQLite
+  database unless `--database-url` points to a scratch database, whose
+  tables are created if needed and whose articles are deleted.
+- `api` serves the app with uvicorn on a local port, over a seeded SQLite
+  database, and sends `--requests` requests to each read endpoint from
+  `--concurrency` threads; it reports the p50 and p99 latency and the
+  requests/second. Repeated URLs are answered by the response cache, as in
+  production; the article details cycle over every article. `--url` targets an
+  already running server instead.
+
+Metrics are named `<benchmark>.<case>.<measure>`. `--output` writes them as
+JSON, with the machine and the commit they were measured on. `--baseline`
+compares them with a stored result and exits with status 1 when a metric is
+more than `--tolerance` (15% by default) worse; `--update-baseline` then
+stores the new values in the baseline file. Only compare results measured on
+the same machine: `--baseline` alone uses `tests/fixtures/benchmark_baseline.json`,
+which holds the `extraction`, `spiders` and `database` results of a reference
+machine and warns when run elsewhere. The `models` and `api` results depend on
+the downloaded models and the server setup and are not part of it.
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+
+from aiwatcher.core.article import Article
+from aiwatcher.core.config import settings
+from aiwatcher.preprocessing.text_cleaner import extract_main_text
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'pages')
+DEFAULT_BASELINE = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'benchmark_baseline.json'))
+# Unités pour lesquelles une valeur plus faible est meilleure
+LOWER_IS_BETTER = ('ms',)
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def metric(value: float, unit: str) -> Dict[str, Any]:
+    return {'value': round(value, 3), 'unit': unit, 'higher_is_better': unit not in LOWER_IS_BETTER}
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(',') if size.strip()]
+
+
+def synthetic_pages(count: int = 50, paragraphs: int = 40) -> List[str]:
+    """Build article-like pages with navigation, sidebar and footer boilerplate."""
+    nav = '<nav><ul>' + ''.join(f'<li><a href="/s{i}">Section {i}</a></li>' for i in range(30)) + '</ul></nav>'
+    aside = '<aside>' + ''.join(f'<p>Related article {i}</p>' for i in range(10)) + '</aside>'
+    footer = '<footer>' + ''.join(f'<a href="/l{i}">Legal {i}</a>' for i in range(20)) + '</footer>'
+    pages = []
+    for n in range(count):
+        body = ''.join(
+            f'<p>Paragraph {i} of article {n} about <a href="/m">language models</a> and '
+            f'their evaluation on reasoning benchmarks.</p>'
+            for i in range(paragraphs)
+        )
+        pages.append(
+            f'<html><head><title>Article {n}</title><script>var x = {n};</script>'
+            f'<style>p {{ margin: 0 }}</style></head><body>{nav}'
+            f'<div class="content"><h1>Article {n}</h1>{body}</div>{aside}{footer}</body></html>'
+        )
+    return pages
+
+
+def synthetic_articles(count: int, words: int = 400, prefix: str = 'bench') -> List[Article]:
+    """Build distinct articles, so that none of them is a near-duplicate of another."""
+    vocabulary = (
+        'model training data benchmark reasoning language vision agent policy reward '
+        'transformer attention token dataset evaluation robot safety alignment inference'
+    ).split()
+    articles = []
+    for n in range(count):
+        content = ' '.join(vocabulary[(n * 7 + i * (n % 13 + 1)) % len(vocabulary)] + str((n * i) % 997) for i in range(words))
+        articles.append(Article(
+            title=f'Benchmark article {n}',
+            link=f'https://example.org/{prefix}/{n}',
+            date=datetime(2024, 1, 1 + n % 28),
+            source='benchmark',
+            content=content,
+            keywords=['benchmark'],
+        ))
+    return articles
+
+
+def load_pages(directory: str) -> List[str]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    return pages
+
+
+def pages_per_second(extract: Callable[[str], Any], pages: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract(page)
+    return repeat * len(pages) / (time.perf_counter() - start)
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def bench_extraction(pages: List[str], repeat: int) -> Metrics:
+    """Return the pages/second of each extraction path."""
+    results = {
+        'beautifulsoup': pages_per_second(
+            lambda html: BeautifulSoup(html, 'html.parser').get_text(separator=' ', strip=True),
+            pages, repeat),
+        'lxml_main_text': pages_per_second(extract_main_text, pages, repeat),
+    }
+    sizes = {
+        'beautifulsoup': sum(len(BeautifulSoup(p, 'html.parser').get_text(separator=' ', strip=True)) for p in pages),
+        'lxml_main_text': sum(len(extract_main_text(p)) for p in pages),
+    }
+    for name, rate in results.items():
+        print(f"{name:>16}: {rate:8.1f} pages/s, {sizes[name] / len(pages):8.0f} chars/page")
+    print(f"{'speedup':>16}: {results['lxml_main_text'] / results['beautifulsoup']:8.2f}x")
+    return {f'extraction.{name}.pages_per_s': metric(rate, 'pages/s') for name, rate in results.items()}
+
+
+def bench_spiders(fixtures: str, repeat: int) -> Metrics:
+    """Return the listing and article pages/second of each spider."""
+    from scrapy import Request
+    from scrapy.http import HtmlResponse
+    from aiwatcher.scraper.get_articles import SCRAPERS
+
+    # Seul l'analyse des pages est mesurée, pas l'index des pages déjà vues
+    settings.CRAWL_INCREMENTAL = False
+    generated = [page.encode('utf-8') for page in synthetic_pages(20)]
+    results: Metrics = {}
+    for spider_class in SCRAPERS:
+        key = spider_class.config_key
+        spider = spider_class(max_articles=10 ** 9)
+        base_url = spider_class.start_urls[0]
+
+        listings = [page.encode('utf-8') for page in load_pages(os.path.join(fixtures, key))]
+        if listings:
+            outputs = 0
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for body in listings:
+                    # Limites remises à zéro : chaque passage analyse toute la page
+                    spider.scraped_articles = spider.pending_articles = 0
+                    # Une réponse neuve par passage : l'analyse du HTML fait partie de la mesure
+                    response = HtmlResponse(url=base_url, body=body, encoding='utf-8')
+                    outputs += sum(1 for output in spider.parse(response) if output is not None)
+            elapsed = time.perf_counter() - start
+            results[f'spiders.{key}.listing_pages_per_s'] = metric(repeat * len(listings) / elapsed, 'pages/s')
+            print(f"{key:>18}: {repeat * len(listings) / elapsed:8.1f} listing pages/s, "
+                  f"{outputs / (repeat * len(listings)):6.1f} links/page")
+        else:
+            print(f"{key:>18}: no recorded listing page (run `benchmark.py record`)")
+
+        articles = [page.encode('utf-8') for page in load_pages(os.path.join(fixtures, key, 'articles'))] or generated
+        spider.scraped_articles = spider.pending_articles = 0
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for n, body in enumerate(articles):
+                url = f'{base_url.rstrip("/")}/article-{n}'
+                request = Request(url, meta={'seen_url': url})
+                response = HtmlResponse(url=url, body=body, encoding='utf-8', request=request)
+                article = {'title': f'Article {n}', 'link': url, 'date': None, 'source': spider.source}
+                for _item in spider.parse_article(response, article=article):
+                    pass
+        elapsed = time.perf_counter() - start
+        results[f'spiders.{key}.article_pages_per_s'] = metric(repeat * len(articles) / elapsed, 'pages/s')
+        print(f"{key:>18}: {repeat * len(articles) / elapsed:8.1f} article pages/s"
+              f"{'' if articles is not generated else ' (generated pages)'}")
+    return results
+
+
+def record_fixtures(fixtures: str, articles: int, timeout: float):
+    """Download the listing page of each spider and the first article pages it links to."""
+    import requests
+    from scrapy import Request
+    from scrapy.http import HtmlResponse
+    from aiwatcher.scraper.get_articles import SCRAPERS
+
+    settings.CRAWL_INCREMENTAL = False
+    for spider_class in SCRAPERS:
+        key = spider_class.config_key
+        spider = spider_class(max_articles=articles)
+        headers = {'User-Agent': (spider_class.custom_settings or {}).get('USER_AGENT', 'Mozilla/5.0')}
+        directory = os.path.join(fixtures, key)
+        os.makedirs(os.path.join(directory, 'articles'), exist_ok=True)
+        try:
+            page = requests.get(spider_class.start_urls[0], headers=headers, timeout=timeout)
+            page.raise_for_status()
+        except Exception as e:
+            print(f"{key:>18}: could not fetch the listing page ({e})")
+            continue
+        with open(os.path.join(directory, 'listing.html'), 'wb') as f:
+            f.write(page.content)
+
+        response = HtmlResponse(url=page.url, body=page.content, encoding=page.encoding or 'utf-8')
+        links = [output.url for output in spider.parse(response) if isinstance(output, Request)][:articles]
+        saved = 0
+        for n, url in enumerate(links):
+            try:
+                article = requests.get(url, headers=headers, timeout=timeout)
+                article.raise_for_status()
+            except Exception as e:
+                print(f"{key:>18}: could not fetch {url} ({e})")
+                continue
+            with open(os.path.join(directory, 'articles', f'{n:03d}.html'), 'wb') as f:
+                f.write(article.content)
+            saved += 1
+        print(f"{key:>18}: recorded the listing page and {saved} article pages")
+
+
+def bench_models(count: int, summarizer_batch_sizes: Sequence[int], ner_batch_sizes: Sequence[int]) -> Metrics:
+    """Return the input tokens/second of the summarizer and the NER model for each batch size."""
+    from aiwatcher.ai_models.model_manager import get_model_manager
+    from aiwatcher.preprocessing.tokenizer import encode_texts
+
+    texts = [extract_main_text(page) for page in synthetic_pages(count)]
+    manager = get_model_manager()
+    results: Metrics = {}
+
+    summarizer = manager.get('summarizer')
+    inputs = [summarizer.chunk(text)[0] for text in texts]
+    tokens = sum(len(ids) for ids in inputs)
+    summarizer.summarize_ids(inputs[:1])
+    for batch_size in summarizer_batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(inputs), batch_size):
+            summarizer.summarize_ids(inputs[i:i + batch_size])
+        rate = tokens / (time.perf_counter() - start)
+        results[f'models.summarizer.batch_{batch_size}.tokens_per_s'] = metric(rate, 'tokens/s')
+        print(f"summarizer batch {batch_size:>3}: {rate:10.1f} tokens/s")
+
+    extractor = manager.get('ner')
+    tokens = sum(len(encoding) for encoding in encode_texts(extractor.tokenizer, texts, None))
+    extractor.extract_batch(texts[:1])
+    configured = extractor.batch_size
+    try:
+        for batch_size in ner_batch_sizes:
+            extractor.batch_size = batch_size
+            start = time.perf_counter()
+            extractor.extract_batch(texts)
+            rate = tokens / (time.perf_counter() - start)
+            results[f'models.ner.batch_{batch_size}.tokens_per_s'] = metric(rate, 'tokens/s')
+            print(f"       ner batch {batch_size:>3}: {rate:10.1f} tokens/s")
+    finally:
+        extractor.batch_size = configured
+    return results
+
+
+def create_database(url: str):
+    from sqlalchemy import delete
+    from aiwatcher.database.connection import build_engine
+    from aiwatcher.database.models import Article as ArticleRow, Base
+    from aiwatcher.database.search import create_search_index
+
+    engine = build_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        create_search_index(conn)
+        conn.execute(delete(ArticleRow))
+    return engine
+
+
+def bench_database(rows: int, batch_sizes: Sequence[int], url: Optional[str] = None) -> Metrics:
+    """Return the rows/second of `ArticleWriter` for new and unchanged articles."""
+    from aiwatcher.services.article_service import ArticleWriter
+
+    directory = tempfile.mkdtemp(prefix='aiwatcher-bench-')
+    results: Metrics = {}
+    try:
+        for batch_size in batch_sizes:
+            engine = create_database(url or f'sqlite:///{os.path.join(directory, f"batch-{batch_size}.db")}')
+            articles = synthetic_articles(rows, prefix=f'batch-{batch_size}')
+            for case in ('insert', 'unchanged'):
+                writer = ArticleWriter(engine, batch_size=batch_size, flush_interval=float('inf'))
+                start = time.perf_counter()
+                writer.add_many(articles)
+                writer.flush()
+                rate = rows / (time.perf_counter() - start)
+                results[f'database.{case}.batch_{batch_size}.rows_per_s'] = metric(rate, 'rows/s')
+                print(f"{case:>9} batch {batch_size:>5}: {rate:10.1f} rows/s")
+            engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+API_ENDPOINTS = {
+    'health': '/health/live',
+    'articles_list': '/articles?limit=50',
+    'article_detail': '/articles/{id}',
+    'search': '/articles/search?q=language+model',
+    'digests': '/digests',
+    'trends': '/trends',
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_api(rows: int, directory: str):
+    """Start the API with uvicorn in a thread, over a seeded SQLite database."""
+    import uvicorn
+    from aiwatcher.database import connection
+    from aiwatcher.services.article_service import ArticleWriter
+
+    url = f'sqlite:///{os.path.join(directory, "api.db")}'
+    with ArticleWriter(create_database(url)) as writer:
+        writer.add_many(synthetic_articles(rows, prefix='api'))
+    settings.DATABASE_URL = url
+    connection.get_engine.cache_clear()
+    connection.get_sessionmaker.cache_clear()
+
+    from aiwatcher.api.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='bench-api', daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("The API server did not start")
+        time.sleep(0.05)
+    return server, thread, f'http://127.0.0.1:{port}'
+
+
+def load(base_url: str, path: str, requests: int, concurrency: int, ids: Sequence[int]) -> Dict[str, float]:
+    """Send `requests` GET requests from `concurrency` threads and return the latency stats."""
+    import httpx
+
+    latencies: List[float] = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            local = []
+            for n in iter(lambda: next(counter, None), None):
+                url = path.format(id=ids[n % len(ids)])
+                start = time.perf_counter()
+                response = client.get(url)
+                local.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+            with lock:
+                latencies.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"{len(errors)} requests to {path} failed (status {errors[0]})")
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'requests_per_s': len(latencies) / elapsed,
+    }
+
+
+def bench_api(requests: int, concurrency: int, rows: int, url: Optional[str] = None) -> Metrics:
+    """Return the p50/p99 latency and the requests/second of each read endpoint."""
+    directory = tempfile.mkdtemp(prefix='aiwatcher-bench-')
+    server = thread = None
+    results: Metrics = {}
+    try:
+        if url is None:
+            server, thread, url = serve_api(rows, directory)
+        ids = list(range(1, rows + 1))
+        for name, path in API_ENDPOINTS.items():
+            # Échauffement : connexions, caches et premières requêtes SQL
+            load(url, path, min(requests, 2 * concurrency), concurrency, ids)
+            stats = load(url, path, requests, concurrency, ids)
+            results[f'api.{name}.p50_ms'] = metric(stats['p50_ms'], 'ms')
+            results[f'api.{name}.p99_ms'] = metric(stats['p99_ms'], 'ms')
+            results[f'api.{name}.requests_per_s'] = metric(stats['requests_per_s'], 'requests/s')
+            print(f"{name:>15}: p50 {stats['p50_ms']:7.2f} ms, p99 {stats['p99_ms']:7.2f} ms, "
+                  f"{stats['requests_per_s']:8.1f} requests/s")
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join()
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def machine() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(metrics: Metrics, baseline: Metrics, tolerance: float) -> List[str]:
+    """Print the change of every metric against the baseline and return the regressed ones."""
+    regressions = []
+    for name, current in sorted(metrics.items()):
+        reference = baseline.get(name)
+        if reference is None or not reference['value']:
+            print(f"{name:<50} {'':>12} {current['value']:>12.2f} {'new':>9}")
+            continue
+        change = (current['value'] - reference['value']) / reference['value']
+        worse = -change if current['higher_is_better'] else change
+        flag = ''
+        if worse > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<50} {reference['value']:>12.2f} {current['value']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', help='write the results to this JSON file')
+    common.add_argument('--baseline', nargs='?', const=DEFAULT_BASELINE,
+                        help='compare the results with this JSON file (default: tests/fixtures/benchmark_baseline.json)')
+    common.add_argument('--tolerance', type=float, default=0.15, help='allowed relative regression (default 0.15)')
+    common.add_argument('--update-baseline', action='store_true', help='store the results in the --baseline file')
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extraction = subparsers.add_parser('extraction', parents=[common], help='HTML-to-text extraction throughput')
+    extraction.add_argument('--pages', help='directory of recorded .html pages')
+    extraction.add_argument('--repeat', type=int, default=3)
+
+    spiders = subparsers.add_parser('spiders', parents=[common], help='spider parse throughput on recorded pages')
+    spiders.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='directory of recorded pages, one folder per spider')
+    spiders.add_argument('--repeat', type=int, default=3)
+
+    models = subparsers.add_parser('models', parents=[common], help='summarizer and NER tokens/s')
+    models.add_argument('--texts', type=int, default=8, help='texts per batch-size run')
+    models.add_argument('--summarizer-batch-sizes', type=parse_sizes, default=[1, 4, 8])
+    models.add_argument('--ner-batch-sizes', type=parse_sizes, default=[1, 8, 16, 32])
+
+    database = subparsers.add_parser('database', parents=[common], help='ArticleWriter bulk upsert rows/s')
+    database.add_argument('--rows', type=int, default=2000)
+    database.add_argument('--batch-sizes', type=parse_sizes, default=[100, 500, 1000])
+    database.add_argument('--database-url', help='scratch database (default: a temporary SQLite file)')
+
+    api = subparsers.add_parser('api', parents=[common], help='API latency under a local load generator')
+    api.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    api.add_argument('--concurrency', type=int, default=8)
+    api.add_argument('--rows', type=int, default=1000, help='articles in the seeded database')
+    api.add_argument('--url', help='benchmark this running server instead of starting one')
+
+    subparsers.add_parser('all', parents=[common], help='every benchmark, with the default options')
+
+    record = subparsers.add_parser('record', help='download the spider fixtures from the live sites')
+    record.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    record.add_argument('--articles', type=int, default=5, help='article pages per spider')
+    record.add_argument('--timeout', type=float, default=30)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record_fixtures(args.fixtures, args.articles, args.timeout)
+        return 0
+
+    benchmarks = {
+        'extraction': lambda: bench_extraction(
+            load_pages(args.pages) if getattr(args, 'pages', None) else synthetic_pages(), getattr(args, 'repeat', 3)),
+        'spiders': lambda: bench_spiders(getattr(args, 'fixtures', DEFAULT_FIXTURES), getattr(args, 'repeat', 3)),
+        'models': lambda: bench_models(
+            getattr(args, 'texts', 8),
+            getattr(args, 'summarizer_batch_sizes', [1, 4, 8]),
+            getattr(args, 'ner_batch_sizes', [1, 8, 16, 32]),
+        ),
+        'database': lambda: bench_database(
+            getattr(args, 'rows', 2000), getattr(args, 'batch_sizes', [100, 500, 1000]), getattr(args, 'database_url', None)),
+        'api': lambda: bench_api(
+            getattr(args, 'requests', 500), getattr(args, 'concurrency', 8), getattr(args, 'rows', 1000), getattr(args, 'url', None)),
+    }
+    metrics: Metrics = {}
+    for name in benchmarks if args.command == 'all' else [args.command]:
+        print(f"== {name}")
+        metrics.update(benchmarks[name]())
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'machine': machine(), 'metrics': metrics}, f, indent=2, sort_keys=True)
+
+    regressions: List[str] = []
+    if args.baseline:
+        stored: Metrics = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            stored = baseline['metrics']
+            print(f"== compared with {args.baseline} (tolerance {args.tolerance:.0%})")
+            reference, current = baseline.get('machine', {}), machine()
+            if any(reference.get(key) != current[key] for key in ('platform', 'cpu_count')):
+                print(f"Warning: the baseline was measured on {reference.get('platform')} with "
+                      f"{reference.get('cpu_count')} CPUs; update it on this machine before relying on it")
+            regressions = compare(metrics, stored, args.tolerance)
+        if args.update_baseline:
+            os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+            with open(args.baseline, 'w', encoding='utf-8') as f:
+                json.dump({'machine': machine(), 'metrics': {**stored, **metrics}}, f, indent=2, sort_keys=True)
+            print(f"Baseline {args.baseline} updated")
+        elif regressions:
+            print(f"{len(regressions)} metrics regressed: {', '.join(regressions)}")
+    return 1 if regressions and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Sentence embeddings of articles and queries.
+
+`Embedder` runs a sentence-transformers encoder (loaded with `transformers`,
+without the `sentence-transformers` package) on CPU. Texts are tokenized
+together, sorted by length and run in padded batches of `batch_size`; the
+token states are mean-pooled over the attention mask and L2-normalized, so
+that the dot product of two embeddings is their cosine similarity.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+import numpy as np
+from aiwatcher.ai_models.model_manager import get_model_config, load_backend, load_tokenizer, loaded_model
+
+
+class Embedder:
+    """Encoder producing one normalized vector per text."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, model=None, tokenizer=None):
+        self.config = config or get_model_config('embedder')
+        self.model_name = self.config['model_name']
+        self.model_version = self.config.get('model_version')
+        self.max_tokens = self.config.get('max_tokens', 256)
+        self.batch_size = self.config.get('batch_size', 32)
+        self.backend = self.config.get('backend', 'torch')
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def load(self) -> "Embedder":
+        """Load the tokenizer and the model on CPU with the configured backend, once."""
+        if self.model is None:
+            self.tokenizer, self.model, self.backend = load_backend(self.config, 'feature-extraction', self.tokenizer)
+        return self
+
+    def load_tokenizer(self):
+        """Load the tokenizer alone, once."""
+        if self.tokenizer is None:
+            self.tokenizer = load_tokenizer(self.config)
+        return self.tokenizer
+
+    def unload(self):
+        # Le tokenizer est léger et reste chargé
+        self.model = None
+
+    @property
+    def dim(self) -> int:
+        return loaded_model('embedder', self)[0].config.hidden_size
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a `(len(texts), dim)` float32 matrix of unit vectors."""
+        import torch
+
+        model, tokenizer = loaded_model('embedder', self)
+        vectors = np.zeros((len(texts), model.config.hidden_size), dtype=np.float32)
+        if not texts:
+            return vectors
+
+        ids = tokenizer(list(texts), truncation=True, max_length=self.max_tokens)['input_ids']
+        order = sorted(range(len(ids)), key=lambda i: len(ids[i]))
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                inputs = tokenizer.pad({'input_ids': [ids[i] for i in batch]}, return_tensors='pt')
+                states = model(**inputs).last_hidden_state
+                mask = inputs['attention_mask'].unsqueeze(-1).to(states.dtype)
+                pooled = (states * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                pooled = torch.nn.functional.normalize(pooled, dim=-1)
+                vectors[batch] = pooled.float().numpy()
+        return vectors
@@ -0,0 +1,471 @@
+"""Model configuration and lifecycle management.
+
+Model settings live in `ai_models/config/model_configs.json`, one entry per
+model role (`summarizer`, `ner`, `embedder`).
+
+`ModelManager` owns one engine per role (`Summarizer`, `NERExtractor`,
+`Embedder`) and loads its weights on first use. At most `MODEL_MAX_LOADED`
+models, and at most `MODEL_MEMORY_BUDGET_GB` of weights, stay resident:
+loading a model beyond either limit unloads the least recently used ones. The
+eviction runs before the load when the new model is known to exceed the
+limits (its size is remembered from its previous load), so the old and the new
+weights are not resident together, and once more after the load with the
+measured size.
+
+Engines never load their model themselves. An engine evicted while a caller
+still holds it gets its model back through `acquire()`, i.e. through the
+manager and its limits; an engine created outside the manager must be loaded
+explicitly with `load()`. Tokenizers are light and loaded separately with
+`load_tokenizer()`, so tokenizing a text does not load the model; they stay
+loaded when the model is evicted.
+
+The manager is a
+process-wide singleton shared by all the threads of a worker; each API or
+batch worker process holds its own. Roles listed in `MODEL_PREWARM` can be
+loaded in a background thread at startup so that the first request does not
+wait for them; `states()` reports whether each role is unloaded, loading,
+loaded or failed, for the API health probes.
+
+Each role picks its inference backend with the `backend` key of its config:
+
+- `torch`: the fp32 `transformers` model,
+- `torch-int8`: the same model with its linear layers dynamically quantized
+  to int8,
+- `onnx` / `onnx-int8`: the model exported to ONNX under
+  `OPTIMIZED_MODELS_DIR` and run by ONNX Runtime, with int8 dynamic
+  quantization of the weights for the latter (needs `optimum[onnxruntime]`;
+  `onnx-int8` falls back to `torch-int8` without it).
+
+An optimized backend is only used once it has passed a parity check against
+the fp32 model: the share of identical top-1 predictions on `PARITY_TEXTS`
+(for encoders, of token states with a cosine similarity of at least
+`STATE_SIMILARITY` to the fp32 ones) must reach the `min_parity` of the
+config. The result is recorded in `parity.json` next to the exported models,
+so the check runs once per model; a backend that fails it is replaced by
+`torch`.
+"""
+
+import gc
+import importlib
+import json
+import logging
+import os
+import platform
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple
+from aiwatcher.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONFIGS_PATH = os.path.join(os.path.dirname(__file__), 'config', 'model_configs.json')
+
+# Classe moteur de chaque rôle, importée à la demande
+MODEL_ENGINES = {
+    'summarizer': 'aiwatcher.ai_models.summarizer:Summarizer',
+    'ner': 'aiwatcher.ai_models.ner_extractor:NERExtractor',
+    'embedder': 'aiwatcher.ai_models.embedder:Embedder',
+}
+
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+
+# Classes transformers / optimum de chaque type de modèle
+TASK_CLASSES = {
+    'seq2seq': ('AutoModelForSeq2SeqLM', 'ORTModelForSeq2SeqLM'),
+    'token-classification': ('AutoModelForTokenClassification', 'ORTModelForTokenClassification'),
+    'feature-extraction': ('AutoModel', 'ORTModelForFeatureExtraction'),
+}
+
+# Similarité cosinus minimale d'un état de token pour les modèles sans logits
+STATE_SIMILARITY = 0.99
+
+PARITY_TEXTS = (
+    "OpenAI released a new language model on Tuesday, and researchers at Stanford "
+    "University published an evaluation of its reasoning abilities.",
+    "Google DeepMind and Meta AI both announced open-weight models this week. The "
+    "models were trained on trillions of tokens and run on a single GPU.",
+    "The MIT team led by Daniela Rus showed that liquid neural networks can steer "
+    "drones through unseen environments with far fewer parameters.",
+    "Hugging Face added support for quantized inference to its Transformers library, "
+    "cutting memory use in half on CPU servers.",
+)
+
+
+@lru_cache(maxsize=1)
+def load_model_configs() -> Dict[str, Dict[str, Any]]:
+    with open(MODEL_CONFIGS_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_model_config(name: str) -> Dict[str, Any]:
+    """Return the configuration of a model role from `model_configs.json`."""
+    return load_model_configs()[name]
+
+
+def model_memory_bytes(engine) -> int:
+    """Size of the weights of an engine's model (torch state dict or ONNX files)."""
+    model = getattr(engine, 'model', None)
+    if model is None:
+        return 0
+    if hasattr(model, 'state_dict'):
+        size = 0
+        for value in model.state_dict().values():
+            # Les couches quantifiées stockent (poids, biais) dans un tuple
+            for tensor in value if isinstance(value, tuple) else (value,):
+                if hasattr(tensor, 'element_size'):
+                    size += tensor.numel() * tensor.element_size()
+        return size
+    model_dir = getattr(model, 'model_save_dir', None)
+    if model_dir and os.path.isdir(model_dir):
+        return sum(
+            os.path.getsize(os.path.join(model_dir, name))
+            for name in os.listdir(model_dir) if name.endswith('.onnx')
+        )
+    return 0
+
+
+def optimized_dir(model_name: str, backend: str) -> str:
+    return os.path.join(settings.OPTIMIZED_MODELS_DIR, model_name.replace('/', '--'), backend)
+
+
+def load_torch_model(model_name: str, task: str, quantize: bool = False):
+    import transformers
+
+    model = getattr(transformers, TASK_CLASSES[task][0]).from_pretrained(model_name, cache_dir=settings.TRANSFORMERS_CACHE_DIR)
+    model.eval()
+    if quantize:
+        import torch
+
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def quantization_config():
+    """Dynamic int8 quantization settings for the current CPU."""
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+
+
+def export_onnx(model_name: str, task: str, quantize: bool = True) -> str:
+    """Export a model to ONNX, quantized to int8 if asked, and return its directory.
+
+    Exports are cached under `OPTIMIZED_MODELS_DIR` and reused by later calls.
+    """
+    from optimum import onnxruntime
+
+    fp32_dir = optimized_dir(model_name, 'onnx')
+    if not os.path.exists(os.path.join(fp32_dir, 'config.json')):
+        logger.info("Exporting %s to ONNX", model_name)
+        model = getattr(onnxruntime, TASK_CLASSES[task][1]).from_pretrained(
+            model_name, export=True, cache_dir=settings.TRANSFORMERS_CACHE_DIR,
+        )
+        model.save_pretrained(fp32_dir)
+    if not quantize:
+        return fp32_dir
+
+    int8_dir = optimized_dir(model_name, 'onnx-int8')
+    if not os.path.exists(os.path.join(int8_dir, 'config.json')):
+        logger.info("Quantizing the ONNX export of %s", model_name)
+        for file_name in sorted(os.listdir(fp32_dir)):
+            if file_name.endswith('.onnx'):
+                quantizer = onnxruntime.ORTQuantizer.from_pretrained(fp32_dir, file_name=file_name)
+                quantizer.quantize(save_dir=int8_dir, quantization_config=quantization_config())
+    return int8_dir
+
+
+def load_onnx_model(model_name: str, task: str, quantize: bool = False):
+    from optimum import onnxruntime
+
+    model_dir = export_onnx(model_name, task, quantize)
+    suffix = '_quantized' if quantize else ''
+    if task == 'seq2seq':
+        files = {
+            'encoder_file_name': f'encoder_model{suffix}.onnx',
+            'decoder_file_name': f'decoder_model{suffix}.onnx',
+        }
+        if os.path.exists(os.path.join(model_dir, f'decoder_with_past_model{suffix}.onnx')):
+            files['decoder_with_past_file_name'] = f'decoder_with_past_model{suffix}.onnx'
+    else:
+        files = {'file_name': f'model{suffix}.onnx'}
+    return getattr(onnxruntime, TASK_CLASSES[task][1]).from_pretrained(model_dir, **files)
+
+
+def load_model(model_name: str, task: str, backend: str = 'torch'):
+    """Load a model with the given backend; return the model and the backend actually used."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend.startswith('onnx'):
+        try:
+            return load_onnx_model(model_name, task, quantize=backend == 'onnx-int8'), backend
+        except ImportError:
+            if backend == 'onnx':
+                raise
+            logger.warning("optimum[onnxruntime] is not installed, using torch-int8 for %s", model_name)
+            backend = 'torch-int8'
+    return load_torch_model(model_name, task, quantize=backend == 'torch-int8'), backend
+
+
+def prediction_agreement(reference, candidate, inputs: Dict[str, Any], mask) -> float:
+    """Share of positions where both models have the same top-1 prediction."""
+    import torch
+
+    with torch.inference_mode():
+        expected = reference(**inputs)
+        actual = candidate(**inputs)
+    mask = mask.bool()
+    if getattr(expected, 'logits', None) is None:
+        similarity = torch.nn.functional.cosine_similarity(expected.last_hidden_state, actual.last_hidden_state, dim=-1)
+        return float((similarity >= STATE_SIMILARITY)[mask].float().mean())
+    same = expected.logits.argmax(dim=-1) == actual.logits.argmax(dim=-1)
+    return float(same[mask].float().mean())
+
+
+def parity_inputs(reference, tokenizer, task: str, texts: Sequence[str], max_length: int):
+    """Build the inputs of the parity check and the mask of the positions to compare.
+
+    Summarization models are compared token by token on the fp32 summary
+    (teacher forcing), so that one diverging token does not shift the rest.
+    """
+    import torch
+
+    inputs = dict(tokenizer(list(texts), padding=True, truncation=True, max_length=max_length, return_tensors='pt'))
+    if task != 'seq2seq':
+        return inputs, inputs['attention_mask']
+    inputs = {'input_ids': inputs['input_ids'], 'attention_mask': inputs['attention_mask']}
+    with torch.inference_mode():
+        summary_ids = reference.generate(**inputs, num_beams=1, max_new_tokens=32)
+    inputs['decoder_input_ids'] = summary_ids
+    return inputs, summary_ids != tokenizer.pad_token_id
+
+
+def check_parity(
+    model_name: str,
+    task: str,
+    backend: str,
+    tokenizer,
+    candidate=None,
+    texts: Sequence[str] = PARITY_TEXTS,
+    max_length: int = 512,
+) -> float:
+    """Compare a backend to the fp32 model and return the top-1 agreement."""
+    reference = load_torch_model(model_name, task)
+    if candidate is None:
+        candidate, backend = load_model(model_name, task, backend)
+    inputs, mask = parity_inputs(reference, tokenizer, task, texts, max_length)
+    return prediction_agreement(reference, candidate, inputs, mask)
+
+
+def _parity_path(model_name: str) -> str:
+    return os.path.join(settings.OPTIMIZED_MODELS_DIR, model_name.replace('/', '--'), 'parity.json')
+
+
+def recorded_parity(model_name: str) -> Dict[str, float]:
+    try:
+        with open(_parity_path(model_name), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_parity(model_name: str, backend: str, agreement: float):
+    path = _parity_path(model_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    results = recorded_parity(model_name)
+    results[backend] = agreement
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+
+
+def load_tokenizer(config: Dict[str, Any]):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(config['model_name'], cache_dir=settings.TRANSFORMERS_CACHE_DIR)
+
+
+def load_backend(config: Dict[str, Any], task: str, tokenizer=None) -> Tuple[Any, Any, str]:
+    """Load the tokenizer and the model of a role with its configured backend.
+
+    Returns the tokenizer (`tokenizer` if one is given), the model and the
+    backend actually used: an optimized backend below `min_parity` is replaced
+    by the fp32 model.
+    """
+    model_name = config['model_name']
+    if tokenizer is None:
+        tokenizer = load_tokenizer(config)
+    model, backend = load_model(model_name, task, config.get('backend', 'torch'))
+    if backend == 'torch':
+        return tokenizer, model, backend
+
+    agreement = recorded_parity(model_name).get(backend)
+    if agreement is None:
+        agreement = check_parity(model_name, task, backend, tokenizer, candidate=model, max_length=config.get('max_input_tokens', 512))
+        record_parity(model_name, backend, agreement)
+    min_parity = config.get('min_parity', 0.95)
+    if agreement < min_parity:
+        logger.warning(
+            "Backend %s of %s fails the parity check (%.3f < %.3f), using torch",
+            backend, model_name, agreement, min_parity,
+        )
+        return tokenizer, load_torch_model(model_name, task), 'torch'
+    return tokenizer, model, backend
+
+
+class ModelManager:
+    """Lazy, LRU-evicted registry of the loaded models."""
+
+    def __init__(self, max_loaded: Optional[int] = None, memory_budget_gb: Optional[float] = None):
+        self.max_loaded = max_loaded or settings.MODEL_MAX_LOADED
+        budget = memory_budget_gb if memory_budget_gb is not None else settings.MODEL_MEMORY_BUDGET_GB
+        self.memory_budget = int(budget * 1024 ** 3)
+        self.engines: Dict[str, Any] = {}
+        # Modèles résidents et leur taille, du moins au plus récemment utilisé
+        self.loaded: "OrderedDict[str, int]" = OrderedDict()
+        # Taille mesurée au dernier chargement de chaque rôle, même déchargé
+        self.sizes: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.load_locks: Dict[str, threading.Lock] = {}
+        self.loading: Set[str] = set()
+        # Dernière erreur de chargement de chaque rôle
+        self.errors: Dict[str, str] = {}
+
+    def engine(self, name: str):
+        """Return the engine of a role without loading its model."""
+        with self.lock:
+            if name not in self.engines:
+                module, _, cls = MODEL_ENGINES[name].partition(':')
+                self.engines[name] = getattr(importlib.import_module(module), cls)()
+                self.load_locks[name] = threading.Lock()
+            return self.engines[name]
+
+    def get(self, name: str):
+        """Return the engine of a role, loading its model if needed."""
+        engine = self.engine(name)
+        with self.lock:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return engine
+
+        # Un seul chargement par rôle, même si plusieurs threads le demandent
+        with self.load_locks[name]:
+            with self.lock:
+                if name in self.loaded:
+                    self.loaded.move_to_end(name)
+                    return engine
+            with self.lock:
+                self.loading.add(name)
+                # Libérer la place avant de charger, pas après
+                self._evict(keep=name, incoming=self.sizes.get(name, 0))
+            try:
+                engine.load()
+            except Exception as e:
+                with self.lock:
+                    self.errors[name] = str(e)
+                raise
+            finally:
+                with self.lock:
+                    self.loading.discard(name)
+            size = model_memory_bytes(engine)
+            logger.info("Loaded model %s (%.0f MB)", name, size / 1024 ** 2)
+            with self.lock:
+                self.errors.pop(name, None)
+                self.loaded[name] = self.sizes[name] = size
+                self._evict(keep=name)
+        return engine
+
+    def acquire(self, name: str, engine=None) -> Tuple[Any, Any]:
+        """Return the model and the tokenizer of a role, loading them if needed.
+
+        The pair is read under the manager lock, so it cannot be evicted in
+        between; the caller keeps its own references for the rest of the call.
+        Raises `RuntimeError` if `engine` is given and is not the one managed
+        for the role.
+        """
+        if engine is not None and self.engine(name) is not engine:
+            raise RuntimeError(f"Model {name} is not loaded, call load() first")
+        while True:
+            current = self.get(name)
+            with self.lock:
+                if name in self.loaded and current.model is not None:
+                    return current.model, current.tokenizer
+
+    def unload(self, name: str):
+        with self.lock:
+            if name in self.loaded:
+                del self.loaded[name]
+                self._unload(name)
+
+    def resident_bytes(self) -> int:
+        return sum(self.loaded.values())
+
+    def states(self) -> Dict[str, str]:
+        """Return the state of every role: `unloaded`, `loading`, `loaded` or `failed`."""
+        with self.lock:
+            return {
+                name: 'loaded' if name in self.loaded
+                else 'loading' if name in self.loading
+                else 'failed' if name in self.errors
+                else 'unloaded'
+                for name in MODEL_ENGINES
+            }
+
+    def prewarm(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Load models in a background thread (defaults to `MODEL_PREWARM`)."""
+        names = list(settings.MODEL_PREWARM if names is None else names)
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    with self.lock:
+                        self.errors[name] = str(e)
+                    logger.exception("Failed to pre-warm model %s", name)
+
+        thread = threading.Thread(target=run, name='model-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def _evict(self, keep: str, incoming: Optional[int] = None):
+        """Unload least recently used models until both limits are met (lock held).
+
+        With `incoming`, make room for a model of that size about to be loaded.
+        """
+        count, size = (0, 0) if incoming is None else (1, incoming)
+        while any(name != keep for name in self.loaded) and (
+            len(self.loaded) + count > self.max_loaded or self.resident_bytes() + size > self.memory_budget
+        ):
+            name = next(name for name in self.loaded if name != keep)
+            del self.loaded[name]
+            logger.info("Evicting model %s", name)
+            self._unload(name)
+
+    def _unload(self, name: str):
+        # Les appels en cours gardent leur propre référence au modèle
+        self.engines[name].unload()
+        gc.collect()
+
+
+def loaded_model(name: str, engine) -> Tuple[Any, Any]:
+    """Return the model and the tokenizer of an engine, reloaded by the manager if it evicted them."""
+    # Références locales : le modèle peut être déchargé pendant l'appel
+    model, tokenizer = engine.model, engine.tokenizer
+    if model is None:
+        model, tokenizer = get_model_manager().acquire(name, engine)
+    return model, tokenizer
+
+
+_manager: Optional[ModelManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager() -> ModelManager:
+    """Return the process-wide model manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
@@ -0,0 +1,198 @@
+"""Named entity recognition with sliding windows.
+
+`NERExtractor` tokenizes each text once with a fast tokenizer (or reads it
+from a `TokenStore`, see `preprocessing/tokenizer.py`), cutting it into
+windows of `window_tokens` tokens that overlap by `stride` tokens. The windows
+of all the texts are sorted by length and run through the token-classification
+model in padded batches of `batch_size`, so that a whole crawl is processed in
+a few forward passes.
+
+A token seen by two windows keeps the prediction of the window where it is
+farthest from the edge, which has the most context on both sides. The BIO
+labels are then merged into entities carrying their character offsets in the
+original text, the index of their sentence and a context snippet, i.e. the
+columns of `database.models.Entity`.
+"""
+
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from aiwatcher.ai_models.model_manager import get_model_config, load_backend, load_tokenizer, loaded_model
+from aiwatcher.preprocessing.tokenizer import SENTENCE_RE, TokenStore, chunk_token_ids, encode_texts
+
+
+@dataclass
+class EntityResult:
+    """One entity found in a text, named after the `Entity` columns."""
+    entity_text: str
+    entity_type: str
+    position_start: int
+    position_end: int
+    sentence_index: int
+    confidence_score: float
+    context: str
+    model_used: str
+    model_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Token:
+    start: int
+    end: int
+    label: str
+    score: float
+    margin: int
+
+
+def split_label(label: str) -> Tuple[str, str]:
+    """Split a BIO label into its prefix and entity type ('B-ORG' -> ('B', 'ORG'))."""
+    if label == 'O':
+        return 'O', ''
+    if len(label) > 2 and label[1] == '-' and label[0] in 'BIES':
+        return label[0], label[2:]
+    return 'I', label
+
+
+def sentence_starts(text: str) -> List[int]:
+    return [0] + [match.end() for match in SENTENCE_RE.finditer(text)]
+
+
+class NERExtractor:
+    """Token-classification model run over overlapping windows."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, model=None, tokenizer=None):
+        self.config = config or get_model_config('ner')
+        self.model_name = self.config['model_name']
+        self.model_version = self.config.get('model_version')
+        self.window_tokens = self.config.get('window_tokens', 512)
+        self.stride = self.config.get('stride', 128)
+        self.batch_size = self.config.get('batch_size', 16)
+        self.context_chars = self.config.get('context_chars', 100)
+        self.backend = self.config.get('backend', 'torch')
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def load(self) -> "NERExtractor":
+        """Load the tokenizer and the model on CPU with the configured backend, once."""
+        if self.model is None:
+            self.tokenizer, self.model, self.backend = load_backend(self.config, 'token-classification', self.tokenizer)
+        return self
+
+    def load_tokenizer(self):
+        """Load the tokenizer alone, once."""
+        if self.tokenizer is None:
+            self.tokenizer = load_tokenizer(self.config)
+        return self.tokenizer
+
+    def unload(self):
+        # Le tokenizer est léger et reste chargé
+        self.model = None
+
+    def extract(self, text: str) -> List[EntityResult]:
+        return self.extract_batch([text])[0]
+
+    def extract_batch(self, texts: Sequence[str], store: Optional[TokenStore] = None) -> List[List[EntityResult]]:
+        """Return the entities of each text, in order of appearance.
+
+        The texts are looked up in `store` before being tokenized.
+        """
+        if not texts:
+            return []
+
+        model, tokenizer = loaded_model('ner', self)
+        budget = self.window_tokens - tokenizer.num_special_tokens_to_add()
+        # Nombre de tokens spéciaux placés avant le texte dans une fenêtre
+        prefix = tokenizer.build_inputs_with_special_tokens([-1]).index(-1)
+        # Fenêtres : (texte, positions des tokens du texte, ids avec tokens spéciaux)
+        windows: List[Tuple[int, List[int], List[int]]] = []
+        encodings = encode_texts(tokenizer, texts, store)
+        for sample, encoding in enumerate(encodings):
+            for positions in chunk_token_ids(range(len(encoding)), budget, self.stride):
+                ids = tokenizer.build_inputs_with_special_tokens(encoding.ids[positions].tolist())
+                windows.append((sample, positions, ids))
+        labels, scores = self._predict(model, tokenizer, [window[2] for window in windows])
+
+        # Pour chaque token, garder la fenêtre où il est le plus loin du bord
+        tokens: List[Dict[Tuple[int, int], _Token]] = [{} for _ in texts]
+        id2label = model.config.id2label
+        for w, (sample, positions, _) in enumerate(windows):
+            offsets = encodings[sample].offsets
+            last = len(positions) - 1
+            for i, token in enumerate(positions):
+                start, end = int(offsets[token][0]), int(offsets[token][1])
+                if end <= start:
+                    continue
+                p = prefix + i
+                margin = min(i, last - i)
+                known = tokens[sample].get((start, end))
+                if known is None or margin > known.margin:
+                    tokens[sample][(start, end)] = _Token(start, end, id2label[int(labels[w][p])], float(scores[w][p]), margin)
+
+        return [
+            self._entities(text, sorted(sample_tokens.values(), key=lambda token: token.start))
+            for text, sample_tokens in zip(texts, tokens)
+        ]
+
+    def _predict(self, model, tokenizer, windows: Sequence[List[int]]):
+        """Run the windows by batches of similar length; return the label ids and their probabilities."""
+        import torch
+
+        order = sorted(range(len(windows)), key=lambda w: len(windows[w]))
+        labels: List[Any] = [None] * len(windows)
+        scores: List[Any] = [None] * len(windows)
+        with torch.inference_mode():
+            for i in range(0, len(order), self.batch_size):
+                batch = order[i:i + self.batch_size]
+                inputs = tokenizer.pad({'input_ids': [windows[w] for w in batch]}, return_tensors='pt')
+                logits = model(**inputs).logits
+                probs, ids = logits.softmax(dim=-1).max(dim=-1)
+                for row, w in enumerate(batch):
+                    labels[w] = ids[row].tolist()
+                    scores[w] = probs[row].tolist()
+        return labels, scores
+
+    def _entities(self, text: str, tokens: List[_Token]) -> List[EntityResult]:
+        """Merge BIO-labelled tokens into entities with character offsets."""
+        spans: List[Tuple[str, int, int, List[float]]] = []
+        current: Optional[Tuple[str, int, int, List[float]]] = None
+        previous_end = -1
+        for token in tokens:
+            prefix, entity_type = split_label(token.label)
+            same_word = token.start == previous_end
+            previous_end = token.end
+
+            # Les sous-mots d'un mot prolongent l'entité en cours, pas la ponctuation collée au mot
+            if current is not None and same_word and prefix != 'O' and entity_type == current[0]:
+                current = (current[0], current[1], token.end, current[3] + [token.score])
+                continue
+            if current is not None:
+                spans.append(current)
+                current = None
+            if prefix == 'O':
+                continue
+            if spans and prefix in 'IE' and spans[-1][0] == entity_type and not text[spans[-1][2]:token.start].strip():
+                current = spans.pop()
+                current = (current[0], current[1], token.end, current[3] + [token.score])
+            else:
+                current = (entity_type, token.start, token.end, [token.score])
+        if current is not None:
+            spans.append(current)
+
+        starts = sentence_starts(text)
+        return [
+            EntityResult(
+                entity_text=text[start:end],
+                entity_type=entity_type,
+                position_start=start,
+                position_end=end,
+                sentence_index=bisect_right(starts, start) - 1,
+                confidence_score=sum(span_scores) / len(span_scores),
+                context=text[max(0, start - self.context_chars):end + self.context_chars].strip(),
+                model_used=self.model_name,
+                model_version=self.model_version,
+            )
+            for entity_type, start, end, span_scores in spans
+        ]
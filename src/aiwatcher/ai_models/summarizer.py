@@ -0,0 +1,307 @@
+"""Summarization engine (BART/T5) with dynamic batching.
+
+`Summarizer` wraps a single seq2seq model and produces the three summary
+lengths stored in `database.models.Summary`. The encoder runs once per batch
+and its hidden states are reused by the three `generate()` calls.
+
+`SummarizationServer` lets the API and the batch job share that model. Callers
+submit texts from any thread (or coroutine); a worker thread gathers the
+pending requests until `max_batch_size` is reached or the oldest one has
+waited `max_wait_ms`, groups them into token-length buckets to limit padding,
+and runs each bucket as one batch.
+
+Texts longer than the model context go through `summarize_chunked()`: the
+text is split on sentence boundaries into context-sized chunks, the chunks
+are summarized in parallel batches by the server, and the partial summaries
+are merged level by level until they fit in a single input. Each step is
+yielded as an event so that callers can stream progress. Given a
+`TokenStore`, the text is read pre-tokenized from it (see
+`preprocessing/tokenizer.py`).
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from aiwatcher.ai_models.model_manager import get_model_config, get_model_manager, load_backend, load_tokenizer, loaded_model
+from aiwatcher.preprocessing.tokenizer import TokenStore, chunk_text
+
+SUMMARY_LENGTHS = ('short', 'medium', 'long')
+
+
+@dataclass
+class SummaryResult:
+    """The three summaries of one text, named after the `Summary` columns."""
+    short_summary: str
+    medium_summary: str
+    long_summary: str
+    model_used: str
+    model_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Summarizer:
+    """Seq2seq model generating short, medium and long summaries."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, model=None, tokenizer=None):
+        self.config = config or get_model_config('summarizer')
+        self.model_name = self.config['model_name']
+        self.model_version = self.config.get('model_version')
+        self.max_input_tokens = self.config.get('max_input_tokens', 1024)
+        self.backend = self.config.get('backend', 'torch')
+        self.model = model
+        self.tokenizer = tokenizer
+
+    def load(self) -> "Summarizer":
+        """Load the tokenizer and the model on CPU with the configured backend, once."""
+        if self.model is None:
+            self.tokenizer, self.model, self.backend = load_backend(self.config, 'seq2seq', self.tokenizer)
+        return self
+
+    def load_tokenizer(self):
+        """Load the tokenizer alone, once."""
+        if self.tokenizer is None:
+            self.tokenizer = load_tokenizer(self.config)
+        return self.tokenizer
+
+    def unload(self):
+        # Le tokenizer est léger et reste chargé
+        self.model = None
+
+    def encode(self, text: str) -> List[int]:
+        """Tokenize a text, truncated to the model context."""
+        return self.load_tokenizer()(text, truncation=True, max_length=self.max_input_tokens)['input_ids']
+
+    def summarize_ids(self, batch: Sequence[List[int]]) -> List[SummaryResult]:
+        """Summarize a batch of tokenized texts with a single encoder pass."""
+        import torch
+        from transformers.modeling_outputs import BaseModelOutput
+
+        model, tokenizer = loaded_model('summarizer', self)
+        inputs = tokenizer.pad({'input_ids': list(batch)}, return_tensors='pt')
+        num_beams = self.config.get('num_beams', 2)
+
+        summaries: Dict[str, List[str]] = {}
+        with torch.inference_mode():
+            hidden_states = model.get_encoder()(
+                input_ids=inputs['input_ids'],
+                attention_mask=inputs['attention_mask'],
+            ).last_hidden_state
+            for length in SUMMARY_LENGTHS:
+                # generate() remplace les sorties de l'encodeur lors de l'expansion des beams
+                output_ids = model.generate(
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden_states),
+                    attention_mask=inputs['attention_mask'],
+                    num_beams=num_beams,
+                    early_stopping=num_beams > 1,
+                    **self.config['lengths'][length],
+                )
+                summaries[length] = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+        return [
+            SummaryResult(
+                short_summary=summaries['short'][i].strip(),
+                medium_summary=summaries['medium'][i].strip(),
+                long_summary=summaries['long'][i].strip(),
+                model_used=self.model_name,
+                model_version=self.model_version,
+            )
+            for i in range(len(batch))
+        ]
+
+    def chunk(self, text: str, store: Optional[TokenStore] = None) -> List[List[int]]:
+        """Split a text into inputs that fit the model context."""
+        return chunk_text(text, self.load_tokenizer(), self.max_input_tokens, store)
+
+    def summarize_batch(self, texts: Sequence[str]) -> List[SummaryResult]:
+        return self.summarize_ids([self.encode(text) for text in texts])
+
+    def summarize(self, text: str) -> SummaryResult:
+        return self.summarize_batch([text])[0]
+
+
+@dataclass
+class _Request:
+    input_ids: List[int]
+    future: Future
+    enqueued: float
+
+
+class SummarizationServer:
+    """Dynamic batching front-end shared by all the callers of a `Summarizer`."""
+
+    def __init__(self,
+        summarizer: Optional[Summarizer] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        length_buckets: Optional[Sequence[int]] = None,
+    ):
+        self._summarizer = summarizer
+        self.config = summarizer.config if summarizer is not None else get_model_config('summarizer')
+        batching = self.config.get('batching', {})
+        self.max_batch_size = max_batch_size or batching.get('max_batch_size', 8)
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else batching.get('max_wait_ms', 50)) / 1000
+        self.length_buckets = sorted(length_buckets or batching.get('length_buckets', [self.config.get('max_input_tokens', 1024)]))
+        self.requests: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self.worker: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    @property
+    def summarizer(self) -> Summarizer:
+        """The served model, resolved through the model manager unless one was given."""
+        if self._summarizer is not None:
+            return self._summarizer
+        return get_model_manager().get('summarizer')
+
+    @property
+    def engine(self) -> Summarizer:
+        """The served engine, without loading its model, for tokenization."""
+        if self._summarizer is not None:
+            return self._summarizer
+        return get_model_manager().engine('summarizer')
+
+    def start(self) -> "SummarizationServer":
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                # Un modèle servi par le gestionnaire est chargé par lui seul
+                if self._summarizer is not None:
+                    self._summarizer.load()
+                else:
+                    get_model_manager().get('summarizer')
+                self.worker = threading.Thread(target=self._run, name='summarization-server', daemon=True)
+                self.worker.start()
+        return self
+
+    def stop(self):
+        if self.worker is not None:
+            self.requests.put(None)
+            self.worker.join()
+            self.worker = None
+
+    def submit(self, text: str) -> Future:
+        """Queue a text and return a future resolved with its `SummaryResult`.
+
+        Tokenization happens in the calling thread, so it runs in parallel
+        with the generation of the previous batch.
+        """
+        return self.submit_ids(self.engine.encode(text))
+
+    def submit_ids(self, input_ids: List[int]) -> Future:
+        """Queue an already tokenized input."""
+        self.start()
+        future: Future = Future()
+        self.requests.put(_Request(input_ids, future, time.monotonic()))
+        return future
+
+    def summarize(self, text: str, timeout: Optional[float] = None) -> SummaryResult:
+        return self.submit(text).result(timeout)
+
+    def summarize_many(self, texts: Sequence[str]) -> List[SummaryResult]:
+        """Submit a whole list at once so that it is split into full batches."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    async def asummarize(self, text: str) -> SummaryResult:
+        loop = asyncio.get_running_loop()
+        future = await loop.run_in_executor(None, self.submit, text)
+        return await asyncio.wrap_future(future)
+
+    def summarize_chunked(self, text: str, store: Optional[TokenStore] = None) -> Iterator[Dict[str, Any]]:
+        """Map-reduce summarization of a text of any length.
+
+        Yields `chunk` events with the partial summary of each chunk, `merge`
+        events for every intermediate level, then a `final` event holding the
+        `SummaryResult` of the whole text. The text is looked up in `store`;
+        the intermediate summaries are not stored.
+        """
+        chunks = self.engine.chunk(text, store)
+        if len(chunks) <= 1:
+            result = self.submit_ids(chunks[0] if chunks else self.engine.encode(text)).result()
+            yield {'event': 'final', 'chunks': len(chunks), 'summary': result.to_dict()}
+            return
+
+        futures = [self.submit_ids(chunk) for chunk in chunks]
+        partials = []
+        for index, future in enumerate(futures):
+            partial = future.result().medium_summary
+            partials.append(partial)
+            yield {'event': 'chunk', 'index': index, 'total': len(chunks), 'summary': partial}
+
+        level = 0
+        while True:
+            groups = self.engine.chunk(' '.join(partials))
+            if len(groups) <= 1:
+                break
+            level += 1
+            partials = [future.result().medium_summary for future in [self.submit_ids(group) for group in groups]]
+            yield {'event': 'merge', 'level': level, 'summaries': partials}
+
+        result = self.submit_ids(groups[0]).result() if groups else self.summarize(' '.join(partials))
+        yield {'event': 'final', 'chunks': len(chunks), 'summary': result.to_dict()}
+
+    def _bucket(self, request: _Request) -> int:
+        return bisect_left(self.length_buckets, len(request.input_ids))
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Gather requests until the batch is full or the first one's deadline passes.
+
+        Requests already queued are always taken; the deadline only bounds the
+        time spent waiting for new ones.
+        """
+        pending = [first]
+        deadline = first.enqueued + self.max_wait
+        while len(pending) < self.max_batch_size:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if request is None:
+                self.requests.put(None)
+                break
+            pending.append(request)
+        return pending
+
+    def _run(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                return
+
+            buckets: Dict[int, List[_Request]] = {}
+            for request in self._collect(first):
+                buckets.setdefault(self._bucket(request), []).append(request)
+
+            for bucket in buckets.values():
+                try:
+                    results = self.summarizer.summarize_ids([request.input_ids for request in bucket])
+                except Exception as e:
+                    for request in bucket:
+                        request.future.set_exception(e)
+                    continue
+                for request, result in zip(bucket, results):
+                    request.future.set_result(result)
+
+
+_server: Optional[SummarizationServer] = None
+_server_lock = threading.Lock()
+
+
+def get_summarization_server() -> SummarizationServer:
+    """Return the process-wide summarization server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = SummarizationServer()
+        return _server
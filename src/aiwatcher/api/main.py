@@ -0,0 +1,31 @@
+"""FastAPI entry point of the AIWatcher API.
+
+Importing this module stays light (see `api/startup.py`): the database
+check, the job workers and the model pre-warm run in the background after the
+lifespan has returned, and `/health/live` and `/health/ready` report them.
+"""
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from aiwatcher.api import startup
+from aiwatcher.api.middleware import ConditionalGetMiddleware
+from aiwatcher.api.routers import articles, entities, health, jobs, summarize, trends
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stages = app.state.startup = startup.StartupStages()
+    thread = startup.start(stages)
+    yield
+    startup.stop(stages, thread)
+
+
+app = FastAPI(title="AIWatcher API", lifespan=lifespan)
+app.add_middleware(ConditionalGetMiddleware)
+
+app.include_router(health.router)
+app.include_router(articles.router)
+app.include_router(summarize.router)
+app.include_router(entities.router)
+app.include_router(jobs.router)
+app.include_router(trends.router)
@@ -0,0 +1,89 @@
+"""HTTP caching of the API reads.
+
+`ConditionalGetMiddleware` handles the `GET` requests under the cached
+prefixes (`/articles`, `/digests` and `/trends` by default):
+
+- responses are stored in the response cache (in-process LRU in front of
+  Redis, see `services/cache_service.py`) under the current data version and
+  the normalized URL, so hot lists and details are served without a query;
+- every response carries an `ETag` derived from the data version and the
+  normalized URL, known before the endpoint runs: a request whose
+  `If-None-Match` matches gets `304 Not Modified` without a body, a cache
+  lookup or a query.
+
+The article writer and the batch processor bump the data version when they
+change rows, which makes every cached response and ETag stale at once.
+
+The data version and the cache may live in Redis, so the lookup and the
+store run in the thread pool rather than on the event loop.
+"""
+
+import hashlib
+from typing import Any, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from aiwatcher.services.cache_service import RESPONSE_PREFIX, data_version, get_response_cache
+
+CACHED_PREFIXES = ('/articles', '/digests', '/trends')
+
+
+def response_key(request: Request, version: str) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f'{RESPONSE_PREFIX}:{version}:{request.url.path}?{query}'
+
+
+def response_etag(key: str) -> str:
+    """ETag of the responses stored under `key`, which holds the data version."""
+    return '"' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Les ETags faibles (W/"...") sont comparés sur leur valeur
+    return etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """ETag, conditional GET and response caching for read endpoints."""
+
+    def __init__(self, app, prefixes: Sequence[str] = CACHED_PREFIXES, cache=None):
+        super().__init__(app)
+        self.prefixes = tuple(prefixes)
+        self.cache = cache
+
+    def locate(self, request: Request) -> Tuple[Any, str]:
+        """Return the cache and the key of the request under the current data version (blocking)."""
+        return self.cache or get_response_cache(), response_key(request, data_version())
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != 'GET' or not request.url.path.startswith(self.prefixes):
+            return await call_next(request)
+
+        if_none_match = request.headers.get('if-none-match')
+        cache, key = await run_in_threadpool(self.locate, request)
+        etag = response_etag(key)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        # Revalidation : la version des données suffit, ni cache ni requête
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={**headers, 'X-Cache': 'HIT'})
+
+        entry = await run_in_threadpool(cache.get, key)
+        status = 'HIT'
+        if entry is None:
+            response = await call_next(request)
+            if response.status_code != 200:
+                return response
+            body = b''.join([chunk async for chunk in response.body_iterator])
+            entry = {
+                'body': body.decode('utf-8'),
+                'content_type': response.headers.get('content-type', 'application/json'),
+            }
+            await run_in_threadpool(cache.set, key, entry)
+            status = 'MISS'
+        return Response(content=entry['body'], headers={**headers, 'X-Cache': status, 'Content-Type': entry['content_type']})
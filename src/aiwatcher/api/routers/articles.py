@@ -0,0 +1,104 @@
+"""Article endpoints.
+
+`GET /articles` lists articles newest first with cursor pagination: each page
+returns a `next_cursor` to pass back as `cursor` for the following page, so
+that deep pages cost the same as the first one. `source`, `category` and
+`is_processed` filter the list, and `fields` (comma-separated) selects the
+returned columns; the content columns are only available on
+`GET /articles/{id}`.
+
+`GET /articles/search?q=...` ranks articles by full-text relevance over their
+title, content and summaries, with a highlighted snippet.
+
+`GET /articles/similar?article_id=...` and `GET /articles/semantic-search?q=...`
+rank articles by embedding similarity (see `services/embedding_service.py`);
+the embedding service, and numpy with it, is imported on the first request.
+"""
+
+from typing import List, Optional, Sequence
+from fastapi import APIRouter, HTTPException, Query
+from aiwatcher.api.schemas.article import ArticleListResponse, SearchResponse, SimilarArticlesResponse
+from aiwatcher.database.connection import get_engine
+from aiwatcher.services.article_service import (
+    DEFAULT_LIST_FIELDS,
+    DETAIL_FIELDS,
+    get_article,
+    list_articles,
+)
+from aiwatcher.services.search_service import search_articles
+
+router = APIRouter(prefix="/articles", tags=["articles"])
+
+
+def _fields(fields: Optional[str], default: Sequence[str]) -> List[str]:
+    if not fields:
+        return list(default)
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
+@router.get("", response_model=ArticleListResponse)
+def read_articles(
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    is_processed: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Comma-separated list of columns"),
+):
+    try:
+        with get_engine().connect() as conn:
+            items, next_cursor = list_articles(
+                conn,
+                fields=_fields(fields, DEFAULT_LIST_FIELDS),
+                limit=limit,
+                cursor=cursor,
+                source=source,
+                category=category,
+                is_processed=is_processed,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ArticleListResponse(items=items, next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    source: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    with get_engine().connect() as conn:
+        items = search_articles(conn, q, limit=limit, source=source)
+    return SearchResponse(items=items)
+
+
+@router.get("/similar", response_model=SimilarArticlesResponse)
+def read_similar(article_id: int, limit: int = Query(10, ge=1, le=100)):
+    from aiwatcher.services.embedding_service import similar_articles
+
+    with get_engine().connect() as conn:
+        items = similar_articles(conn, article_id, limit=limit)
+    if items is None:
+        raise HTTPException(status_code=404, detail="Article not indexed")
+    return SimilarArticlesResponse(items=items)
+
+
+@router.get("/semantic-search", response_model=SimilarArticlesResponse)
+def read_semantic_search(q: str = Query(..., min_length=1, max_length=500), limit: int = Query(10, ge=1, le=100)):
+    from aiwatcher.services.embedding_service import semantic_search
+
+    with get_engine().connect() as conn:
+        items = semantic_search(conn, q, limit=limit)
+    return SimilarArticlesResponse(items=items)
+
+
+@router.get("/{article_id}")
+def read_article(article_id: int, fields: Optional[str] = Query(None, description="Comma-separated list of columns")):
+    try:
+        with get_engine().connect() as conn:
+            article = get_article(conn, article_id, _fields(fields, DETAIL_FIELDS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return article
@@ -0,0 +1,40 @@
+"""Entity extraction endpoints.
+
+`POST /entities` extracts the named entities of a text as a background job,
+with the same cache and inline fast path as `POST /summarize`: the response
+is the list of entities when they are available within the latency budget,
+and `202 Accepted` with the job otherwise. The cache and job queue calls run in
+the thread pool.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from aiwatcher.api.schemas.entity import EntitiesRequest, EntitiesResponse
+from aiwatcher.api.schemas.job import JobResponse
+from aiwatcher.core.config import settings
+from aiwatcher.preprocessing.utils import compute_content_hash
+from aiwatcher.services.cache_service import get_inference_cache, model_cache_key
+from aiwatcher.services.job_service import DONE, FAILED, get_job_manager
+
+router = APIRouter(prefix="/entities", tags=["entities"])
+
+
+@router.post("", response_model=EntitiesResponse, responses={202: {"model": JobResponse}})
+async def extract_entities(request: EntitiesRequest):
+    key = model_cache_key('ner', compute_content_hash(request.text))
+    cached = await run_in_threadpool(lambda: get_inference_cache().get(key))
+    if cached is not None:
+        return EntitiesResponse(entities=cached)
+
+    manager = await run_in_threadpool(get_job_manager)
+    job = await run_in_threadpool(manager.submit, 'entities', {'text': request.text})
+    if len(request.text) <= settings.INLINE_MAX_CHARS and await run_in_threadpool(manager.backend.queued) <= manager.workers:
+        job = await manager.wait(job.id, settings.INLINE_LATENCY_BUDGET)
+        if job is None:
+            raise HTTPException(status_code=503, detail="Job lost by the job queue")
+        if job.status == DONE:
+            return EntitiesResponse(entities=job.result)
+        if job.status == FAILED:
+            raise HTTPException(status_code=500, detail=job.error)
+    return JSONResponse(status_code=202, content=JobResponse(**job.to_dict()).model_dump())
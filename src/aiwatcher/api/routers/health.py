@@ -0,0 +1,41 @@
+"""Health probes.
+
+`GET /health/live` answers as soon as the worker serves requests: it only
+tells that the process and its event loop are alive, and never waits on the
+database or the models. `GET /health/ready` returns 200 once the startup
+stages required to serve traffic are done (see `api/startup.py`) and 503
+until then. Both report the state of every stage and of every model role.
+"""
+
+import time
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from aiwatcher.api.schemas.health import HealthResponse
+from aiwatcher.api.startup import StartupStages
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+def _health(request: Request, status: str) -> HealthResponse:
+    from aiwatcher.ai_models.model_manager import get_model_manager
+
+    stages: StartupStages = request.app.state.startup
+    return HealthResponse(
+        status=status,
+        uptime=round(time.time() - stages.started_at, 3),
+        stages=stages.snapshot(),
+        models=get_model_manager().states(),
+    )
+
+
+@router.get("/live", response_model=HealthResponse)
+def live(request: Request):
+    return _health(request, 'alive')
+
+
+@router.get("/ready", response_model=HealthResponse)
+def ready(request: Request):
+    stages: StartupStages = request.app.state.startup
+    if stages.ready():
+        return _health(request, 'ready')
+    return JSONResponse(status_code=503, content=_health(request, 'starting').model_dump())
@@ -0,0 +1,37 @@
+"""Status of the background inference jobs.
+
+`GET /jobs/{id}` returns the state of a job and its result once it is done;
+`GET /jobs/{id}/events` streams its events as JSON lines until it finishes.
+
+The first request may build the job manager, which connects to Redis: it runs
+in the thread pool like the other Redis calls.
+"""
+
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from aiwatcher.api.schemas.job import JobResponse
+from aiwatcher.services.job_service import get_job_manager
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    manager = await run_in_threadpool(get_job_manager)
+    job = await manager.aget(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job.to_dict())
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    manager = await run_in_threadpool(get_job_manager)
+    if await manager.aget(job_id, events=False) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        (json.dumps(event) + "\n" async for event in manager.watch(job_id)),
+        media_type="application/x-ndjson",
+    )
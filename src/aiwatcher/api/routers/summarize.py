@@ -0,0 +1,73 @@
+"""Summarization endpoints.
+
+`POST /summarize` summarizes a text of any length as a background job (see
+`services/job_service.py`), so that the request does not hold an API worker
+while the model runs:
+
+- a text already summarized by the current model is answered from the cache
+  (see `services/cache_service.py`);
+- a text of at most `INLINE_MAX_CHARS` characters is awaited for up to
+  `INLINE_LATENCY_BUDGET` seconds and answered inline when the job finishes
+  in time;
+- otherwise the response is `202 Accepted` with the job, to be polled on
+  `GET /jobs/{id}`.
+
+With `"stream": true` every step is sent back as one JSON line
+(`application/x-ndjson`): a `queued` event with the job id, the `chunk` and
+`merge` events of long texts, then a `final` (or `failed`) event. A cached
+streamed request only receives the `final` event.
+
+The cache and the job queue may live in Redis: their calls run in the thread
+pool, never on the event loop.
+"""
+
+import json
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from aiwatcher.api.schemas.job import JobResponse
+from aiwatcher.api.schemas.summary import SummarizeRequest, SummarizeResponse
+from aiwatcher.core.config import settings
+from aiwatcher.preprocessing.utils import compute_content_hash
+from aiwatcher.services.cache_service import get_inference_cache, model_cache_key
+from aiwatcher.services.job_service import DONE, FAILED, JobManager, get_job_manager
+
+router = APIRouter(prefix="/summarize", tags=["summarize"])
+
+
+async def _stream_job(manager: JobManager, job_id: str) -> AsyncIterator[str]:
+    yield json.dumps({"event": "queued", "job_id": job_id}) + "\n"
+    async for event in manager.watch(job_id):
+        if event["event"] == DONE:
+            result = dict(event["job"]["result"])
+            event = {"event": "final", "job_id": job_id, "chunks": result.pop("chunks"), "summary": result}
+        elif event["event"] == FAILED:
+            event = {"event": "failed", "job_id": job_id, "error": event["job"]["error"]}
+        yield json.dumps(event) + "\n"
+
+
+@router.post("", response_model=SummarizeResponse, responses={202: {"model": JobResponse}})
+async def summarize(request: SummarizeRequest):
+    key = model_cache_key('summarizer', compute_content_hash(request.text))
+    cached = await run_in_threadpool(lambda: get_inference_cache().get(key))
+    if cached is not None:
+        if request.stream:
+            return StreamingResponse(iter([json.dumps(cached) + "\n"]), media_type="application/x-ndjson")
+        return SummarizeResponse(**cached["summary"], chunks=cached["chunks"])
+
+    manager = await run_in_threadpool(get_job_manager)
+    job = await run_in_threadpool(manager.submit, 'summarize', {'text': request.text})
+    if request.stream:
+        return StreamingResponse(_stream_job(manager, job.id), media_type="application/x-ndjson")
+
+    # Chemin rapide : un texte court est attendu dans la limite du budget de latence
+    if len(request.text) <= settings.INLINE_MAX_CHARS and await run_in_threadpool(manager.backend.queued) <= manager.workers:
+        job = await manager.wait(job.id, settings.INLINE_LATENCY_BUDGET)
+        if job is None:
+            raise HTTPException(status_code=503, detail="Job lost by the job queue")
+        if job.status == DONE:
+            return SummarizeResponse(**job.result)
+        if job.status == FAILED:
+            raise HTTPException(status_code=500, detail=job.error)
+    return JSONResponse(status_code=202, content=JobResponse(**job.to_dict()).model_dump())
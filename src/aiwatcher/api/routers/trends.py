@@ -0,0 +1,51 @@
+"""Daily digests and trends.
+
+Both are materialized by the batch processor (see `services/trend_service.py`),
+so these endpoints only read a few rows.
+
+`GET /digests?start=...&end=...` lists the digests of a date range (the last
+7 days by default), `GET /digests/{date}` returns one day.
+`GET /trends?category=...&order=...` lists the keywords mentioned in the last
+month by decreasing week mentions, month mentions or growth rate.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from aiwatcher.api.schemas.trend import DailyDigestResponse, TrendResponse
+from aiwatcher.database.connection import get_engine
+from aiwatcher.services.trend_service import list_digests, list_trends
+
+router = APIRouter(tags=["trends"])
+
+
+@router.get("/digests", response_model=List[DailyDigestResponse])
+def read_digests(start: Optional[date] = None, end: Optional[date] = None):
+    end = end or date.today()
+    start = start or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > 366:
+        raise HTTPException(status_code=400, detail="The range cannot exceed one year")
+    with get_engine().connect() as conn:
+        return list_digests(conn, datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time()))
+
+
+@router.get("/digests/{day}", response_model=DailyDigestResponse)
+def read_digest(day: date):
+    moment = datetime.combine(day, datetime.min.time())
+    with get_engine().connect() as conn:
+        digests = list_digests(conn, moment, moment)
+    if not digests:
+        raise HTTPException(status_code=404, detail="No digest for this day")
+    return digests[0]
+
+
+@router.get("/trends", response_model=List[TrendResponse])
+def read_trends(
+    category: Optional[str] = None,
+    order: Literal['week_mentions', 'month_mentions', 'growth_rate'] = 'week_mentions',
+    limit: int = Query(20, ge=1, le=200),
+):
+    with get_engine().connect() as conn:
+        return list_trends(conn, category=category, order=order, limit=limit)
@@ -1,7 +1,7 @@
 # Définit le format JSON de l'API
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class ArticleBase(BaseModel):
     title: str
@@ -14,9 +14,42 @@ class ArticleCreate(ArticleBase):
 
 class ArticleResponse(ArticleBase):
     id: int
-    published_date: datetime
+    published_date: Optional[datetime] = None
     is_processed: bool
-    reading_time: int
+    reading_time: Optional[int] = None
     
     class Config:
-        from_attributes = True  # Pour SQLAlchemy
\ No newline at end of file
+        from_attributes = True  # Pour SQLAlchemy
+
+
+class ArticleListResponse(BaseModel):
+    """A page of articles restricted to the requested fields."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+class SearchResult(BaseModel):
+    id: int
+    title: str
+    url: str
+    source: str
+    published_date: Optional[datetime] = None
+    rank: float
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    items: List[SearchResult]
+
+
+class SimilarArticle(BaseModel):
+    id: int
+    title: str
+    url: str
+    source: str
+    published_date: Optional[datetime] = None
+    score: float
+
+
+class SimilarArticlesResponse(BaseModel):
+    items: List[SimilarArticle]
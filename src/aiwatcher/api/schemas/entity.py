@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 class EntityBase(BaseModel):
@@ -11,4 +12,23 @@ class EntityResponse(EntityBase):
     canonical_name: str
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EntitiesRequest(BaseModel):
+    text: str
+
+
+class ExtractedEntity(BaseModel):
+    entity_text: str
+    entity_type: str
+    position_start: int
+    position_end: int
+    sentence_index: int
+    confidence_score: float
+    context: str
+    model_used: str
+    model_version: Optional[str] = None
+
+
+class EntitiesResponse(BaseModel):
+    entities: List[ExtractedEntity]
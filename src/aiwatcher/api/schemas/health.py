@@ -0,0 +1,15 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class StageResponse(BaseModel):
+    status: str
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class HealthResponse(BaseModel):
+    status: str
+    uptime: float
+    stages: Dict[str, StageResponse] = {}
+    models: Dict[str, str] = {}
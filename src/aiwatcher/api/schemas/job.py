@@ -0,0 +1,13 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    events: List[Dict[str, Any]] = []
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
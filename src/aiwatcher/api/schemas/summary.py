@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class SummaryBase(BaseModel):
@@ -10,4 +11,17 @@ class SummaryResponse(SummaryBase):
     confidence_score: float
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SummarizeRequest(BaseModel):
+    text: str
+    stream: bool = False
+
+
+class SummarizeResponse(BaseModel):
+    short_summary: str
+    medium_summary: str
+    long_summary: str
+    model_used: str
+    model_version: Optional[str] = None
+    chunks: int
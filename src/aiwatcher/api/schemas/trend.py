@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class DailyDigestResponse(BaseModel):
+    date: datetime
+    total_articles: int
+    articles_by_source: Optional[Dict[str, int]] = None
+    articles_by_category: Optional[Dict[str, int]] = None
+    top_researchers: Optional[List[str]] = None
+    top_organizations: Optional[List[str]] = None
+    top_models: Optional[List[str]] = None
+    trending_topics: Optional[List[str]] = None
+    daily_summary: Optional[str] = None
+    highlights: Optional[List[int]] = None
+    updated_date: Optional[datetime] = None
+
+
+class TrendResponse(BaseModel):
+    keyword: str
+    category: str
+    week_mentions: int
+    month_mentions: int
+    growth_rate: Optional[float] = None
+    related_articles: Optional[List[int]] = None
+    updated_date: Optional[datetime] = None
@@ -0,0 +1,125 @@
+"""Deferred startup of the API.
+
+Importing `aiwatcher.api.main` only loads the web layer: FastAPI, SQLAlchemy
+and the routers. Nothing heavier (torch, transformers, numpy, scrapy, pandas)
+is imported until a request or a background task needs it, and the lifespan
+returns at once, so a worker serves requests well under a second after it
+starts.
+
+The slower steps run in background threads and record their progress in
+`StartupStages`, which the health probes report:
+
+- `jobs`: the job workers are started (this connects to Redis);
+- `database`: a first connection is opened, which also warms the pool. It is
+  retried every `STARTUP_RETRY_INTERVAL` seconds while the database is down;
+- `models`: the roles of `MODEL_PREWARM` are loaded by the model manager.
+
+The API is ready once the database and the job workers are up and the
+pre-warm has finished. A model that failed to pre-warm does not hold back the
+readiness, since it is loaded again on its first request.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import text
+from aiwatcher.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, READY, FAILED = 'pending', 'running', 'ready', 'failed'
+STAGES = ('jobs', 'database', 'models')
+# Étapes nécessaires pour recevoir du trafic
+REQUIRED_STAGES = ('jobs', 'database')
+
+
+class StartupStages:
+    """Progress of the startup stages, shared with the health probes."""
+
+    def __init__(self, names=STAGES):
+        self.started_at = time.time()
+        self.stages: Dict[str, Dict[str, Any]] = {name: {'status': PENDING} for name in names}
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+
+    def run(self, name: str, target: Callable[[], Any]) -> bool:
+        """Run one stage and record its outcome; return whether it succeeded."""
+        start = time.perf_counter()
+        self._set(name, status=RUNNING)
+        try:
+            target()
+        except Exception as e:
+            logger.exception("Startup stage %s failed", name)
+            self._set(name, status=FAILED, error=str(e), seconds=round(time.perf_counter() - start, 3))
+            return False
+        self._set(name, status=READY, seconds=round(time.perf_counter() - start, 3))
+        return True
+
+    def status(self, name: str) -> str:
+        with self.lock:
+            return self.stages[name]['status']
+
+    def ready(self) -> bool:
+        with self.lock:
+            return all(self.stages[name]['status'] == READY for name in REQUIRED_STAGES) \
+                and self.stages['models']['status'] in (READY, FAILED)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            return {name: dict(stage) for name, stage in self.stages.items()}
+
+    def _set(self, name: str, **state):
+        with self.lock:
+            self.stages[name] = state
+
+
+def check_database():
+    from aiwatcher.database.connection import get_engine
+
+    with get_engine().connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+
+def start_jobs():
+    from aiwatcher.services.job_service import get_job_manager
+
+    get_job_manager().start()
+
+
+def prewarm_models():
+    from aiwatcher.ai_models.model_manager import get_model_manager
+
+    manager = get_model_manager()
+    manager.prewarm().join()
+    failed = [name for name in settings.MODEL_PREWARM if manager.states().get(name, 'failed') == 'failed']
+    if failed:
+        raise RuntimeError(f"Could not load {', '.join(failed)}")
+
+
+def start(stages: StartupStages) -> threading.Thread:
+    """Run the startup stages in background threads and return the main one."""
+
+    def run():
+        # Pas de workers si l'application s'arrête déjà
+        if not stages.closed.is_set():
+            stages.run('jobs', start_jobs)
+        while not stages.run('database', check_database):
+            if stages.closed.wait(settings.STARTUP_RETRY_INTERVAL):
+                return
+
+    threading.Thread(target=stages.run, args=('models', prewarm_models), name='startup-models', daemon=True).start()
+    thread = threading.Thread(target=run, name='startup', daemon=True)
+    thread.start()
+    return thread
+
+
+def stop(stages: StartupStages, thread: Optional[threading.Thread] = None, timeout: float = 5):
+    """Stop what the startup stages started."""
+    stages.closed.set()
+    if thread is not None:
+        thread.join(timeout)
+    if stages.status('jobs') == READY:
+        from aiwatcher.services.job_service import get_job_manager
+
+        get_job_manager().stop()
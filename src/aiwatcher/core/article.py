@@ -1,38 +1,82 @@
+"""Scraped article record and its JSON Lines / MessagePack encodings.
+
+`Article` is a slots dataclass: no per-instance `__dict__`, and the list
+fields get their own default list. `date` is always a naive UTC `datetime`
+(or None); the strings scraped from the listing pages are parsed and aware
+dates converted on construction, so both encodings round-trip it unchanged.
+A date string that cannot be parsed becomes None with a warning, so that a
+source changing its date format shows up in the logs.
+
+`to_json()` and `to_msgpack()` encode the fields directly, without building
+a dict first. JSON goes through `orjson` when it is installed (it serializes
+slots dataclasses natively) and through the stdlib string encoder otherwise;
+MessagePack is encoded here, with the dates as timestamp extensions, so it
+does not need the `msgpack` package. A MessagePack record is an array of the
+fields in `FIELDS` order, and a stream is a plain concatenation of records.
+"""
+
+import io
+import json
+import logging
+import struct
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from json.encoder import encode_basestring
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from aiwatcher.preprocessing.utils import parse_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(slots=True)
 class Article:
-    def __init__(self,
-            title,
-            link,
-            date,
-            source,
-            content,
-            img=None,
-            summary=None,
-            keywords= [],
-            authors= [],
-            ):
-        self.title = title
-        self.link = link
-        self.date = date
-        self.source = source
-        self.content = content
-        self.img = img
-        self.summary = summary
-        self.keywords = keywords
-        self.authors = authors
-
-    def to_dict(self):
-        return {
-            'title': self.title,
-            'link': self.link,
-            'date': self.date,
-            'img': self.img,
-            'source': self.source,
-            'summary': self.summary,
-            'keywords': self.keywords,
-            'authors': self.authors,
-            'content': self.content
-        }
-    
+    title: str
+    link: str
+    date: Optional[datetime]
+    source: str
+    content: str
+    img: Optional[str] = None
+    summary: Optional[str] = None
+    keywords: List[str] = field(default_factory=list)
+    authors: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if self.date is not None:
+            raw, self.date = self.date, parse_date(self.date)
+            if self.date is None and isinstance(raw, str) and raw.strip():
+                logger.warning("Unparseable date %r for article %s (%s)", raw, self.link, self.source)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def to_json(self) -> bytes:
+        """One JSON object, UTF-8 encoded, without the trailing newline."""
+        if orjson is not None:
+            return orjson.dumps(self)
+        return ('{' + ','.join(f'"{name}":{_json_value(getattr(self, name))}' for name in FIELDS) + '}').encode('utf-8')
+
+    @classmethod
+    def from_json(cls, line) -> "Article":
+        return cls(**(orjson.loads(line) if orjson is not None else json.loads(line)))
+
+    def to_msgpack(self) -> bytes:
+        out = bytearray((0x90 | len(FIELDS),))
+        for name in FIELDS:
+            _pack(out, getattr(self, name))
+        return bytes(out)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "Article":
+        return _read_article(io.BytesIO(data))
+
     def gen_summary(self):
         """Génère un résumé de l'article en utilisant un modèle de langage."""
         pass
@@ -44,3 +88,128 @@ class Article:
     def categorize(self):
         """Catégorise l'article en utilisant un modèle de langage."""
         pass
+
+
+FIELDS = tuple(f.name for f in fields(Article))
+
+
+def write_jsonl(articles: Iterable[Article], file: BinaryIO) -> int:
+    """Write `articles` to a binary file, one JSON object per line."""
+    count = 0
+    for article in articles:
+        file.write(article.to_json() + b'\n')
+        count += 1
+    return count
+
+
+def read_jsonl(file: BinaryIO) -> Iterator[Article]:
+    for line in file:
+        if line.strip():
+            yield Article.from_json(line)
+
+
+def write_msgpack(articles: Iterable[Article], file: BinaryIO) -> int:
+    """Write `articles` to a binary file as a stream of MessagePack records."""
+    count = 0
+    for article in articles:
+        file.write(article.to_msgpack())
+        count += 1
+    return count
+
+
+def read_msgpack(file: BinaryIO) -> Iterator[Article]:
+    while True:
+        article = _read_article(file)
+        if article is None:
+            return
+        yield article
+
+
+def _json_value(value) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if isinstance(value, datetime):
+        return f'"{value.isoformat()}"'
+    return '[' + ','.join(map(encode_basestring, value)) + ']'
+
+
+# Encodage MessagePack (https://github.com/msgpack/msgpack/blob/master/spec.md)
+
+def _pack(out: bytearray, value):
+    if value is None:
+        out.append(0xc0)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        size = len(data)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 0x100:
+            out += struct.pack('>BB', 0xd9, size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xda, size)
+        else:
+            out += struct.pack('>BI', 0xdb, size)
+        out += data
+    elif isinstance(value, datetime):
+        # Extension timestamp (type -1) ; les dates naïves sont en UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        delta = value - EPOCH
+        seconds, nanoseconds = delta.days * 86400 + delta.seconds, delta.microseconds * 1000
+        if 0 <= seconds < 1 << 34:
+            out += struct.pack('>BbQ', 0xd7, -1, nanoseconds << 34 | seconds)
+        else:
+            out += struct.pack('>BBbIq', 0xc7, 12, -1, nanoseconds, seconds)
+    else:
+        size = len(value)
+        if size < 16:
+            out.append(0x90 | size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xdc, size)
+        else:
+            out += struct.pack('>BI', 0xdd, size)
+        for item in value:
+            _pack(out, item)
+
+
+def _read(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated MessagePack record")
+    return data
+
+
+def _unpack(file: BinaryIO, code: int):
+    if code == 0xc0:
+        return None
+    if 0xa0 <= code <= 0xbf or code in (0xd9, 0xda, 0xdb):
+        if code <= 0xbf:
+            size = code & 0x1f
+        else:
+            size = int.from_bytes(_read(file, 1 << (code - 0xd9)), 'big')
+        return _read(file, size).decode('utf-8')
+    if 0x90 <= code <= 0x9f or code in (0xdc, 0xdd):
+        size = code & 0x0f if code <= 0x9f else int.from_bytes(_read(file, 2 if code == 0xdc else 4), 'big')
+        return [_unpack(file, _read(file, 1)[0]) for _ in range(size)]
+    if code == 0xd7:
+        ext_type, value = struct.unpack('>bQ', _read(file, 9))
+        seconds, nanoseconds = value & ((1 << 34) - 1), value >> 34
+    elif code == 0xc7:
+        size, ext_type, nanoseconds, seconds = struct.unpack('>BbIq', _read(file, 14))
+    else:
+        raise ValueError(f"Unsupported MessagePack type 0x{code:02x}")
+    if ext_type != -1:
+        raise ValueError(f"Unsupported MessagePack extension {ext_type}")
+    return EPOCH + timedelta(seconds=seconds, microseconds=nanoseconds // 1000)
+
+
+def _read_article(file: BinaryIO) -> Optional[Article]:
+    """Decode the next record of `file`, or return None at the end of the stream."""
+    header = file.read(1)
+    if not header:
+        return None
+    if header[0] != 0x90 | len(FIELDS):
+        raise ValueError("Not an article record")
+    return Article(*(_unpack(file, _read(file, 1)[0]) for _ in FIELDS))
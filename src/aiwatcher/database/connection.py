@@ -0,0 +1,54 @@
+"""Database engine and session factory.
+
+The engine is created lazily from `settings.DATABASE_URL`, so importing this
+module does not require the database driver. PostgreSQL connections go
+through a pre-pinged, recycled `QueuePool` sized by `DB_POOL_SIZE` and
+`DB_MAX_OVERFLOW`; SQLite URLs (used locally and in tests) keep SQLAlchemy's
+default pool.
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from aiwatcher.core.config import settings
+
+
+def build_engine(url: Optional[str] = None) -> Engine:
+    """Create an engine for `url` (defaults to `settings.DATABASE_URL`)."""
+    url = url or settings.DATABASE_URL
+    if url.startswith('sqlite'):
+        return create_engine(url)
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Return the process-wide engine."""
+    return build_engine()
+
+
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autoflush=False, expire_on_commit=False)
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Provide a transactional session, committed on success and rolled back on error."""
+    session = get_sessionmaker()()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,56 @@
+"""Alembic environment.
+
+Migrations run against `settings.DATABASE_URL` and compare the database with
+the ORM models of `database/models.py`:
+
+    alembic upgrade head
+    alembic revision --autogenerate -m "..."
+"""
+
+from logging.config import fileConfig
+from alembic import context
+from aiwatcher.core.config import settings
+from aiwatcher.database.connection import build_engine
+from aiwatcher.database.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Les index de recherche plein texte sont gérés par database/search.py
+    return not (reflected and compare_to is None and name and 'search' in name)
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = build_engine()
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == 'sqlite',
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
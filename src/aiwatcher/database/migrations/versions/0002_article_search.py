@@ -0,0 +1,29 @@
+"""article full-text search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 20:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from aiwatcher.database.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the tsvector columns and GIN indexes (PostgreSQL) or the FTS5 table (SQLite)."""
+    create_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    """Drop the full-text search index."""
+    drop_search_index(op.get_bind())
@@ -0,0 +1,38 @@
+"""descending keyset indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Match the cursor indexes to `published_date DESC NULLS LAST, id DESC`."""
+    # SQLite refuse NULLS LAST dans un index, mais y range déjà les NULL en dernier
+    nulls = ' NULLS LAST' if op.get_bind().dialect.name == 'postgresql' else ''
+    op.drop_index('ix_articles_source_published_date_id', table_name='articles')
+    op.drop_index('ix_articles_published_date_id', table_name='articles')
+    op.create_index('ix_articles_published_date_id', 'articles',
+                    [sa.text(f'published_date DESC{nulls}'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_articles_source_published_date_id', 'articles',
+                    ['source', sa.text(f'published_date DESC{nulls}'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Restore the ascending cursor indexes."""
+    op.drop_index('ix_articles_source_published_date_id', table_name='articles')
+    op.drop_index('ix_articles_published_date_id', table_name='articles')
+    op.create_index('ix_articles_published_date_id', 'articles', ['published_date', 'id'], unique=False)
+    op.create_index('ix_articles_source_published_date_id', 'articles', ['source', 'published_date', 'id'], unique=False)
@@ -1,11 +1,13 @@
 """SQLAlchemy ORM models for the aiwatcher database.
 
-Defines the main data structures for articles, summaries, entities, daily digests, and trends.
+Defines the main data structures for articles, summaries, entities, daily digests, and trends,
+the MinHash fingerprints used to link near-duplicate articles, and the daily counters from which
+digests and trends are maintained.
 """
 
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import String, Text, Integer, Float, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import String, Text, Integer, Float, DateTime, Boolean, JSON, ForeignKey, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 class Base(DeclarativeBase):
@@ -45,6 +47,9 @@ class Article(Base):
     is_processed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
     quality_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
+    # Quasi-doublons : article canonique du groupe (NULL pour l'article canonique)
+    canonical_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('articles.id'), nullable=True, index=True)
+
     # Timestamps
     created_date: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now, nullable=False)
@@ -55,6 +60,18 @@ class Article(Base):
     summaries: Mapped[List["Summary"]] = relationship("Summary", back_populates="article", cascade="all, delete-orphan")
     entities: Mapped[List["Entity"]] = relationship("Entity", back_populates="article", cascade="all, delete-orphan")
 
+# Pagination par curseur, dans l'ordre de `list_articles()` : published_date DESC
+# NULLS LAST, id DESC. SQLite refuse NULLS LAST dans un index mais range déjà
+# les NULL en dernier dans l'ordre décroissant.
+Index('ix_articles_published_date_id',
+      Article.published_date.desc().nulls_last(), Article.id.desc()).ddl_if(dialect='postgresql')
+Index('ix_articles_source_published_date_id',
+      Article.source, Article.published_date.desc().nulls_last(), Article.id.desc()).ddl_if(dialect='postgresql')
+Index('ix_articles_published_date_id',
+      Article.published_date.desc(), Article.id.desc()).ddl_if(dialect='sqlite')
+Index('ix_articles_source_published_date_id',
+      Article.source, Article.published_date.desc(), Article.id.desc()).ddl_if(dialect='sqlite')
+
 class Summary(Base):
     """Summarization results for an article, including different summary lengths and key points."""
     __tablename__ = "summaries"
@@ -125,6 +142,43 @@ class Entity(Base):
     # Relations
     article: Mapped["Article"] = relationship("Article", back_populates="entities")
 
+class ArticleFingerprint(Base):
+    """MinHash signature of an article's content."""
+    __tablename__ = "article_fingerprints"
+
+    article_id: Mapped[int] = mapped_column(Integer, ForeignKey('articles.id'), primary_key=True)
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+class LSHBucket(Base):
+    """LSH band key of an article, looked up to find near-duplicate candidates."""
+    __tablename__ = "lsh_buckets"
+
+    key: Mapped[str] = mapped_column(String(40), primary_key=True)
+    article_id: Mapped[int] = mapped_column(Integer, ForeignKey('articles.id'), primary_key=True, index=True)
+
+class ArticleAggregate(Base):
+    """Day, source and category under which an article is counted in the digests and trends."""
+    __tablename__ = "article_aggregates"
+
+    article_id: Mapped[int] = mapped_column(Integer, ForeignKey('articles.id'), primary_key=True)
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    source: Mapped[str] = mapped_column(String(50), nullable=False)
+    category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+
+class DailyMention(Base):
+    """Number of mentions of a keyword on a given day."""
+    __tablename__ = "daily_mentions"
+    __table_args__ = (
+        # Fenêtres glissantes d'un mot-clé
+        Index('ix_daily_mentions_category_keyword_date', 'category', 'keyword', 'date'),
+    )
+
+    date: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    keyword: Mapped[str] = mapped_column(String(255), primary_key=True)
+    mentions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    articles: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
 class DailyDigest(Base):
     """Aggregated daily statistics and highlights for ingested articles."""
     __tablename__ = "daily_digests"
@@ -155,6 +209,9 @@ class DailyDigest(Base):
 class Trend(Base):
     """Tracks trending keywords and their statistics over time."""
     __tablename__ = "trends"
+    __table_args__ = (
+        UniqueConstraint('keyword', 'category', name='uq_trends_keyword_category'),
+    )
 
     # Identifiants
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -0,0 +1,118 @@
+"""Full-text search index of the articles.
+
+PostgreSQL: `articles.search_vector` and `summaries.search_vector` are
+generated `tsvector` columns (title weighted A, content and summaries B),
+each with a GIN index, so matching a query never scans the Text columns.
+
+SQLite (local runs and tests): the `article_search` FTS5 table holds the
+title, content and summaries of each article (rowid = article id) and is
+kept in sync by triggers on `articles` and `summaries`.
+
+The index is created by the `0002` Alembic migration; `create_search_index()`
+does the same for databases created with `Base.metadata.create_all()`.
+"""
+
+from typing import Dict, List
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(cleaned_content, raw_content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_articles_search_vector ON articles USING GIN (search_vector)",
+    """
+    ALTER TABLE summaries ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(short_summary, '') || ' ' || coalesce(medium_summary, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(long_summary, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_summaries_search_vector ON summaries USING GIN (search_vector)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_summaries_search_vector",
+    "ALTER TABLE summaries DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS ix_articles_search_vector",
+    "ALTER TABLE articles DROP COLUMN IF EXISTS search_vector",
+]
+
+# Ligne FTS d'un article, résumés compris
+_SQLITE_ROW = """
+    INSERT INTO article_search (rowid, title, content, summary)
+    SELECT a.id, a.title, coalesce(a.cleaned_content, a.raw_content, ''),
+           coalesce((SELECT group_concat(coalesce(s.medium_summary, '') || ' ' || coalesce(s.long_summary, ''), ' ')
+                     FROM summaries s WHERE s.article_id = a.id), '')
+    FROM articles a WHERE a.id = {article_id};
+"""
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5(title, content, summary, tokenize = 'porter unicode61')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS article_search_insert AFTER INSERT ON articles BEGIN
+        {_SQLITE_ROW.format(article_id='new.id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS article_search_update AFTER UPDATE OF title, raw_content, cleaned_content ON articles BEGIN
+        DELETE FROM article_search WHERE rowid = old.id;
+        {_SQLITE_ROW.format(article_id='new.id')}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS article_search_delete AFTER DELETE ON articles BEGIN
+        DELETE FROM article_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS summary_search_insert AFTER INSERT ON summaries BEGIN
+        DELETE FROM article_search WHERE rowid = new.article_id;
+        {_SQLITE_ROW.format(article_id='new.article_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS summary_search_update AFTER UPDATE ON summaries BEGIN
+        DELETE FROM article_search WHERE rowid = old.article_id;
+        {_SQLITE_ROW.format(article_id='old.article_id')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS summary_search_delete AFTER DELETE ON summaries BEGIN
+        DELETE FROM article_search WHERE rowid = old.article_id;
+        {_SQLITE_ROW.format(article_id='old.article_id')}
+    END
+    """,
+    # Indexe les articles déjà présents
+    """
+    INSERT INTO article_search (rowid, title, content, summary)
+    SELECT a.id, a.title, coalesce(a.cleaned_content, a.raw_content, ''),
+           coalesce((SELECT group_concat(coalesce(s.medium_summary, '') || ' ' || coalesce(s.long_summary, ''), ' ')
+                     FROM summaries s WHERE s.article_id = a.id), '')
+    FROM articles a WHERE a.id NOT IN (SELECT rowid FROM article_search)
+    """,
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS summary_search_delete",
+    "DROP TRIGGER IF EXISTS summary_search_update",
+    "DROP TRIGGER IF EXISTS summary_search_insert",
+    "DROP TRIGGER IF EXISTS article_search_delete",
+    "DROP TRIGGER IF EXISTS article_search_update",
+    "DROP TRIGGER IF EXISTS article_search_insert",
+    "DROP TABLE IF EXISTS article_search",
+]
+
+SEARCH_DDL: Dict[str, List[str]] = {'postgresql': POSTGRES_DDL, 'sqlite': SQLITE_DDL}
+SEARCH_DROP: Dict[str, List[str]] = {'postgresql': POSTGRES_DROP, 'sqlite': SQLITE_DROP}
+
+
+def create_search_index(conn):
+    """Create the full-text index for the dialect of `conn` (idempotent)."""
+    for statement in SEARCH_DDL[conn.dialect.name]:
+        conn.exec_driver_sql(statement)
+
+
+def drop_search_index(conn):
+    for statement in SEARCH_DROP[conn.dialect.name]:
+        conn.exec_driver_sql(statement)
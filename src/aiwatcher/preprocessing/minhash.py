@@ -0,0 +1,70 @@
+"""MinHash signatures and LSH band keys for near-duplicate detection.
+
+A text is reduced to its set of word shingles (`shingle_size` consecutive
+words). `MinHasher` maps that set to `num_perm` minimum hash values; the share
+of equal values between two signatures estimates the Jaccard similarity of
+the two shingle sets.
+
+For LSH the signature is cut into `bands` bands of `num_perm / bands` rows.
+Two texts share at least one band key with a probability that rises sharply
+around a similarity of `(1 / bands) ** (bands / num_perm)`, so looking up the
+keys of a new text only returns likely near-duplicates.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import List, Set
+import numpy as np
+
+WORD_RE = re.compile(r'\w+')
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int = 5) -> Set[str]:
+    """Return the set of lowercased `size`-word shingles of a text."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Vectorized MinHash over `num_perm` random affine hash functions."""
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Graine fixe : les signatures restent comparables d'un processus à l'autre
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, (1 << 32) - 1, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, (1 << 32) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text, as `num_perm` uint32 values."""
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64,
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        # (a * h + b) mod p pour toutes les permutations et tous les shingles à la fois
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        """LSH bucket keys of a signature, one per band."""
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.mean(first == second))
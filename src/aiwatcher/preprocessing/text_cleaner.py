@@ -0,0 +1,200 @@
+"""HTML-to-text extraction shared by all the scrapers.
+
+Scrapy already parses every response with lxml (`response.selector`), so the
+extractor works on that tree instead of re-parsing the page with
+BeautifulSoup. It keeps only the main content of the page:
+
+1. the first per-source CSS selector from `SCRAPERS_CONFIG[...]['content_selectors']`
+   that matches is used as the content root;
+2. otherwise the element holding the most paragraph text is chosen, in the
+   spirit of readability;
+3. navigation, headers, footers, scripts and other boilerplate elements are
+   skipped while the text is collected, and whitespace is collapsed.
+
+`clean_text()` normalizes the stored content of an article before it goes
+through the models: HTML is reduced to its main text, leftover entities are
+unescaped, the text is NFKC-normalized (ligatures, full-width forms,
+non-breaking spaces), control and zero-width characters are dropped and
+whitespace is collapsed.
+
+`preprocess_texts()` is the batch entry point of the processing job: it
+cleans a list of raw texts and computes the `Article` columns derived from
+them (`word_count`, `reading_time`, `language`), and optionally their token
+ids with a single batched call to a fast tokenizer. ASCII texts, the vast
+majority, skip the Unicode normalization.
+"""
+
+import html
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from parsel import Selector
+from aiwatcher.preprocessing.tokenizer import encode_batch
+from aiwatcher.preprocessing.utils import detect_language, reading_time
+
+# Éléments jamais considérés comme du contenu
+BOILERPLATE_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'nav', 'header', 'footer',
+    'aside', 'form', 'button', 'select', 'svg', 'iframe', 'canvas', 'head',
+})
+# Conteneurs usuels du contenu principal, essayés avant l'heuristique
+MAIN_CONTENT_SELECTORS = ('article', 'main', '[role="main"]')
+PARAGRAPH_TAGS = ('p', 'pre', 'li', 'blockquote')
+# Longueur minimale (caractères) pour qu'un conteneur soit retenu
+MIN_CONTENT_LENGTH = 200
+
+WHITESPACE_RE = re.compile(r'\s+')
+HTML_RE = re.compile(r'<(?:html|body|article|div|p|br)\b', re.IGNORECASE)
+ENTITY_RE = re.compile(r'&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z]+);')
+# Caractères de contrôle (hors blancs), de largeur nulle et traits d'union conditionnels
+INVISIBLE_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f\xad\u200b-\u200d\u2060\ufeff]')
+
+
+def iter_text(element) -> Iterator[str]:
+    """Yield the text fragments of an lxml element, skipping boilerplate subtrees."""
+    stack = [(element, False)]
+    while stack:
+        node, emit_tail = stack.pop()
+        if emit_tail:
+            if node.tail:
+                yield node.tail
+            continue
+
+        tag = node.tag
+        # Les commentaires et instructions ont un tag non textuel
+        if not isinstance(tag, str) or tag in BOILERPLATE_TAGS:
+            if node is not element and node.tail:
+                yield node.tail
+            continue
+
+        if node.text:
+            yield node.text
+        if node is not element:
+            stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node))
+
+
+def element_text(element) -> str:
+    """Return the whitespace-normalized text of an element."""
+    return WHITESPACE_RE.sub(' ', ' '.join(iter_text(element))).strip()
+
+
+def _paragraph_length(node) -> int:
+    return sum(len(text.strip()) for text in iter_text(node))
+
+
+def find_main_content(root):
+    """Guess the element holding the main text of a page.
+
+    Paragraph-like elements vote for their parent with the length of their
+    text, and for their grandparent with half of it; the element with the
+    highest score wins.
+    """
+    scores = {}
+    for paragraph in root.iter(*PARAGRAPH_TAGS):
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        length = _paragraph_length(paragraph)
+        scores[parent] = scores.get(parent, 0) + length
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + length / 2
+
+    if not scores:
+        return None
+    best, score = max(scores.items(), key=lambda entry: entry[1])
+    return best if score >= MIN_CONTENT_LENGTH else None
+
+
+def extract_main_text(
+    page: Union[Selector, str],
+    selectors: Sequence[str] = (),
+) -> str:
+    """Extract the main text of an HTML page.
+
+    `page` is either the `Selector` of a Scrapy response, which avoids parsing
+    the HTML a second time, or a raw HTML string.
+    """
+    selector = Selector(text=page) if isinstance(page, str) else page
+
+    for css in (*selectors, *MAIN_CONTENT_SELECTORS):
+        match = selector.css(css)
+        if match:
+            text = element_text(match[0].root)
+            if len(text) >= MIN_CONTENT_LENGTH or css in selectors:
+                return text
+
+    root = selector.root
+    main = find_main_content(root)
+    return element_text(main if main is not None else root)
+
+
+def html_to_text(html: str, selectors: Optional[Sequence[str]] = None) -> str:
+    """Extract the main text of a raw HTML string."""
+    if not html or not html.strip():
+        return ''
+    return extract_main_text(html, selectors or ())
+
+
+def normalize_unicode(text: str) -> str:
+    """Unescape leftover HTML entities, NFKC-normalize and drop invisible characters."""
+    if '&' in text:
+        text = ENTITY_RE.sub(lambda match: html.unescape(match.group()), text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    return INVISIBLE_RE.sub('', text)
+
+
+def clean_text(text: Optional[str]) -> str:
+    """Normalize an article text: HTML is reduced to its main text, Unicode normalized and whitespace collapsed."""
+    if not text:
+        return ''
+    if HTML_RE.search(text):
+        text = html_to_text(text)
+    return WHITESPACE_RE.sub(' ', normalize_unicode(text)).strip()
+
+
+def clean_texts(texts: Sequence[Optional[str]]) -> List[str]:
+    return [clean_text(text) for text in texts]
+
+
+@dataclass
+class CleanedText:
+    """A cleaned text and the `Article` columns derived from it."""
+    cleaned_content: str
+    word_count: int
+    reading_time: int
+    language: str
+    input_ids: Optional[List[int]] = None
+
+    def columns(self) -> Dict[str, Any]:
+        return {
+            'cleaned_content': self.cleaned_content,
+            'word_count': self.word_count,
+            'reading_time': self.reading_time,
+            'language': self.language,
+        }
+
+
+def preprocess_texts(
+    texts: Sequence[Optional[str]],
+    tokenizer=None,
+    max_tokens: Optional[int] = None,
+) -> List[CleanedText]:
+    """Clean a batch of raw texts and compute their statistics; used as a process-pool task by the batch job.
+
+    With a `tokenizer`, the token ids of the cleaned texts are computed in one
+    batched call.
+    """
+    results = []
+    for text in texts:
+        cleaned = clean_text(text)
+        # Les blancs sont réduits à une espace : une espace sépare deux mots
+        words = cleaned.count(' ') + 1 if cleaned else 0
+        results.append(CleanedText(cleaned, words, reading_time(words), detect_language(cleaned)))
+    if tokenizer is not None:
+        for result, ids in zip(results, encode_batch(tokenizer, [result.cleaned_content for result in results], max_tokens)):
+            result.input_ids = ids
+    return results
@@ -0,0 +1,214 @@
+"""Tokenization helpers built on Hugging Face tokenizers.
+
+`encode_batch()` tokenizes a list of texts in a single call, which fast
+tokenizers run in parallel in Rust; it is much faster than one call per text
+on large batches.
+
+`encode_texts()` returns the token ids and character offsets of whole texts
+(`Encoding`), the form from which the models build their inputs. Given a
+`TokenStore`, encodings are looked up by `(tokenizer, content hash)` first and
+only the missing texts are tokenized, so a second pass over the same corpus
+does not tokenize anything. The store is a SQLite file holding the ids as
+uint16 (uint32 for vocabularies above 65536 tokens) and the offsets as uint32
+blobs, read back with `np.frombuffer` without copying.
+
+`chunk_text()` splits a long article into pieces that fit a model context.
+The tokens of the text are grouped by sentence and packed greedily into
+chunks of at most `max_tokens` tokens, so that chunks end on sentence
+boundaries; a sentence longer than a whole chunk is cut on token boundaries.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from aiwatcher.preprocessing.utils import compute_content_hash
+
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS encodings (
+    tokenizer TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    id_bytes INTEGER NOT NULL,
+    ids BLOB NOT NULL,
+    offsets BLOB NOT NULL,
+    PRIMARY KEY (tokenizer, content_hash)
+) WITHOUT ROWID
+"""
+# Nombre de paramètres par requête (limite de SQLite)
+LOOKUP_BATCH = 500
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in SENTENCE_RE.split(text) if sentence.strip()]
+
+
+@dataclass
+class Encoding:
+    """Token ids of a whole text (without special tokens) and their `(start, end)` character offsets."""
+    ids: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def tokenizer_name(tokenizer) -> str:
+    return tokenizer.name_or_path
+
+
+class TokenStore:
+    """SQLite-backed store of text encodings, keyed on the tokenizer and the content hash."""
+
+    def __init__(self, path: str):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Partagé par les threads du traitement par lots
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def get_many(self, tokenizer: str, content_hashes: Iterable[str]) -> Dict[str, Encoding]:
+        content_hashes = list(content_hashes)
+        found = {}
+        with self.lock:
+            for start in range(0, len(content_hashes), LOOKUP_BATCH):
+                batch = content_hashes[start:start + LOOKUP_BATCH]
+                rows = self.conn.execute(
+                    'SELECT content_hash, id_bytes, ids, offsets FROM encodings '
+                    f'WHERE tokenizer = ? AND content_hash IN ({", ".join("?" * len(batch))})',
+                    (tokenizer, *batch),
+                )
+                for content_hash, id_bytes, ids, offsets in rows:
+                    found[content_hash] = Encoding(
+                        np.frombuffer(ids, dtype=np.uint16 if id_bytes == 2 else np.uint32),
+                        np.frombuffer(offsets, dtype=np.uint32).reshape(-1, 2),
+                    )
+        return found
+
+    def put_many(self, tokenizer: str, encodings: Dict[str, Encoding]):
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO encodings (tokenizer, content_hash, id_bytes, ids, offsets) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (tokenizer, content_hash, encoding.ids.itemsize, encoding.ids.tobytes(), encoding.offsets.tobytes())
+                    for content_hash, encoding in encodings.items()
+                ],
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+_store: Optional[TokenStore] = None
+_store_lock = threading.Lock()
+
+
+def get_token_store() -> Optional[TokenStore]:
+    """Return the process-wide token store, or None when `TOKEN_STORE_ENABLED` is off."""
+    from aiwatcher.core.config import settings
+
+    global _store
+    if not settings.TOKEN_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = TokenStore(settings.TOKEN_STORE_PATH)
+        return _store
+
+
+def encode_batch(tokenizer, texts: Sequence[str], max_tokens: Optional[int] = None) -> List[List[int]]:
+    """Token ids of each text, without special tokens, truncated to `max_tokens` if given."""
+    if not texts:
+        return []
+    return tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        truncation=max_tokens is not None,
+        max_length=max_tokens,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+    )['input_ids']
+
+
+def encode_texts(tokenizer, texts: Sequence[str], store: Optional[TokenStore] = None) -> List[Encoding]:
+    """Encodings of whole texts, read from `store` when known and tokenized in one batch otherwise."""
+    hashes = [compute_content_hash(text) for text in texts]
+    name = tokenizer_name(tokenizer)
+    found = store.get_many(name, set(hashes)) if store is not None else {}
+
+    missing = {content_hash: text for content_hash, text in zip(hashes, texts) if content_hash not in found}
+    if missing:
+        dtype = np.uint16 if len(tokenizer) <= 1 << 16 else np.uint32
+        encoded = tokenizer(
+            list(missing.values()),
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        computed = {
+            content_hash: Encoding(np.asarray(ids, dtype=dtype), np.asarray(offsets, dtype=np.uint32).reshape(-1, 2))
+            for content_hash, ids, offsets in zip(missing, encoded['input_ids'], encoded['offset_mapping'])
+        }
+        if store is not None:
+            store.put_many(name, computed)
+        found.update(computed)
+    return [found[content_hash] for content_hash in hashes]
+
+
+def chunk_token_ids(input_ids: Sequence[int], max_tokens: int, overlap: int = 0) -> List[List[int]]:
+    """Cut a token sequence into windows of `max_tokens`, overlapping by `overlap` tokens."""
+    if max_tokens <= overlap:
+        raise ValueError("max_tokens must be greater than overlap")
+    step = max_tokens - overlap
+    chunks = []
+    for start in range(0, len(input_ids), step):
+        chunks.append(list(input_ids[start:start + max_tokens]))
+        if start + max_tokens >= len(input_ids):
+            break
+    return chunks
+
+
+def sentence_token_ids(text: str, encoding: Encoding) -> List[List[int]]:
+    """Split the token ids of a text by sentence, using their character offsets."""
+    if not len(encoding):
+        return []
+    starts = np.array([0] + [match.end() for match in SENTENCE_RE.finditer(text)])
+    sentences = np.searchsorted(starts, encoding.offsets[:, 0], side='right')
+    cuts = np.flatnonzero(np.diff(sentences)) + 1
+    return [piece.tolist() for piece in np.split(encoding.ids, cuts)]
+
+
+def chunk_text(text: str, tokenizer, max_tokens: int, store: Optional[TokenStore] = None) -> List[List[int]]:
+    """Split a text into model inputs of at most `max_tokens` tokens.
+
+    Returns token ids including the special tokens of the tokenizer, ready
+    to be padded and fed to the model.
+    """
+    budget = max_tokens - tokenizer.num_special_tokens_to_add()
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    for ids in sentence_token_ids(text, encode_texts(tokenizer, [text], store)[0]):
+        if len(ids) > budget:
+            pieces = chunk_token_ids(ids, budget)
+        else:
+            pieces = [ids]
+        for piece in pieces:
+            if current and len(current) + len(piece) > budget:
+                chunks.append(current)
+                current = []
+            current.extend(piece)
+    if current:
+        chunks.append(current)
+
+    return [tokenizer.build_inputs_with_special_tokens(chunk) for chunk in chunks]
@@ -0,0 +1,93 @@
+"""Small helpers shared by the preprocessing steps."""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+
+def compute_content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of a text, as stored in `Article.content_hash`."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+# Formats de date rencontrés sur les sources scrapées
+DATE_FORMATS = (
+    '%a, %d %b %Y',
+    '%d %b %Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%b. %d, %Y',
+    '%Y-%m-%d',
+    '%B %Y',
+)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Les dates sont stockées naïves, en UTC
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_date(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse a date scraped from a listing page, or return None if it is unknown."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return _naive_utc(value)
+    value = value.strip()
+    try:
+        return _naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+# Vitesse de lecture utilisée pour `Article.reading_time` (mots par minute)
+WORDS_PER_MINUTE = 200
+
+
+def reading_time(word_count: int) -> int:
+    """Estimated reading time in minutes, at least one minute for a non-empty text."""
+    return math.ceil(word_count / WORDS_PER_MINUTE) if word_count else 0
+
+
+# Mots vides les plus fréquents de chaque langue reconnue
+LANGUAGE_STOPWORDS = {
+    'en': frozenset('the and of to in is that for it with as was on are be by this from or an which have not but at'.split()),
+    'fr': frozenset('le la les de des du et un une est que qui dans pour pas sur au avec ce il elle sont par plus'.split()),
+    'de': frozenset('der die das und ist nicht ein eine zu den mit sich des auf für im dem von sie es auch wird'.split()),
+    'es': frozenset('el la los las de del y en que un una es por con para se no al lo como más su'.split()),
+    'it': frozenset('il lo la gli le di del della e che un una è per non con sono si da al nel più'.split()),
+    'pt': frozenset('o a os as de do da e que um uma é em para com não por se na no mais dos'.split()),
+    'nl': frozenset('de het een en van is dat niet in op te zijn met voor die er aan ook als'.split()),
+}
+WORD_RE = re.compile(r'[^\W\d_]+')
+# Nombre de caractères examinés, et de mots vides requis pour conclure
+LANGUAGE_SAMPLE_CHARS = 2000
+LANGUAGE_MIN_HITS = 3
+
+
+def detect_language(text: str, default: str = 'en') -> str:
+    """Guess the language of a text from its most frequent function words.
+
+    Only the first `LANGUAGE_SAMPLE_CHARS` characters are read; `default` is
+    returned when too few function words are found to decide.
+    """
+    words = Counter(WORD_RE.findall(text[:LANGUAGE_SAMPLE_CHARS].lower()))
+    if not words:
+        return default
+    scores = {
+        language: sum(words[word] for word in stopwords)
+        for language, stopwords in LANGUAGE_STOPWORDS.items()
+    }
+    language, hits = max(scores.items(), key=lambda entry: entry[1])
+    return language if hits >= LANGUAGE_MIN_HITS else default
@@ -1,14 +1,10 @@
-from typing import List
-import scrapy
-import requests
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class ArxivScraper(scrapy.Spider):
+class ArxivScraper(BaseScraper):
     name = name = SCRAPERS_CONFIG['arxiv']['source'] + "_scraper"
+    config_key = 'arxiv'
     start_urls = SCRAPERS_CONFIG['arxiv'].get('start_urls', ['https://research.google/blog/label/generative-ai/'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -39,6 +35,9 @@ class ArxivScraper(scrapy.Spider):
         all_articles = container.css('dd')
 
         for article in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 # Extraire le titre
                 title = article.css('div.list-title.mathjax::text').getall()
@@ -65,31 +64,15 @@ class ArxivScraper(scrapy.Spider):
                 # Extraire les auteurs
                 authors = article.css('div.list-authors a::text').getall()
 
-                content = BeautifulSoup(requests.get(link, timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-
-                self.articles.append(Article(
-                    title=title,
-                    link=link,
-                    date=date,
-                    keywords=keywords,
-                    source=self.source,
-                    content=content,
-                    authors=authors,
-                ).to_dict())
-
-                if len(self.articles) >= self.max_articles:
-                    return
-
-                yield {
+                # Le contenu complet est téléchargé de façon asynchrone
+                yield self.follow_article(response, link, article={
                     'title': title,
                     'link': link,
                     'date': date,
                     'keywords': keywords,
                     'source': self.source,
-                    'content': content,
                     'authors': authors,
-                    'article_id': article_id
-                }
+                })
 
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
@@ -100,6 +83,8 @@ if __name__ == "__main__":
 
     process = CrawlerProcess(
         settings = {
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/arxiv_ai_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -114,7 +99,4 @@ if __name__ == "__main__":
     process.crawl(ArxivScraper)
     process.start()
 
-    with open('data/raw/arxiv_ai_articles.json', 'w') as f:
-        import json
-        json.dump(ArxivScraper.articles, f, indent=4)
-        print(f"Saved {len(ArxivScraper.articles)} articles to arxiv_ai_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/arxiv_ai_articles.jsonl")
@@ -0,0 +1,173 @@
+"""Base spider shared by all AIWatcher scrapers.
+
+Listing pages are parsed by each concrete spider, which then hands every
+article link to `follow_article()`. The article page is downloaded by Scrapy
+itself through a chained `scrapy.Request`, so article bodies from every source
+are fetched concurrently instead of blocking the Twisted reactor. Each article
+is yielded as an `Article` record (a slots dataclass, which Scrapy handles as
+an item) and written out by the item pipelines (see `pipelines.py`) as soon as it is scraped.
+
+Each spider names its `SCRAPERS_CONFIG` entry in `config_key`; the rate,
+concurrency and timeout of that entry are applied to its crawler.
+
+When `settings.CRAWL_INCREMENTAL` is set, article pages are checked against
+the persistent `SeenIndex` before being requested: recently crawled pages are
+skipped, older ones are revalidated with a conditional GET, and pages whose
+content hash did not change are not emitted again. A page is recorded in the
+index only once its item went through every pipeline (`item_scraped`), so an
+article lost on the way is fetched again by the next crawl.
+
+`max_articles` bounds the articles a spider emits: skipped and unchanged
+pages do not count, and the downloads in flight hold a slot until they end.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+import scrapy
+from scrapy import signals
+from aiwatcher.core.article import Article
+from aiwatcher.core.config import SCRAPERS_CONFIG, settings
+from aiwatcher.preprocessing.text_cleaner import extract_main_text
+from aiwatcher.preprocessing.utils import compute_content_hash
+from aiwatcher.scraper.rate_limiter import source_settings
+from aiwatcher.scraper.seen_index import SeenIndex
+
+
+class BaseScraper(scrapy.Spider):
+    """Common article-page handling for the listing spiders."""
+
+    config_key: str
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scraped_articles = 0
+        self.pending_articles = 0
+        self._seen: Optional[SeenIndex] = None
+        # Pages à inscrire dans l'index une fois leur item écrit, par id de l'item
+        self._unrecorded: Dict[int, Tuple[str, str, Optional[str], Optional[str]]] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.item_written, signal=signals.item_scraped)
+        crawler.signals.connect(spider.item_lost, signal=signals.item_dropped)
+        crawler.signals.connect(spider.item_lost, signal=signals.item_error)
+        return spider
+
+    @classmethod
+    def update_settings(cls, crawler_settings):
+        super().update_settings(crawler_settings)
+        crawler_settings.setdict(source_settings(SCRAPERS_CONFIG[cls.config_key]), priority='spider')
+
+    @property
+    def seen(self) -> Optional[SeenIndex]:
+        """Index of the pages already crawled, or None if crawling is not incremental."""
+        if self._seen is None and settings.CRAWL_INCREMENTAL:
+            self._seen = SeenIndex(settings.SEEN_INDEX_PATH, revisit_after=settings.REVISIT_AFTER_HOURS * 3600)
+        return self._seen
+
+    def closed(self, reason):
+        if self._seen is not None:
+            self._seen.close()
+
+    def has_capacity(self) -> bool:
+        """Return True while fewer than `max_articles` articles are emitted or downloading."""
+        return self.scraped_articles + self.pending_articles < self.max_articles
+
+    def follow_article(self,
+        response,
+        url: str,
+        article: Dict[str, Any],
+        fallback_content: Optional[str] = None,
+    ) -> Optional[scrapy.Request]:
+        """Build the request that downloads an article page.
+
+        `article` holds the `Article` fields known from the listing page. When
+        the download fails, `fallback_content` is used instead; if it is None
+        the article is dropped. Returns None when the page was crawled
+        recently.
+        """
+        url = response.urljoin(url)
+        headers = {}
+        if self.seen is not None:
+            if self.seen.is_fresh(url):
+                self.logger.debug(f"Skipping already crawled article {url}")
+                return None
+            headers = self.seen.conditional_headers(url)
+
+        self.pending_articles += 1
+        return response.follow(
+            url,
+            headers=headers,
+            callback=self.parse_article,
+            errback=self.article_failed,
+            cb_kwargs={'article': article},
+            meta={
+                'download_timeout': self.timeout,
+                'fallback_content': fallback_content,
+                'seen_url': url,
+                'handle_httpstatus_list': [304],
+            },
+        )
+
+    def extract_content(self, response) -> str:
+        """Extract the main text of an article page from the already parsed response."""
+        selectors = SCRAPERS_CONFIG[self.config_key].get('content_selectors', ())
+        return extract_main_text(response.selector, selectors)
+
+    def parse_article(self, response, article: Dict[str, Any]):
+        self.pending_articles -= 1
+        url = response.meta['seen_url']
+        if response.status == 304:
+            if self.seen is not None:
+                self.seen.touch(url)
+            return
+
+        try:
+            content = self.extract_content(response)
+        except Exception as e:
+            self.logger.error(f"Error parsing article {response.url}: {e}")
+            return
+
+        if self.seen is None:
+            yield self.build_item(article, content)
+            return
+        page = (url, compute_content_hash(content), self._header(response, 'ETag'), self._header(response, 'Last-Modified'))
+        if not self.seen.changed(url, page[1]):
+            # Article déjà écrit : seuls la date et les validateurs changent
+            self._record(page)
+            self.logger.debug(f"Content of {url} did not change")
+            return
+        item = self.build_item(article, content)
+        self._unrecorded[id(item)] = page
+        yield item
+
+    def item_written(self, item, response=None, spider=None):
+        """Record the page of an item in the seen index once the pipelines have written it."""
+        page = self._unrecorded.pop(id(item), None)
+        if page is not None and self.seen is not None:
+            self._record(page)
+
+    def item_lost(self, item, response=None, spider=None, **kwargs):
+        self._unrecorded.pop(id(item), None)
+
+    def _record(self, page: Tuple[str, str, Optional[str], Optional[str]]):
+        url, content_hash, etag, last_modified = page
+        self.seen.record(url, content_hash, etag=etag, last_modified=last_modified)
+
+    @staticmethod
+    def _header(response, name: str) -> Optional[str]:
+        value = response.headers.get(name)
+        return value.decode('latin-1') if value else None
+
+    def article_failed(self, failure):
+        self.pending_articles -= 1
+        request = failure.request
+        self.logger.warning(f"Could not fetch content for {request.url}: {failure.value}")
+        fallback_content = request.meta.get('fallback_content')
+        if fallback_content is None:
+            return
+        yield self.build_item(request.cb_kwargs['article'], fallback_content)
+
+    def build_item(self, article: Dict[str, Any], content: str) -> Article:
+        self.scraped_articles += 1
+        return Article(content=content, **article)
@@ -1,14 +1,11 @@
-from typing import List
 import scrapy
-import requests
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class BairScraper(scrapy.Spider):
+class BairScraper(BaseScraper):
     name = SCRAPERS_CONFIG['berkeley_ai']['source'] + "_scraper"
+    config_key = 'berkeley_ai'
     start_urls = SCRAPERS_CONFIG['berkeley_ai'].get('start_urls', ['https://bair.berkeley.edu/blog/'])
-    articles: List[Article] = []
 
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -40,6 +37,9 @@ class BairScraper(scrapy.Spider):
         all_articles = container.css('div.post')
 
         for a in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 title = a.css('h1.post-title a.post-link::text').get()
                 if title:
@@ -52,10 +52,6 @@ class BairScraper(scrapy.Spider):
                 date = a.css('span.post-meta::text').getall()
                 date = date[-1].strip() if date else ''
 
-                # Récupérer le contenu complet de l'article
-                content = BeautifulSoup(requests.get(link, timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-                content = ' '.join(content.split())
-
                 # Extraire les auteurs comme keywords
                 authors = [author.strip() for author in a.css('span.post-meta a::text').getall()]
                 keywords = authors if authors else []
@@ -65,45 +61,34 @@ class BairScraper(scrapy.Spider):
                 if img:
                     img = response.urljoin(img)
 
-                self.articles.append(Article(
-                    title=title,
-                    link=link,
-                    date=date,
-                    keywords=keywords,
-                    source=self.source,
-                    content=content,
-                    img=img
-                ).to_dict())
-
-                if len(self.articles) >= self.max_articles:
-                    return
-
-                yield {
+                # Le contenu complet est téléchargé de façon asynchrone
+                yield self.follow_article(response, link, article={
                     'title': title,
                     'link': link,
                     'date': date,
-                    'img': img,
                     'keywords': keywords,
                     'source': self.source,
-                    'content': content
-                }
+                    'img': img
+                })
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
 
         # Pagination - chercher le lien "Older"
         next_page = response.css('a.pagination-item:contains("Older")::attr(href)').get()
-        if next_page and len(self.articles) < self.max_articles:
+        if next_page and self.has_capacity():
             next_page = response.urljoin(next_page)
             yield scrapy.Request(next_page, callback=self.parse)
 
 if __name__ == "__main__":
     from scrapy.crawler import CrawlerProcess
     
-    process = CrawlerProcess()
+    process = CrawlerProcess(
+        settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/bair_ai_articles.jsonl',
+        }
+    )
     process.crawl(BairScraper)
     process.start()
-    
-    with open('data/raw/bair_ai_articles.json', 'w') as f:
-        import json
-        json.dump(BairScraper.articles, f, indent=4)
-        print(f"Saved {len(BairScraper.articles)} articles to bair_ai_articles.json")
\ No newline at end of file
+
+    print("Saved articles to data/raw/bair_ai_articles.jsonl")
@@ -1,3 +1,4 @@
+from typing import Optional
 from scrapy.crawler import CrawlerProcess
 from aiwatcher.scraper.arxiv_scraper import ArxivScraper
 from aiwatcher.scraper.papers_with_code_scraper import PapersWithCodeScraper
@@ -8,20 +9,35 @@ from aiwatcher.scraper.mit_news_scraper import MITNewsScraper
 from aiwatcher.scraper.stanford_hai_scraper import StanfordHAIScraper
 from aiwatcher.scraper.berkeley_ai_scraper import BairScraper
 from aiwatcher.scraper.meta_ai_scraper import MetaAIScraper
-import json
-
-def get_all_articles():
-    scrapers = [
-        ArxivScraper,
-        PapersWithCodeScraper,
-        OpenAIScraper,
-        GoogleBlogScraper,
-        HuggingFaceScraper,
-        MITNewsScraper,
-        StanfordHAIScraper,
-        BairScraper,
-        MetaAIScraper
-    ]
+
+# Spiders lancés par `get_all_articles()` (et mesurés par scripts/benchmark.py)
+SCRAPERS = [
+    ArxivScraper,
+    PapersWithCodeScraper,
+    OpenAIScraper,
+    GoogleBlogScraper,
+    HuggingFaceScraper,
+    MITNewsScraper,
+    StanfordHAIScraper,
+    BairScraper,
+    MetaAIScraper,
+]
+
+
+def get_all_articles(
+    output_path: str = 'data/raw/all_ai_articles.jsonl',
+    compression: Optional[str] = None,
+    database: bool = False,
+) -> int:
+    """Run every scraper and stream the articles to `output_path`.
+
+    Articles are appended to the JSON Lines file by `JsonLinesPipeline` as
+    they are scraped and, if `database` is set, upserted in the database by
+    `ArticleDatabasePipeline`. Returns the number of articles scraped.
+    """
+    pipelines = {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300}
+    if database:
+        pipelines['aiwatcher.scraper.pipelines.ArticleDatabasePipeline'] = 400
 
     process = CrawlerProcess(
         settings={
@@ -33,31 +49,28 @@ def get_all_articles():
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
             },
-            'CONCURRENT_REQUESTS': 1,
-            'DOWNLOAD_DELAY': 1,
+            # Débit et concurrence sont réglés par source (voir rate_limiter.py)
+            # Les articles sont écrits au fil de l'eau (voir pipelines.py)
+            'ITEM_PIPELINES': pipelines,
+            'ARTICLES_OUTPUT': output_path,
+            'ARTICLES_OUTPUT_COMPRESSION': compression,
         }
     )
 
-    for scraper_class in scrapers:
+    crawlers = []
+    for scraper_class in SCRAPERS:
         try:
-            process.crawl(scraper_class)
+            crawler = process.create_crawler(scraper_class)
+            process.crawl(crawler)
+            crawlers.append(crawler)
         except Exception as e:
             print(f"Error adding scraper: {scraper_class.__name__} - {e}")
 
     process.start()
 
-    all_articles = []
-    for scraper_class in scrapers:
-        try:
-            all_articles.extend(scraper_class.articles)
-        except Exception as e:
-            print(f"Error collecting articles from: {scraper_class.__name__} - {e}")
-    
-    return all_articles
+    return sum(crawler.stats.get_value('item_scraped_count', 0) for crawler in crawlers)
 
 if __name__ == "__main__":
-    articles = get_all_articles()
-    
-    with open('data/raw/all_ai_articles.json', 'w') as f:
-        json.dump(articles, f, indent=4)
-        print(f"Saved {len(articles)} articles to all_ai_articles.json")
\ No newline at end of file
+    output_path = 'data/raw/all_ai_articles.jsonl'
+    count = get_all_articles(output_path)
+    print(f"Saved {count} articles to {output_path}")
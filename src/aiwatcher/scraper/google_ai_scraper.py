@@ -1,14 +1,11 @@
-from typing import List
 import scrapy
-import requests
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class GoogleBlogScraper(scrapy.Spider):
+class GoogleBlogScraper(BaseScraper):
     name = name = SCRAPERS_CONFIG['google_blog']['source'] + "_scraper"
+    config_key = 'google_blog'
     start_urls = SCRAPERS_CONFIG['google_blog'].get('start_urls', ['https://research.google/blog/label/generative-ai/'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -38,33 +35,29 @@ class GoogleBlogScraper(scrapy.Spider):
         container = response.css('ul.blog-posts-grid__cards')
         all_articles = container.css('li.glue-grid__col')
         for a in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
-                title =  a.css('span.headline-5::text').get().strip(),
+                title = a.css('span.headline-5::text').get().strip()
                 link = response.urljoin(a.css('a.glue-card::attr(href)').get().strip())
                 date = a.css('p.glue-label::text').get().strip()
-                content = BeautifulSoup(requests.get(link, timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-                content = ' '.join(content.split())
                 keywords = [tag.strip() for tag in a.css('li.glue-card__link-list__item span.caption::text').getall() if tag.strip() != '']
                 img = a.css('div.related-posts__image img::attr(src)').get()
 
-                self.articles.append(Article(title=title, link=link, date=date, keywords=keywords, source=self.source, content=content, img=img).to_dict())
-                if len(self.articles) >= self.max_articles:
-                    return
-
-                yield {
+                yield self.follow_article(response, link, article={
                     'title': title,
                     'link': link,
                     'date': date,
-                    'img': img,
                     'keywords': keywords,
                     'source': self.source,
-                    'content': content
-                }
+                    'img': img
+                })
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
 
         next_button = response.css('a.pagination__next-button:not(.pagination__next-button--disabled)')
-        if next_button:
+        if next_button and self.has_capacity():
             next_page_num = next_button.css('::attr(data-page)').get()
             next_page = response.url.split('?')[0] + f'?page={next_page_num}'
             yield scrapy.Request(next_page, callback=self.parse)
@@ -72,11 +65,13 @@ class GoogleBlogScraper(scrapy.Spider):
 if __name__ == "__main__":
     from scrapy.crawler import CrawlerProcess
 
-    process = CrawlerProcess()
+    process = CrawlerProcess(
+        settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/google_ai_articles.jsonl',
+        }
+    )
     process.crawl(GoogleBlogScraper)
     process.start()
 
-    with open('data/raw/google_ai_articles.json', 'w') as f:
-        import json
-        json.dump(GoogleBlogScraper.articles, f, indent=4)
-        print(f"Saved {len(GoogleBlogScraper.articles)} articles to google_ai_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/google_ai_articles.jsonl")
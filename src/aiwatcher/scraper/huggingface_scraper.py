@@ -1,14 +1,11 @@
-from typing import List
 import scrapy
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
-import requests
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class HuggingFaceScraper(scrapy.Spider):
+class HuggingFaceScraper(BaseScraper):
     name = name = SCRAPERS_CONFIG['huggingface']['source'] + "_scraper"
+    config_key = 'huggingface'
     start_urls = SCRAPERS_CONFIG['huggingface'].get('start_urls', ['https://huggingface.co/blog'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -39,27 +36,30 @@ class HuggingFaceScraper(scrapy.Spider):
         all_articles = container.css('a.flex.lg\:col-span-1')
 
         for article in all_articles:
+            if not self.has_capacity():
+                return
+
             title = article.css('h2.font-serif.font-semibold.group-hover\:underline.text-xl::text').get()
             url = article.css('::attr(href)').get()
             image = f"https://huggingface.co{article.css('img::attr(src)').get()}"
             author = article.css('a.hover\:underline::text').get()
             date = article.css('span.truncate::text').get()
-            content = BeautifulSoup(requests.get(response.urljoin(url), timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-            self.articles.append(Article(title=title, link=response.urljoin(url) if url else None, date=date, keywords=[], source=self.source, content=content, img=image, authors=[author] if author else []).to_dict())
-            if len(self.articles) >= self.max_articles:
-                return
+            if not url:
+                continue
 
-            yield {
+            link = response.urljoin(url)
+            yield self.follow_article(response, link, article={
                 'title': title.strip() if title else None,
-                'url': response.urljoin(url) if url else None,
-                'image': image,
-                'author': author.strip() if author else None,
+                'link': link,
                 'date': date.strip() if date else None,
-                'content': content
-            }
+                'keywords': [],
+                'source': self.source,
+                'img': image,
+                'authors': [author.strip()] if author else []
+            })
 
         next_button = response.css('a.flex.items-center.rounded-lg:contains("Next")')
-        if next_button:
+        if next_button and self.has_capacity():
             next_page_url = next_button.css('::attr(href)').get()
             if next_page_url:
                 next_page = response.urljoin(next_page_url)
@@ -70,6 +70,8 @@ if __name__ == "__main__":
 
     process = CrawlerProcess(
         settings = {
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/huggingface_ai_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -84,7 +86,4 @@ if __name__ == "__main__":
     process.crawl(HuggingFaceScraper)
     process.start()
 
-    with open('data/raw/huggingface_ai_articles.json', 'w') as f:
-        import json
-        json.dump(HuggingFaceScraper.articles, f, indent=4)
-        print(f"Saved {len(HuggingFaceScraper.articles)} articles to huggingface_ai_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/huggingface_ai_articles.jsonl")
@@ -1,14 +1,11 @@
-from typing import List
 import scrapy
-import requests
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class MetaAIScraper(scrapy.Spider):
+class MetaAIScraper(BaseScraper):
     name = SCRAPERS_CONFIG['meta_ai']['source'] + "_scraper"
+    config_key = 'meta_ai'
     start_urls = SCRAPERS_CONFIG['meta_ai'].get('base_url', ['https://research.facebook.com/blog/#all-the-latest--blog---'])
-    articles: List[Article] = []
     
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -40,6 +37,9 @@ class MetaAIScraper(scrapy.Spider):
         all_articles = container.css('article._9z5n')
 
         for a in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 title = a.css('h3._9z5r a._9z5s div._8l_f p::text').get()
                 if title:
@@ -54,8 +54,6 @@ class MetaAIScraper(scrapy.Spider):
                 date = a.css('div._9z5t p::text').get()
                 if date:
                     date = date.strip()
-                content = BeautifulSoup(requests.get(link, timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-                content = ' '.join(content.split())
 
                 img = a.css('div._9z5o img._90f0::attr(src)').get()
                 if not img or 'rsrc.php' in img:
@@ -68,33 +66,20 @@ class MetaAIScraper(scrapy.Spider):
 
                 keywords = []
 
-                self.articles.append(Article(
-                    title=title,
-                    link=link,
-                    date=date,
-                    keywords=keywords,
-                    source=self.source,
-                    content=content,
-                    img=img
-                ).to_dict())
-
-                if len(self.articles) >= self.max_articles:
-                    return
-
-                yield {
+                # Le contenu complet est téléchargé de façon asynchrone
+                yield self.follow_article(response, link, article={
                     'title': title,
                     'link': link,
                     'date': date,
-                    'img': img,
                     'keywords': keywords,
                     'source': self.source,
-                    'content': content
-                }
+                    'img': img
+                })
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
 
         next_button = response.css('a._9ran._aism')
-        if next_button and len(self.articles) < self.max_articles:
+        if next_button and self.has_capacity():
             next_page_num = next_button.css('::attr(data-next-page)').get()
             next_offset = next_button.css('::attr(data-next-offset)').get()
 
@@ -106,11 +91,13 @@ class MetaAIScraper(scrapy.Spider):
 if __name__ == "__main__":
     from scrapy.crawler import CrawlerProcess
 
-    process = CrawlerProcess()
+    process = CrawlerProcess(
+        settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/meta_ai_articles.jsonl',
+        }
+    )
     process.crawl(MetaAIScraper)
     process.start()
 
-    with open('data/raw/meta_ai_articles.json', 'w') as f:
-        import json
-        json.dump(MetaAIScraper.articles, f, indent=4)
-        print(f"Saved {len(MetaAIScraper.articles)} articles to meta_ai_articles.json") 
\ No newline at end of file
+    print("Saved articles to data/raw/meta_ai_articles.jsonl")
@@ -1,16 +1,13 @@
 
-from typing import List
 import scrapy
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
-import requests
+from aiwatcher.scraper.base_scraper import BaseScraper
 
 
-class MITNewsScraper(scrapy.Spider):
+class MITNewsScraper(BaseScraper):
     name = SCRAPERS_CONFIG['mit_news']['source'] + "_scraper"
+    config_key = 'mit_news'
     start_urls = SCRAPERS_CONFIG['mit_news'].get('start_urls', ['https://news.mit.edu/topic/artificial-intelligence2'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -42,6 +39,9 @@ class MITNewsScraper(scrapy.Spider):
         all_articles = container.css('article.term-page--news-article--item')
 
         for article in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 # Extraire le titre
                 title = article.css('h3.term-page--news-article--item--title a span[itemprop="name headline"]::text').get()
@@ -60,48 +60,27 @@ class MITNewsScraper(scrapy.Spider):
                 # Extraire la date
                 date = article.css('p.term-page--news-article--item--publication-date time::text').get()
                 
-                # Récupérer le contenu complet de la page
-                content = ""
-                if url:
-                    try:
-                        full_url = response.urljoin(url)
-                        page_response = requests.get(full_url, timeout=self.timeout)
-                        soup = BeautifulSoup(page_response.text, 'html.parser')
-                        content = soup.get_text(separator=' ', strip=True)
-                    except Exception as e:
-                        self.logger.warning(f"Could not fetch content for {url}: {e}")
-                        # Utiliser la description comme fallback
-                        content = description.strip() if description else ""
-                
-                self.articles.append(Article(
-                    title=title,
-                    link=response.urljoin(url) if url else None,
-                    date=date,
-                    keywords=[],
-                    source=self.source,
-                    content=content,
-                    img=response.urljoin(image) if image else None,
-                    authors=[]
-                ).to_dict())
-                
-                if len(self.articles) >= self.max_articles:
-                    return
+                if not url:
+                    continue
 
-                yield {
+                # Récupérer le contenu complet de la page, la description sert de fallback
+                full_url = response.urljoin(url)
+                yield self.follow_article(response, full_url, article={
                     'title': title.strip() if title else None,
-                    'url': response.urljoin(url) if url else None,
-                    'image': response.urljoin(image) if image else None,
+                    'link': full_url,
                     'date': date.strip() if date else None,
-                    'description': description.strip() if description else None,
-                    'content': content
-                }
+                    'keywords': [],
+                    'source': self.source,
+                    'img': response.urljoin(image) if image else None,
+                    'authors': []
+                }, fallback_content=description.strip() if description else "")
             
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
                 continue
 
         # Gestion de la pagination
-        if len(self.articles) < self.max_articles:
+        if self.has_capacity():
             next_page = response.css('a[rel="next"]::attr(href)').get()
             if next_page:
                 next_page_url = response.urljoin(next_page)
@@ -113,6 +92,8 @@ if __name__ == "__main__":
 
     process = CrawlerProcess(
         settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/mit_news_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -127,7 +108,4 @@ if __name__ == "__main__":
     process.crawl(MITNewsScraper)
     process.start()
 
-    with open('data/raw/mit_news_articles.json', 'w') as f:
-        import json
-        json.dump(MITNewsScraper.articles, f, indent=4)
-        print(f"Saved {len(MITNewsScraper.articles)} articles to mit_news_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/mit_news_articles.jsonl")
@@ -1,12 +1,11 @@
-from typing import List
 import scrapy
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
+from aiwatcher.scraper.base_scraper import BaseScraper
 
-class OpenAIScraper(scrapy.Spider):
+class OpenAIScraper(BaseScraper):
     name = SCRAPERS_CONFIG['openai_blog']['source'] + "_scraper"
+    config_key = 'openai_blog'
     start_urls = SCRAPERS_CONFIG['openai_blog'].get('start_urls', ['https://openai.com/index/'])
-    articles: List[Article] = []
     
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -36,7 +35,7 @@ class OpenAIScraper(scrapy.Spider):
         all_articles = response.css('div.py-md.border-primary-12')
 
         for article_div in all_articles:
-            if len(self.articles) >= self.max_articles:
+            if not self.has_capacity():
                 return
 
             try:
@@ -59,32 +58,29 @@ class OpenAIScraper(scrapy.Spider):
                 if not title or not link:
                     self.logger.warning(f"Skipping article with missing title or link")
                     continue
-                
-                self.articles.append(Article(title=title, link=link, date=date_str, source=self.source, content='', keywords=[category] if category else []).to_dict())
 
-                yield {
+                yield self.build_item({
                     'title': title,
                     'link': link,
                     'date': date_str,
-                    'img': None,
                     'keywords': [category] if category else [],
                     'source': self.source,
-                    'content': ''
-                }
+                }, content='')
 
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
 
         load_more_button = response.css('button:contains("Load more")')
-        if load_more_button and len(self.articles) < self.max_articles:
+        if load_more_button and self.has_capacity():
             self.logger.info("Load more button found, but requires JavaScript interaction")
 
 if __name__ == "__main__":
     from scrapy.crawler import CrawlerProcess
-    import json
 
     process = CrawlerProcess(
         settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/openai_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -99,8 +95,4 @@ if __name__ == "__main__":
     process.crawl(OpenAIScraper)
     process.start()
 
-    output_file = 'data/raw/openai_articles.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(OpenAIScraper.articles, f, indent=4, ensure_ascii=False)
-
-    print(f"Saved {len(OpenAIScraper.articles)} articles to {output_file}")
+    print("Saved articles to data/raw/openai_articles.jsonl")
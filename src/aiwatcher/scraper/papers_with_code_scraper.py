@@ -1,15 +1,12 @@
-from typing import List
 import scrapy
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
-import requests
+from aiwatcher.scraper.base_scraper import BaseScraper
 
 
-class PapersWithCodeScraper(scrapy.Spider):
+class PapersWithCodeScraper(BaseScraper):
     name = SCRAPERS_CONFIG['papers_with_code']['source'] + "_scraper"
+    config_key = 'papers_with_code'
     start_urls = SCRAPERS_CONFIG['papers_with_code'].get('start_urls', ['https://huggingface.co/papers'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -41,6 +38,9 @@ class PapersWithCodeScraper(scrapy.Spider):
         all_articles = container.css('article.relative.overflow-hidden.rounded-xl.border')
 
         for article in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 # Extraire le titre
                 title = article.css('h3.text-xl.font-semibold a::text').get()
@@ -63,39 +63,27 @@ class PapersWithCodeScraper(scrapy.Spider):
                     if any(month in span for month in ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']):
                         date = span.strip()
                         break
-                full_url = response.urljoin(url) if url else None
-                content = BeautifulSoup(requests.get(full_url, timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-
-                self.articles.append(Article(
-                    title=title.strip() if title else None,
-                    link=full_url,
-                    date=date,
-                    keywords=[],
-                    source=self.source,
-                    content=content,
-                    img=image,
-                    authors=[author] if author else []
-                ).to_dict())
-                
-                if len(self.articles) >= self.max_articles:
-                    return
+                if not url:
+                    continue
 
-                yield {
+                full_url = response.urljoin(url)
+                yield self.follow_article(response, full_url, article={
                     'title': title.strip() if title else None,
-                    'url': full_url,
-                    'image': image,
-                    'author': author.strip() if author else None,
+                    'link': full_url,
                     'date': date,
-                    'content': content
-                }
-            
+                    'keywords': [],
+                    'source': self.source,
+                    'img': image,
+                    'authors': [author] if author else []
+                })
+
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
                 continue
 
         # Gestion de la pagination si nécessaire
         next_button = response.css('a:contains("Next")::attr(href)').get()
-        if next_button and len(self.articles) < self.max_articles:
+        if next_button and self.has_capacity():
             next_page = response.urljoin(next_button)
             yield scrapy.Request(next_page, callback=self.parse)
 
@@ -105,6 +93,8 @@ if __name__ == "__main__":
 
     process = CrawlerProcess(
         settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/papers_with_code_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -119,7 +109,4 @@ if __name__ == "__main__":
     process.crawl(PapersWithCodeScraper)
     process.start()
 
-    with open('data/raw/papers_with_code_articles.json', 'w') as f:
-        import json
-        json.dump(PapersWithCodeScraper.articles, f, indent=4)
-        print(f"Saved {len(PapersWithCodeScraper.articles)} articles to papers_with_code_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/papers_with_code_articles.jsonl")
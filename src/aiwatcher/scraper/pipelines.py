@@ -0,0 +1,133 @@
+"""Scrapy item pipelines for the scraped articles.
+
+`JsonLinesPipeline` appends every article to a JSON Lines file as soon as it
+is scraped (`Article` records are encoded directly, see `core/article.py`), so nothing is kept in memory and a crash only loses the items in
+flight. The file is configured with the `ARTICLES_OUTPUT` setting; set
+`ARTICLES_OUTPUT_COMPRESSION = 'zstd'` to write a zstd-compressed stream.
+
+All the spiders of a `CrawlerProcess` run in the same thread, so they share a
+single open sink per output path instead of interleaving partial lines.
+
+`ArticleDatabasePipeline` upserts the articles in the database in batches
+through `ArticleWriter` (see `services/article_service.py`).
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional, Tuple, Union
+from aiwatcher.core.article import Article
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:
+        zstd = None
+
+
+class JsonLinesSink:
+    """Append-only JSON Lines file, optionally zstd-compressed."""
+
+    _open_sinks: Dict[Tuple[str, Optional[str]], "JsonLinesSink"] = {}
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if compression == 'zstd':
+            if zstd is None:
+                raise RuntimeError("zstd compression requires Python 3.14 or the backports.zstd package")
+            self.file = zstd.open(path, 'ab')
+        elif compression is None:
+            self.file = open(path, 'ab')
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.path = path
+        self.compression = compression
+        self.users = 0
+
+    @classmethod
+    def acquire(cls, path: str, compression: Optional[str] = None) -> "JsonLinesSink":
+        key = (os.path.abspath(path), compression)
+        sink = cls._open_sinks.get(key)
+        if sink is None:
+            sink = cls._open_sinks[key] = cls(path, compression)
+        sink.users += 1
+        return sink
+
+    def release(self):
+        self.users -= 1
+        if self.users <= 0:
+            self.file.close()
+            self._open_sinks.pop((os.path.abspath(self.path), self.compression), None)
+
+    def write(self, item: Union[Article, Dict[str, Any]]):
+        if isinstance(item, Article):
+            self.file.write(item.to_json() + b'\n')
+            return
+        line = json.dumps(item, ensure_ascii=False, default=str) + '\n'
+        self.file.write(line.encode('utf-8'))
+
+    def flush(self):
+        self.file.flush()
+
+
+class JsonLinesPipeline:
+    """Stream every scraped article to the `ARTICLES_OUTPUT` JSON Lines file."""
+
+    def __init__(self, path: str, compression: Optional[str] = None, flush_every: int = 50):
+        self.path = path
+        self.compression = compression
+        self.flush_every = flush_every
+        self.sink: Optional[JsonLinesSink] = None
+        self.pending = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            path=crawler.settings.get('ARTICLES_OUTPUT', 'data/raw/all_ai_articles.jsonl'),
+            compression=crawler.settings.get('ARTICLES_OUTPUT_COMPRESSION'),
+            flush_every=crawler.settings.getint('ARTICLES_OUTPUT_FLUSH_EVERY', 50),
+        )
+
+    def open_spider(self, spider=None):
+        self.sink = JsonLinesSink.acquire(self.path, self.compression)
+
+    def close_spider(self, spider=None):
+        self.sink.flush()
+        self.sink.release()
+
+    def process_item(self, item, spider=None):
+        self.sink.write(item if isinstance(item, Article) else dict(item))
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.sink.flush()
+            self.pending = 0
+        return item
+
+
+class ArticleDatabasePipeline:
+    """Upsert the scraped articles in the database in batches."""
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.writer = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint('ARTICLE_WRITER_BATCH_SIZE') or None,
+            flush_interval=crawler.settings.getfloat('ARTICLE_WRITER_FLUSH_INTERVAL') or None,
+        )
+
+    def open_spider(self, spider=None):
+        from aiwatcher.services.article_service import ArticleWriter
+
+        self.writer = ArticleWriter(batch_size=self.batch_size, flush_interval=self.flush_interval)
+
+    def close_spider(self, spider=None):
+        self.writer.flush()
+
+    def process_item(self, item, spider=None):
+        self.writer.add(item if isinstance(item, Article) else dict(item))
+        return item
@@ -0,0 +1,79 @@
+"""Per-source politeness and adaptive concurrency for the scrapers.
+
+Every spider runs in its own crawler, so the settings built here from its
+`SCRAPERS_CONFIG` entry only apply to that source:
+
+- `rate_limit` (requests per second) sets the minimum delay between two
+  requests, `concurrency` the number of requests in flight, and `timeout`
+  the download timeout.
+- AutoThrottle raises the delay when the source answers slowly and brings it
+  back down to the `rate_limit` floor when it is fast again.
+- `BackoffMiddleware` doubles the delay on 429/5xx responses, honouring a
+  `Retry-After` header, before the retry middleware re-schedules the request.
+"""
+
+from typing import Any, Dict, Optional
+from scrapy.http import Request, Response
+
+# Délai maximal entre deux requêtes vers une même source (secondes)
+MAX_DELAY = 60.0
+BACKOFF_HTTP_CODES = {429, 500, 502, 503, 504}
+
+
+def source_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the Scrapy settings of one source from its `SCRAPERS_CONFIG` entry."""
+    rate_limit = config.get('rate_limit', 1.0)
+    concurrency = config.get('concurrency', 1)
+    delay = 1.0 / rate_limit if rate_limit > 0 else 0.0
+
+    return {
+        'DOWNLOAD_DELAY': delay,
+        'DOWNLOAD_TIMEOUT': config.get('timeout', 180),
+        'CONCURRENT_REQUESTS': concurrency,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': concurrency,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': delay,
+        'AUTOTHROTTLE_MAX_DELAY': MAX_DELAY,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': float(concurrency),
+        'DOWNLOADER_MIDDLEWARES': {
+            'aiwatcher.scraper.rate_limiter.BackoffMiddleware': 560,
+        },
+    }
+
+
+def retry_after(response: Response) -> Optional[float]:
+    """Return the `Retry-After` header in seconds, if it is a number."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class BackoffMiddleware:
+    """Slow a source down when it answers with 429 or a server error."""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.max_delay = crawler.settings.getfloat('AUTOTHROTTLE_MAX_DELAY', MAX_DELAY)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_response(self, request: Request, response: Response, spider=None):
+        if response.status not in BACKOFF_HTTP_CODES:
+            return response
+
+        slot = self.crawler.engine.downloader.slots.get(request.meta.get('download_slot'))
+        if slot is None:
+            return response
+
+        delay = max(slot.delay * 2, retry_after(response) or 0.0, 1.0)
+        slot.delay = min(delay, self.max_delay)
+        self.crawler.spider.logger.info(
+            f"Got {response.status} from {request.url}, delay is now {slot.delay:.1f}s"
+        )
+        return response
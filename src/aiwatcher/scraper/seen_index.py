@@ -0,0 +1,99 @@
+"""Persistent index of the article pages already crawled.
+
+The index is a small SQLite file keyed on the article URL. For every page it
+keeps the hash of the extracted content and the `ETag` / `Last-Modified`
+validators returned by the server, so that a later crawl can:
+
+- skip a page entirely when it was fetched less than `revisit_after` ago,
+- otherwise send a conditional GET and stop on `304 Not Modified`,
+- drop a re-downloaded page whose content hash did not change.
+
+`record()` is called once the article of a page has been written, so a page
+whose article was lost is not considered seen.
+"""
+
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_articles (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class SeenIndex:
+    """SQLite-backed set of crawled URLs with their cache validators."""
+
+    def __init__(self, path: str, revisit_after: float = 24 * 3600):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.revisit_after = revisit_after
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        row = self.conn.execute(
+            'SELECT content_hash, etag, last_modified, fetched_at FROM seen_articles WHERE url = ?',
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {'content_hash': row[0], 'etag': row[1], 'last_modified': row[2], 'fetched_at': row[3]}
+
+    def is_fresh(self, url: str) -> bool:
+        """Return True if the page was fetched less than `revisit_after` seconds ago."""
+        entry = self.get(url)
+        return entry is not None and time.time() - entry['fetched_at'] < self.revisit_after
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return the `If-None-Match` / `If-Modified-Since` headers for a known page."""
+        entry = self.get(url)
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def changed(self, url: str, content_hash: str) -> bool:
+        """Return True if the page is unknown or its content hash differs from the recorded one."""
+        entry = self.get(url)
+        return entry is None or entry['content_hash'] != content_hash
+
+    def touch(self, url: str):
+        """Mark a known page as revalidated (for instance after a 304)."""
+        self.conn.execute('UPDATE seen_articles SET fetched_at = ? WHERE url = ?', (time.time(), url))
+        self.conn.commit()
+
+    def record(self,
+        url: str,
+        content_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> bool:
+        """Store a fetched page and return True if its content changed."""
+        entry = self.get(url)
+        self.conn.execute(
+            'INSERT INTO seen_articles (url, content_hash, etag, last_modified, fetched_at) '
+            'VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(url) DO UPDATE SET content_hash = excluded.content_hash, '
+            'etag = excluded.etag, last_modified = excluded.last_modified, '
+            'fetched_at = excluded.fetched_at',
+            (url, content_hash, etag, last_modified, time.time()),
+        )
+        self.conn.commit()
+        return entry is None or entry['content_hash'] != content_hash
+
+    def close(self):
+        self.conn.close()
@@ -1,15 +1,12 @@
-from typing import List
 import scrapy
 from aiwatcher.core.config import SCRAPERS_CONFIG
-from aiwatcher.core.article import Article
-from bs4 import BeautifulSoup
-import requests
+from aiwatcher.scraper.base_scraper import BaseScraper
 
 
-class StanfordHAIScraper(scrapy.Spider):
+class StanfordHAIScraper(BaseScraper):
     name = SCRAPERS_CONFIG['stanford_hai']['source'] + "_scraper"
+    config_key = 'stanford_hai'
     start_urls = SCRAPERS_CONFIG['stanford_hai'].get('start_urls', ['https://hai.stanford.edu/research'])
-    articles: List[Article] = []
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'DEFAULT_REQUEST_HEADERS': {
@@ -41,6 +38,9 @@ class StanfordHAIScraper(scrapy.Spider):
         all_articles = container.css('div.FilteredSearchIndex_resultItem__0biE8')
 
         for article in all_articles:
+            if not self.has_capacity():
+                return
+
             try:
                 # Extraire le titre
                 title = article.css('h5.ContentItem_title__tD342 a.ContentItem_titleLink__iBCUW::text').get().strip()
@@ -72,37 +72,22 @@ class StanfordHAIScraper(scrapy.Spider):
                 keywords = [topic.strip() for topic in topics if topic.strip()]
 
                 # Récupérer le contenu complet de la page
-                content = BeautifulSoup(requests.get(response.urljoin(url), timeout=self.timeout).text, 'html.parser').get_text(separator=' ', strip=True)
-
-                self.articles.append(Article(
-                    title="title",
-                    link="response.urljoin(url) if url else None",
-                    date="date",
-                    keywords="keywords",
-                    source="self.source",
-                    content="content",
-                    img="image",
-                    authors="[author] if author else []"
-                ).to_dict())
-
-                if len(self.articles) >= self.max_articles:
-                    return
-
-                yield {
-                    'title': "title",
-                    'url': "response.urljoin(url) if url else None",
-                    'image': "image",
-                    'author': "author.strip() if author else None",
-                    'date': "date.strip() if date else None",
-                    'keywords': "keywords",
-                    'content': "content"
-                }
+                link = response.urljoin(url)
+                yield self.follow_article(response, link, article={
+                    'title': title,
+                    'link': link,
+                    'date': date,
+                    'keywords': keywords,
+                    'source': self.source,
+                    'img': image,
+                    'authors': [author] if author else []
+                })
 
             except Exception as e:
                 self.logger.error(f"Error parsing article: {e}")
                 continue
 
-        if len(self.articles) < self.max_articles:
+        if self.has_capacity():
             next_page = response.css('a.Pagination_pageAdjacentLink__Irz7P::attr(href)').get()
             if next_page:
                 next_page_url = response.urljoin(next_page)
@@ -114,6 +99,8 @@ if __name__ == "__main__":
 
     process = CrawlerProcess(
         settings={
+            'ITEM_PIPELINES': {'aiwatcher.scraper.pipelines.JsonLinesPipeline': 300},
+            'ARTICLES_OUTPUT': 'data/raw/stanford_hai_articles.jsonl',
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'DEFAULT_REQUEST_HEADERS': {
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -128,7 +115,4 @@ if __name__ == "__main__":
     process.crawl(StanfordHAIScraper)
     process.start()
 
-    with open('data/raw/stanford_hai_articles.json', 'w') as f:
-        import json
-        json.dump(StanfordHAIScraper.articles, f, indent=4)
-        print(f"Saved {len(StanfordHAIScraper.articles)} articles to stanford_hai_articles.json")
\ No newline at end of file
+    print("Saved articles to data/raw/stanford_hai_articles.jsonl")
@@ -0,0 +1,270 @@
+"""Business logic for articles.
+
+`ArticleWriter` stores scraped items in the `articles` table in batches. Each
+flush is a multi-row `INSERT ... ON CONFLICT (url) DO UPDATE`:
+
+- an article already stored with the same content hash is left untouched,
+- an article whose content changed is updated and marked as not processed,
+- an item whose content is already stored under another URL (the same story
+  on two sources) is dropped, since `content_hash` is unique too.
+
+`list_articles()` pages through the table with a keyset cursor on
+`(published_date, id)`, newest first, and only selects the requested
+columns.
+
+Items are buffered until `batch_size` articles are pending or
+`flush_interval` seconds have elapsed since the last flush. A flush larger
+than the bind parameter limit of the database allows is split into several
+statements in the same transaction. The articles
+written by a flush are then fingerprinted in the same transaction and linked
+to the article they nearly duplicate, if any (see `services/dedup_service.py`),
+and the cached API responses are invalidated.
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import Engine, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from aiwatcher.core.article import Article as ArticleRecord
+from aiwatcher.core.config import settings
+from aiwatcher.database.connection import get_engine
+from aiwatcher.database.models import Article
+from aiwatcher.services.cache_service import invalidate_responses
+from aiwatcher.preprocessing.utils import compute_content_hash, parse_date
+
+if TYPE_CHECKING:
+    from aiwatcher.services.dedup_service import NearDuplicateIndex
+
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+# Nombre maximal de paramètres liés par requête (SQLite >= 3.32)
+MAX_BIND_PARAMS = {
+    'postgresql': 65535,
+    'sqlite': 32766,
+}
+
+
+def article_row(item: Union[ArticleRecord, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Map a scraped `Article` record (or item dict) to a row of the `articles` table."""
+    # Les enregistrements sont lus champ par champ, sans copie en dict
+    get = item.get if isinstance(item, dict) else lambda name: getattr(item, name, None)
+    url = get('link') or get('url')
+    title = get('title')
+    if not url or not title:
+        return None
+
+    content = get('content') or ''
+    now = datetime.now()
+    return {
+        'title': str(title)[:500],
+        'url': url[:1000],
+        'source': (get('source') or '')[:50],
+        'authors': get('authors') or [],
+        'published_date': parse_date(get('date')),
+        'raw_content': content,
+        # Sans contenu, l'URL sert d'empreinte pour respecter l'unicité du hash
+        'content_hash': compute_content_hash(content or url),
+        'tags': get('keywords') or [],
+        'language': 'en',
+        'is_processed': False,
+        'scraped_date': now,
+        'created_date': now,
+        'updated_date': now,
+    }
+
+
+class ArticleWriter:
+    """Batched, deduplicating upsert of scraped articles."""
+
+    def __init__(self,
+        engine: Optional[Engine] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        dedup: Optional["NearDuplicateIndex"] = None,
+    ):
+        # numpy n'est importé que par les écrivains, pas par l'API
+        from aiwatcher.services.dedup_service import NearDuplicateIndex
+
+        self.engine = engine or get_engine()
+        self.batch_size = batch_size or settings.ARTICLE_WRITER_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else settings.ARTICLE_WRITER_FLUSH_INTERVAL
+        self.insert = UPSERT_DIALECTS[self.engine.dialect.name]
+        self.dedup = dedup if dedup is not None or not settings.NEAR_DUP_ENABLED else NearDuplicateIndex()
+        # Clé = URL : la dernière version d'un article dans un lot l'emporte
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.last_flush = time.monotonic()
+        self.written = 0
+
+    def __enter__(self) -> "ArticleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def add(self, item: Union[ArticleRecord, Dict[str, Any]]) -> int:
+        """Buffer one item and flush if the batch is full or the interval elapsed."""
+        row = article_row(item)
+        if row is not None:
+            self.pending[row['url']] = row
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            return self.flush()
+        return 0
+
+    def add_many(self, items: Iterable[Union[ArticleRecord, Dict[str, Any]]]) -> int:
+        return sum(self.add(item) for item in items)
+
+    def flush(self) -> int:
+        """Write the pending rows and return the number of inserted or updated articles."""
+        rows = list(self.pending.values())
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        if not rows:
+            return 0
+
+        # Une requête lie une valeur par colonne et par ligne
+        size = MAX_BIND_PARAMS[self.engine.dialect.name] // len(rows[0])
+        count = 0
+        with self.engine.begin() as conn:
+            for start in range(0, len(rows), size):
+                batch = self._drop_known_content(conn, rows[start:start + size])
+                if not batch:
+                    continue
+                written = conn.execute(
+                    self._upsert_statement(batch).returning(Article.id, Article.raw_content)
+                ).all()
+                if self.dedup is not None:
+                    self.dedup.index(conn, written)
+                count += len(written)
+
+        if count:
+            invalidate_responses()
+        self.written += count
+        return count
+
+    def _upsert_statement(self, rows: List[Dict[str, Any]]):
+        stmt = self.insert(Article).values(rows)
+        excluded = stmt.excluded
+        return stmt.on_conflict_do_update(
+            index_elements=[Article.url],
+            set_={
+                'title': excluded.title,
+                'source': excluded.source,
+                'authors': excluded.authors,
+                'published_date': excluded.published_date,
+                'raw_content': excluded.raw_content,
+                'cleaned_content': None,
+                'content_hash': excluded.content_hash,
+                'tags': excluded.tags,
+                'is_processed': False,
+                'updated_date': excluded.updated_date,
+            },
+            # Ne réécrit pas les articles dont le contenu n'a pas changé
+            where=Article.content_hash != excluded.content_hash,
+        )
+
+    @staticmethod
+    def _drop_known_content(conn, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep one row per content hash, and drop hashes stored under another URL."""
+        by_hash: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            by_hash.setdefault(row['content_hash'], row)
+
+        stored = dict(conn.execute(
+            select(Article.content_hash, Article.url).where(Article.content_hash.in_(list(by_hash)))
+        ).all())
+        return [
+            row for content_hash, row in by_hash.items()
+            if stored.get(content_hash, row['url']) == row['url']
+        ]
+
+
+# Colonnes exposées par les listes : jamais les colonnes Text du contenu
+LIST_FIELDS = (
+    'id', 'title', 'url', 'source', 'authors', 'published_date', 'scraped_date',
+    'language', 'category', 'tags', 'word_count', 'reading_time', 'is_processed',
+    'quality_score', 'canonical_id', 'content_hash', 'created_date', 'updated_date',
+)
+DETAIL_FIELDS = LIST_FIELDS + ('raw_content', 'cleaned_content')
+DEFAULT_LIST_FIELDS = ('id', 'title', 'url', 'source', 'published_date', 'is_processed', 'reading_time')
+
+
+def encode_cursor(published_date: Optional[datetime], article_id: int) -> str:
+    value = [published_date.isoformat() if published_date else None, article_id]
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor from `list_articles()`; raises ValueError if it is malformed."""
+    try:
+        published_date, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (datetime.fromisoformat(published_date) if published_date else None), int(article_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def list_articles(
+    conn,
+    fields: Sequence[str] = DEFAULT_LIST_FIELDS,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    category: Optional[str] = None,
+    is_processed: Optional[bool] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Return a page of articles, newest first, and the cursor of the next page.
+
+    Articles without a publication date come last. Raises ValueError for an
+    unknown field or a malformed cursor.
+    """
+    unknown = set(fields) - set(LIST_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    # La clé du curseur est toujours lue, même si elle n'est pas demandée
+    columns = list(dict.fromkeys(('id', 'published_date', *fields)))
+    stmt = select(*(getattr(Article, name) for name in columns))
+
+    filters = []
+    if source is not None:
+        filters.append(Article.source == source)
+    if category is not None:
+        filters.append(Article.category == category)
+    if is_processed is not None:
+        filters.append(Article.is_processed.is_(is_processed))
+
+    def page(conditions, order, size):
+        return [dict(row._mapping) for row in conn.execute(stmt.where(*filters, *conditions).order_by(*order).limit(size))]
+
+    # Les articles datés puis, une fois épuisés, ceux sans date : chaque requête
+    # parcourt un intervalle de l'index (published_date DESC NULLS LAST, id DESC)
+    published_date, article_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if published_date is not None or article_id is None:
+        dated = (
+            tuple_(Article.published_date, Article.id) < (published_date, article_id)
+            if published_date is not None else Article.published_date.is_not(None)
+        )
+        rows = page([dated], (Article.published_date.desc().nulls_last(), Article.id.desc()), limit + 1)
+    if len(rows) <= limit:
+        undated = [Article.published_date.is_(None)]
+        if published_date is None and article_id is not None:
+            undated.append(Article.id < article_id)
+        rows += page(undated, (Article.id.desc(),), limit + 1 - len(rows))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['published_date'], rows[-1]['id'])
+    return [{name: row[name] for name in fields} for row in rows], next_cursor
+
+
+def get_article(conn, article_id: int, fields: Sequence[str] = DETAIL_FIELDS) -> Optional[Dict[str, Any]]:
+    unknown = set(fields) - set(DETAIL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    row = conn.execute(select(*(getattr(Article, name) for name in fields)).where(Article.id == article_id)).first()
+    return dict(row._mapping) if row is not None else None
@@ -0,0 +1,296 @@
+"""Content-addressed cache of model outputs.
+
+Summaries and entities only depend on the text of an article and on the
+model that produced them, so they are cached under
+`(kind, content_hash, model_name, model_version, params)`: the same story
+crawled again, or published by two sources, is never run through a model
+twice.
+
+`InferenceCache` keeps the most recent results in an in-process LRU in front
+of a shared store, Redis at `settings.REDIS_URL`, or an in-memory stand-in
+when Redis is not configured or not reachable. Concurrent requests for the
+same key are de-duplicated (single flight): the first caller computes the
+value and the others wait for its result.
+
+The same cache class holds the API read responses (`get_response_cache()`,
+see `api/middleware.py`). Their keys include a data version stored next to
+them, which the article writer and the batch processor bump with
+`invalidate_responses()` whenever they change rows. Each process reuses the
+version it read for `DATA_VERSION_TTL` seconds, so a bump made by another
+process is seen within that delay and one made by the process itself at once.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from aiwatcher.ai_models.model_manager import get_model_config
+from aiwatcher.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'aiwatcher:inference'
+RESPONSE_PREFIX = 'aiwatcher:response'
+DATA_VERSION_KEY = 'aiwatcher:data-version'
+
+# Paramètres de configuration qui changent la sortie de chaque modèle
+MODEL_PARAMS = {
+    'summarizer': ('max_input_tokens', 'num_beams', 'lengths', 'backend'),
+    'ner': ('window_tokens', 'stride', 'context_chars', 'backend'),
+}
+
+
+def inference_key(
+    kind: str,
+    content_hash: str,
+    model_name: str,
+    model_version: Optional[str],
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Build the cache key of a model output."""
+    digest = hashlib.sha256(json.dumps(params or {}, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return ':'.join((KEY_PREFIX, kind, content_hash, model_name, model_version or '', digest))
+
+
+def model_cache_key(role: str, content_hash: str, params: Sequence[str] = ()) -> str:
+    """Cache key of the output of a model role from `model_configs.json` for a content."""
+    config = get_model_config(role)
+    names = params or MODEL_PARAMS.get(role, ())
+    return inference_key(
+        role,
+        content_hash,
+        config['model_name'],
+        config.get('model_version'),
+        {name: config.get(name) for name in names},
+    )
+
+
+class LocalStore:
+    """In-memory stand-in for Redis, with expiry."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            value, expires = self.values.get(key, (None, None))
+            if expires is not None and expires < time.monotonic():
+                del self.values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        with self.lock:
+            self.values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def delete(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.values.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self.lock:
+            value = int(self.values.get(key, (0, None))[0]) + 1
+            self.values[key] = (str(value), None)
+            return value
+
+
+class RedisStore:
+    """Redis-backed store; errors are logged and treated as cache misses."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            logger.warning("Redis get failed: %s", e)
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        try:
+            self.client.set(key, value, ex=ttl or None)
+        except Exception as e:
+            logger.warning("Redis set failed: %s", e)
+
+    def delete(self, *keys: str):
+        try:
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("Redis delete failed: %s", e)
+
+    def incr(self, key: str) -> Optional[int]:
+        try:
+            return self.client.incr(key)
+        except Exception as e:
+            logger.warning("Redis incr failed: %s", e)
+            return None
+
+
+def connect_redis(url: Optional[str] = None, socket_timeout: Optional[float] = 1):
+    """Return a Redis client for `url` (defaults to `REDIS_URL`), or None if it cannot be reached."""
+    url = settings.REDIS_URL if url is None else url
+    if not url:
+        return None
+    try:
+        import redis
+
+        client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=socket_timeout, socket_connect_timeout=1)
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning("Redis unavailable at %s (%s), using in-process state", url, e)
+        return None
+
+
+def connect_store(url: Optional[str] = None):
+    """Return a Redis store for `url`, or a local store if it cannot be reached."""
+    client = connect_redis(url)
+    return RedisStore(client) if client is not None else LocalStore()
+
+
+class InferenceCache:
+    """In-process LRU in front of a shared store, with single-flight computation."""
+
+    def __init__(self, store=None, max_entries: Optional[int] = None, ttl: Optional[int] = None):
+        self.store = store if store is not None else connect_store()
+        self.max_entries = max_entries or settings.INFERENCE_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.INFERENCE_CACHE_TTL
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.inflight: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        raw = self.store.get(key)
+        with self.lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            value = json.loads(raw)
+            self._remember(key, value)
+            return value
+
+    def set(self, key: str, value: Any):
+        self.store.set(key, json.dumps(value), self.ttl)
+        with self.lock:
+            self._remember(key, value)
+
+    def delete(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        self.store.delete(*keys)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value of `key`, computing it once if it is missing.
+
+        Callers asking for a key being computed wait for that computation
+        instead of starting their own.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self.lock:
+            # Un calcul a pu se terminer depuis la lecture
+            if key in self.entries:
+                return self.entries[key]
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+    def _remember(self, key: str, value: Any):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+_store = None
+_store_lock = threading.Lock()
+_cache: Optional[InferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide shared store (Redis or its local stand-in)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = connect_store()
+        return _store
+
+
+def get_inference_cache() -> InferenceCache:
+    """Return the process-wide inference cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InferenceCache(get_store())
+        return _cache
+
+
+_response_cache: Optional[InferenceCache] = None
+# Dernière version lue et son instant d'expiration (horloge monotone)
+_data_version: Tuple[Optional[str], float] = (None, 0.0)
+
+
+def get_response_cache() -> InferenceCache:
+    """Return the process-wide cache of API read responses."""
+    global _response_cache
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = InferenceCache(
+                get_store(),
+                max_entries=settings.RESPONSE_CACHE_SIZE,
+                ttl=settings.RESPONSE_CACHE_TTL,
+            )
+        return _response_cache
+
+
+def data_version() -> str:
+    """Current version of the article data, part of the response cache keys."""
+    global _data_version
+    version, expires = _data_version
+    if version is None or time.monotonic() >= expires:
+        version = get_response_cache().store.get(DATA_VERSION_KEY) or '0'
+        _data_version = (version, time.monotonic() + settings.DATA_VERSION_TTL)
+    return version
+
+
+def invalidate_responses():
+    """Invalidate every cached API response after articles, summaries or entities changed."""
+    global _data_version
+    version = get_response_cache().store.incr(DATA_VERSION_KEY)
+    _data_version = (None if version is None else str(version), time.monotonic() + settings.DATA_VERSION_TTL)
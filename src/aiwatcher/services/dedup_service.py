@@ -0,0 +1,113 @@
+"""Near-duplicate detection of articles with MinHash/LSH.
+
+The same press release is often published by several sources with small
+edits, which `content_hash` does not catch. `NearDuplicateIndex` stores the
+MinHash signature of every article (`article_fingerprints`) and its LSH band
+keys (`lsh_buckets`). Indexing an article looks up its band keys, so the cost
+of an insert depends on the number of candidates, not on the size of the
+history; candidates whose estimated similarity reaches `NEAR_DUP_THRESHOLD`
+are near-duplicates. Texts are fingerprinted after `clean_text()`, the
+normalization stored as `cleaned_content`, so that markup and boilerplate
+that differ between sources do not hide a duplicate.
+
+Each group of near-duplicates is linked to its oldest article through
+`Article.canonical_id`, so that summaries and entities are computed once per
+group.
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, update
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Article, ArticleFingerprint, LSHBucket
+from aiwatcher.preprocessing.minhash import MinHasher, estimate_similarity
+from aiwatcher.preprocessing.text_cleaner import clean_text
+from aiwatcher.services.article_service import MAX_BIND_PARAMS
+
+
+class NearDuplicateIndex:
+    """Incremental LSH index of article signatures stored in the database."""
+
+    def __init__(self, hasher: Optional[MinHasher] = None, threshold: Optional[float] = None):
+        self.hasher = hasher or MinHasher(
+            num_perm=settings.MINHASH_NUM_PERM,
+            bands=settings.MINHASH_BANDS,
+            shingle_size=settings.SHINGLE_SIZE,
+        )
+        self.threshold = threshold if threshold is not None else settings.NEAR_DUP_THRESHOLD
+
+    def index(self, conn, articles: Sequence[Tuple[int, str]]) -> Dict[int, Optional[int]]:
+        """Fingerprint the cleaned `(article_id, text)` pairs and link them to their canonical article.
+
+        Articles already indexed (their content changed) are re-indexed.
+        Returns the canonical id of each article, None for canonical ones.
+        """
+        articles = sorted((article_id, clean_text(text)) for article_id, text in articles)
+        articles = [(article_id, text) for article_id, text in articles if text]
+        if not articles:
+            return {}
+        ids = [article_id for article_id, _ in articles]
+        signatures = {article_id: self.hasher.signature(text) for article_id, text in articles}
+        keys = {article_id: self.hasher.band_keys(signature) for article_id, signature in signatures.items()}
+
+        conn.execute(delete(LSHBucket).where(LSHBucket.article_id.in_(ids)))
+        conn.execute(delete(ArticleFingerprint).where(ArticleFingerprint.article_id.in_(ids)))
+
+        # Candidats : articles déjà indexés partageant au moins une bande
+        buckets: Dict[str, Set[int]] = {}
+        all_keys = sorted({key for article_keys in keys.values() for key in article_keys})
+        size = MAX_BIND_PARAMS[conn.dialect.name]
+        for start in range(0, len(all_keys), size):
+            for key, article_id in conn.execute(
+                select(LSHBucket.key, LSHBucket.article_id).where(LSHBucket.key.in_(all_keys[start:start + size]))
+            ):
+                buckets.setdefault(key, set()).add(article_id)
+        known = self._load_signatures(conn, {article_id for members in buckets.values() for article_id in members})
+
+        canonical: Dict[int, Optional[int]] = {}
+        for article_id in ids:
+            signature = signatures[article_id]
+            candidates = {member for key in keys[article_id] for member in buckets.get(key, ())}
+            best, best_similarity = None, self.threshold
+            for candidate in sorted(candidates):
+                similarity = estimate_similarity(signature, known[candidate][0])
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+            canonical[article_id] = None if best is None else known[best][1] or best
+
+            # Les articles du lot sont candidats pour les suivants
+            known[article_id] = (signature, canonical[article_id])
+            for key in keys[article_id]:
+                buckets.setdefault(key, set()).add(article_id)
+
+        conn.execute(insert(ArticleFingerprint), [
+            {'article_id': article_id, 'signature': signatures[article_id].tobytes()} for article_id in ids
+        ])
+        conn.execute(insert(LSHBucket), [
+            {'key': key, 'article_id': article_id} for article_id in ids for key in set(keys[article_id])
+        ])
+        conn.execute(
+            update(Article).where(Article.id == bindparam('article_id')).values(canonical_id=bindparam('canonical')),
+            [{'article_id': article_id, 'canonical': canonical[article_id]} for article_id in ids],
+        )
+        return canonical
+
+    @staticmethod
+    def _load_signatures(conn, ids: Set[int]) -> Dict[int, Tuple[np.ndarray, Optional[int]]]:
+        ids, size = sorted(ids), MAX_BIND_PARAMS[conn.dialect.name]
+        signatures: Dict[int, Tuple[np.ndarray, Optional[int]]] = {}
+        for start in range(0, len(ids), size):
+            rows = conn.execute(
+                select(ArticleFingerprint.article_id, ArticleFingerprint.signature, Article.canonical_id)
+                .join(Article, Article.id == ArticleFingerprint.article_id)
+                .where(ArticleFingerprint.article_id.in_(ids[start:start + size]))
+            )
+            for article_id, signature, canonical_id in rows:
+                signatures[article_id] = (np.frombuffer(signature, dtype=np.uint32), canonical_id)
+        return signatures
+
+
+def canonical_article_ids(conn, ids: List[int]) -> Dict[int, int]:
+    """Map article ids to the id of their canonical article (themselves if canonical)."""
+    rows = conn.execute(select(Article.id, Article.canonical_id).where(Article.id.in_(ids)))
+    return {article_id: canonical_id or article_id for article_id, canonical_id in rows}
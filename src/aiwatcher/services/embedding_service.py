@@ -0,0 +1,244 @@
+"""Embedding index of the articles and semantic search.
+
+Each processed article gets one embedding of its title, medium summary and
+cleaned content (see `ai_models/embedder.py`). The vectors are stored under
+`EMBEDDINGS_DIR/<model>/` as a float16 matrix (`vectors.f16`, one row per
+vector) and the matching article ids (`ids.i64`). Both files are append-only:
+an article whose embedding changes gets a new row, and the last row of an
+article wins.
+
+- the batch processor adds the articles of each chunk once it is committed,
+  so the index grows incrementally (`python -m
+  aiwatcher.services.embedding_service` backfills the articles processed
+  before it existed);
+- readers keep the vectors in a float32 matrix in memory and load the rows
+  appended since their last read when the id file grows. Vectors are written
+  before their ids, so a reader never sees an id without its vector.
+
+A query is one matrix-vector product (the vectors are normalized) followed by
+a partial sort: a few milliseconds for a hundred thousand articles. The
+matrix is kept in float32 because converting float16 rows at query time
+costs several times more than the product itself. There must be a single
+writer per index.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import Engine, func, or_, select
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Article, Summary
+
+logger = logging.getLogger(__name__)
+
+RESULT_FIELDS = ('id', 'title', 'url', 'source', 'published_date')
+
+
+class EmbeddingIndex:
+    """Append-only float16 store of article embeddings, searched in memory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, 'vectors.f16')
+        self.ids_path = os.path.join(directory, 'ids.i64')
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self.dim: Optional[int] = None
+        self.count = 0
+        # Tampons à capacité doublée : ids, vecteurs et lignes encore valides
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.live = np.empty(0, dtype=bool)
+        self.rows: Dict[int, int] = {}
+        self.lock = threading.Lock()
+        with self.lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._refresh()
+            return len(self.rows)
+
+    def __contains__(self, article_id: int) -> bool:
+        with self.lock:
+            self._refresh()
+            return article_id in self.rows
+
+    def add(self, article_ids: Sequence[int], vectors: np.ndarray):
+        """Store the vectors of articles, replacing those already indexed."""
+        vectors = np.asarray(vectors, dtype=np.float16)
+        if not len(article_ids):
+            return
+        with self.lock:
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self.meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({'dim': self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+            with open(self.vectors_path, 'ab') as f:
+                f.write(np.ascontiguousarray(vectors).tobytes())
+            with open(self.ids_path, 'ab') as f:
+                f.write(np.asarray(article_ids, dtype=np.int64).tobytes())
+            self._refresh()
+
+    def vector(self, article_id: int) -> Optional[np.ndarray]:
+        with self.lock:
+            self._refresh()
+            row = self.rows.get(article_id)
+            return None if row is None else self.matrix[row].copy()
+
+    def search(self, query: np.ndarray, k: int = 10, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Return the `k` articles closest to `query` as `(article_id, cosine similarity)`, best first."""
+        with self.lock:
+            self._refresh()
+            count = self.count
+            matrix, ids, live = self.matrix[:count], self.ids[:count], self.live[:count].copy()
+            # add() modifie `rows` : les lignes exclues sont lues sous le verrou
+            excluded = [self.rows[article_id] for article_id in exclude if article_id in self.rows]
+        # Les lignes déjà chargées ne changent plus : le produit se fait hors du verrou
+        scores = matrix @ np.asarray(query, dtype=np.float32)
+        scores[~live] = -np.inf
+        scores[excluded] = -np.inf
+
+        k = min(k, count)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[row]), float(scores[row])) for row in top if np.isfinite(scores[row])]
+
+    def _refresh(self):
+        """Load the rows appended since the last call (lock held)."""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, encoding='utf-8') as f:
+                self.dim = json.load(f)['dim']
+        count = os.path.getsize(self.ids_path) // 8 if os.path.exists(self.ids_path) else 0
+        if count <= self.count:
+            return
+        new_ids = np.fromfile(self.ids_path, dtype=np.int64, count=count - self.count, offset=self.count * 8)
+        new_vectors = np.fromfile(
+            self.vectors_path, dtype=np.float16, count=len(new_ids) * self.dim, offset=self.count * self.dim * 2,
+        ).reshape(len(new_ids), self.dim)
+        if count > len(self.ids):
+            capacity = max(count, 2 * len(self.ids), 1024)
+            self.ids = np.resize(self.ids, capacity)
+            self.live = np.resize(self.live, capacity)
+            matrix = np.empty((capacity, self.dim), dtype=np.float32)
+            if self.count:
+                matrix[:self.count] = self.matrix[:self.count]
+            self.matrix = matrix
+        self.ids[self.count:count] = new_ids
+        self.matrix[self.count:count] = new_vectors
+        self.live[self.count:count] = True
+        for row, article_id in enumerate(new_ids.tolist(), start=self.count):
+            previous = self.rows.get(article_id)
+            if previous is not None:
+                self.live[previous] = False
+            self.rows[article_id] = row
+        self.count = count
+
+
+def index_directory(model_name: str) -> str:
+    return os.path.join(settings.EMBEDDINGS_DIR, model_name.replace('/', '--'))
+
+
+_index: Optional[EmbeddingIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """Return the process-wide index of the configured embedding model."""
+    from aiwatcher.ai_models.model_manager import get_model_config
+
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EmbeddingIndex(index_directory(get_model_config('embedder')['model_name']))
+        return _index
+
+
+def embedding_text(title: Optional[str], summary: Optional[str], content: Optional[str]) -> str:
+    """Text embedded for an article; the encoder truncates it to its context."""
+    return '\n'.join(part for part in (title, summary, content) if part)
+
+
+def encode(texts: Sequence[str]) -> np.ndarray:
+    from aiwatcher.ai_models.model_manager import get_model_manager
+
+    return get_model_manager().get('embedder').encode(texts)
+
+
+def embed_articles(engine: Engine, chunk_size: int = 256, limit: Optional[int] = None) -> int:
+    """Index the processed articles missing from the index; return how many were added."""
+    index = get_embedding_index()
+    last_id, added = 0, 0
+    while limit is None or added < limit:
+        stmt = (
+            select(Article.id, Article.title, Summary.medium_summary, func.coalesce(Article.cleaned_content, Article.raw_content))
+            .outerjoin(Summary, Summary.article_id == Article.id)
+            .where(Article.is_processed.is_(True), Article.id > last_id)
+            .order_by(Article.id)
+            .limit(chunk_size)
+        )
+        with engine.connect() as conn:
+            rows = conn.execute(stmt).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        missing = {row[0]: embedding_text(*row[1:]) for row in rows if row[0] not in index}
+        if limit is not None:
+            missing = dict(list(missing.items())[:limit - added])
+        if missing:
+            index.add(list(missing), encode(list(missing.values())))
+            added += len(missing)
+            logger.info("Indexed %d articles", added)
+    return added
+
+
+def _articles(conn, hits: Sequence[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """Article rows of the hits, in the order of the hits, with their score."""
+    if not hits:
+        return []
+    columns = [getattr(Article, name) for name in RESULT_FIELDS]
+    rows = {row.id: dict(row._mapping) for row in conn.execute(select(*columns).where(Article.id.in_([i for i, _ in hits])))}
+    return [{**rows[article_id], 'score': score} for article_id, score in hits if article_id in rows]
+
+
+def semantic_search(conn, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Return the articles closest in meaning to a natural-language query."""
+    hits = get_embedding_index().search(encode([query])[0], k=limit)
+    return _articles(conn, hits)
+
+
+def similar_articles(conn, article_id: int, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+    """Return the articles most similar to an indexed article, None if it is not indexed.
+
+    Near-duplicates of the article (same canonical article) are left out.
+    """
+    index = get_embedding_index()
+    vector = index.vector(article_id)
+    if vector is None:
+        return None
+    group_id = conn.execute(select(func.coalesce(Article.canonical_id, Article.id)).where(Article.id == article_id)).scalar()
+    exclude = {article_id}
+    if group_id is not None:
+        # Deux recherches indexées plutôt qu'une comparaison sur coalesce()
+        exclude.update(conn.execute(
+            select(Article.id).where(or_(Article.canonical_id == group_id, Article.id == group_id))
+        ).scalars())
+    return _articles(conn, index.search(vector, k=limit, exclude=exclude))
+
+
+if __name__ == '__main__':
+    # Indexation des articles traités avant la mise en place de l'index
+    from aiwatcher.database.connection import get_engine
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    print(f"Indexed {embed_articles(get_engine())} articles")
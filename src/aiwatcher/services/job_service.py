@@ -0,0 +1,319 @@
+"""Background inference jobs.
+
+Summaries and entity extraction can take seconds, so the API does not run
+them inside the request: `JobManager.submit()` records a job, pushes its id
+on a queue and returns at once; a pool of worker threads runs the jobs and
+records their progress events and result. Clients poll the job or stream its
+events.
+
+Jobs and the queue live in Redis (`REDIS_URL`) when it is reachable, so that
+workers can also run in separate processes
+(`python -m aiwatcher.services.job_service`); otherwise an in-process queue
+is used. Finished jobs expire after `JOB_TTL` seconds.
+
+The progress events of a job are appended to a list of their own rather than
+saved with the job, so that an event costs one small write and not a new copy
+of the job and its input text.
+
+Reads and writes go through a client with the default socket timeout, so a
+stalled Redis fails the request instead of hanging it; only the workers'
+`BLPOP` uses a second client without a timeout. The async helpers
+(`wait()`, `watch()`, `aget()`) run the Redis calls in the default executor
+so that they never block the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from aiwatcher.core.config import settings
+from aiwatcher.preprocessing.utils import compute_content_hash
+from aiwatcher.services.cache_service import connect_redis, get_inference_cache, model_cache_key
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+FINISHED = (DONE, FAILED)
+JOB_KEY = 'aiwatcher:job:'
+EVENTS_SUFFIX = ':events'
+QUEUE_KEY = 'aiwatcher:jobs'
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        """Serialize the job without its events, which are stored apart."""
+        data = self.to_dict()
+        del data['events']
+        return json.dumps(data)
+
+
+class LocalJobBackend:
+    """In-process job table and queue."""
+
+    def __init__(self):
+        self.jobs: Dict[str, str] = {}
+        self.job_events: Dict[str, List[str]] = {}
+        self.expiry: Dict[str, float] = {}
+        self.pending: "queue.Queue[str]" = queue.Queue()
+        self.lock = threading.Lock()
+
+    def save(self, job: Job):
+        with self.lock:
+            self.jobs[job.id] = job.to_json()
+            if job.status in FINISHED:
+                self.expiry[job.id] = time.monotonic() + settings.JOB_TTL
+            self._expire()
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            raw = self.jobs.get(job_id)
+        return Job(**json.loads(raw)) if raw else None
+
+    def add_event(self, job_id: str, event: Dict[str, Any]):
+        with self.lock:
+            self.job_events.setdefault(job_id, []).append(json.dumps(event))
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        with self.lock:
+            raw = self.job_events.get(job_id, [])[start:]
+        return [json.loads(event) for event in raw]
+
+    def push(self, job_id: str):
+        self.pending.put(job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return self.pending.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def queued(self) -> int:
+        return self.pending.qsize()
+
+    def _expire(self):
+        now = time.monotonic()
+        for job_id in [job_id for job_id, expires in self.expiry.items() if expires < now]:
+            self.jobs.pop(job_id, None)
+            self.job_events.pop(job_id, None)
+            del self.expiry[job_id]
+
+
+class RedisJobBackend:
+    """Jobs stored as JSON strings, their events in one list per job and a list used as the queue.
+
+    `blocking_client` serves the `BLPOP` of the workers (defaults to `client`).
+    """
+
+    def __init__(self, client, blocking_client=None):
+        self.client = client
+        self.blocking_client = blocking_client or client
+
+    def save(self, job: Job):
+        ttl = settings.JOB_TTL if job.status in FINISHED else None
+        self.client.set(JOB_KEY + job.id, job.to_json(), ex=ttl)
+        if ttl is not None:
+            self.client.expire(JOB_KEY + job.id + EVENTS_SUFFIX, ttl)
+
+    def load(self, job_id: str) -> Optional[Job]:
+        raw = self.client.get(JOB_KEY + job_id)
+        return Job(**json.loads(raw)) if raw else None
+
+    def add_event(self, job_id: str, event: Dict[str, Any]):
+        self.client.rpush(JOB_KEY + job_id + EVENTS_SUFFIX, json.dumps(event))
+
+    def events(self, job_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        return [json.loads(event) for event in self.client.lrange(JOB_KEY + job_id + EVENTS_SUFFIX, start, -1)]
+
+    def push(self, job_id: str):
+        self.client.rpush(QUEUE_KEY, job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        item = self.blocking_client.blpop([QUEUE_KEY], timeout=max(1, int(timeout)))
+        return item[1] if item else None
+
+    def queued(self) -> int:
+        return self.client.llen(QUEUE_KEY)
+
+
+def run_summarize(job: Job, emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Summarize `payload['text']`, emitting the chunk and merge events."""
+    from aiwatcher.ai_models.summarizer import get_summarization_server
+
+    text = job.payload['text']
+    cache = get_inference_cache()
+    key = model_cache_key('summarizer', compute_content_hash(text))
+    final = cache.get(key)
+    if final is None:
+        for event in get_summarization_server().summarize_chunked(text):
+            if event['event'] == 'final':
+                final = event
+            else:
+                emit(event)
+        cache.set(key, final)
+    return {**final['summary'], 'chunks': final['chunks']}
+
+
+def run_entities(job: Job, emit: Callable[[Dict[str, Any]], None]) -> List[Dict[str, Any]]:
+    """Extract the entities of `payload['text']`."""
+    from aiwatcher.ai_models.model_manager import get_model_manager
+
+    text = job.payload['text']
+    return get_inference_cache().get_or_compute(
+        model_cache_key('ner', compute_content_hash(text)),
+        lambda: [entity.to_dict() for entity in get_model_manager().get('ner').extract(text)],
+    )
+
+
+JOB_HANDLERS: Dict[str, Callable[[Job, Callable[[Dict[str, Any]], None]], Any]] = {
+    'summarize': run_summarize,
+    'entities': run_entities,
+}
+
+
+class JobManager:
+    """Queue of inference jobs and the pool of threads running them."""
+
+    def __init__(self, backend=None, workers: Optional[int] = None):
+        if backend is None:
+            client = connect_redis()
+            # Pas de timeout de socket pour les workers qui attendent sur BLPOP
+            backend = RedisJobBackend(client, connect_redis(socket_timeout=None)) if client is not None else LocalJobBackend()
+        self.backend = backend
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.threads: List[threading.Thread] = []
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind {kind!r}")
+        job = Job(id=uuid.uuid4().hex, kind=kind, payload=payload)
+        self.backend.save(job)
+        self.backend.push(job.id)
+        return job
+
+    def get(self, job_id: str, events: bool = True) -> Optional[Job]:
+        """Load a job, with its events unless `events` is false."""
+        job = self.backend.load(job_id)
+        if job is not None and events:
+            job.events = self.backend.events(job_id)
+        return job
+
+    async def aget(self, job_id: str, events: bool = True) -> Optional[Job]:
+        """`get()` run in the default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, job_id, events)
+
+    def start(self) -> "JobManager":
+        with self.lock:
+            self.stopping.clear()
+            self.threads = [thread for thread in self.threads if thread.is_alive()]
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'job-worker-{len(self.threads)}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    async def wait(self, job_id: str, timeout: float, interval: float = 0.02) -> Optional[Job]:
+        """Wait up to `timeout` seconds for a job to finish, without holding a thread."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.aget(job_id)
+            if job is None or job.status in FINISHED or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(interval)
+
+    async def watch(self, job_id: str, interval: float = 0.1) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the events of a job as they are recorded, then its final state."""
+        loop = asyncio.get_running_loop()
+        events: List[Dict[str, Any]] = []
+        while True:
+            job = await self.aget(job_id, events=False)
+            if job is None:
+                return
+            # Lus après le job : un job terminé a déjà enregistré tous ses événements
+            new_events = await loop.run_in_executor(None, self.backend.events, job_id, len(events))
+            for event in new_events:
+                yield event
+            events.extend(new_events)
+            if job.status in FINISHED:
+                job.events = events
+                yield {'event': job.status, 'job': job.to_dict()}
+                return
+            await asyncio.sleep(interval)
+
+    def _work(self):
+        while not self.stopping.is_set():
+            job_id = self.backend.pop(timeout=0.5)
+            if job_id is None:
+                continue
+            job = self.backend.load(job_id)
+            if job is None:
+                continue
+            self._run(job)
+
+    def _run(self, job: Job):
+        job.status = RUNNING
+        job.updated_at = time.time()
+        self.backend.save(job)
+
+        def emit(event: Dict[str, Any]):
+            job.events.append(event)
+            self.backend.add_event(job.id, event)
+
+        try:
+            job.result = JOB_HANDLERS[job.kind](job, emit)
+            job.status = DONE
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status, job.error = FAILED, str(e)
+        job.updated_at = time.time()
+        self.backend.save(job)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+if __name__ == '__main__':
+    # Worker autonome consommant la file Redis
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    manager = get_job_manager().start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        manager.stop()
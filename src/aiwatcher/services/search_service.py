@@ -0,0 +1,69 @@
+"""Full-text search over the articles and their summaries.
+
+`search_articles()` ranks the articles matching a free-text query on their
+title, content and summaries, and returns a highlighted snippet of the best
+matching passage. PostgreSQL uses the `search_vector` GIN indexes
+(`websearch_to_tsquery`, `ts_rank_cd`, `ts_headline`); SQLite uses the FTS5
+table (`bm25`, `snippet`). See `database/search.py` for the index itself.
+
+The source filter applies to every match, on articles and on summaries,
+before the results are ranked and limited.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+
+HIGHLIGHT_START, HIGHLIGHT_STOP = '<mark>', '</mark>'
+TERM_RE = re.compile(r'\w+')
+
+POSTGRES_SEARCH = text(f"""
+    WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+    hits AS (
+        SELECT a.id, ts_rank_cd(a.search_vector, q.query) AS rank
+        FROM articles a, q
+        WHERE a.search_vector @@ q.query AND (CAST(:source AS VARCHAR) IS NULL OR a.source = :source)
+        UNION ALL
+        SELECT s.article_id, ts_rank_cd(s.search_vector, q.query)
+        FROM summaries s JOIN articles a ON a.id = s.article_id, q
+        WHERE s.search_vector @@ q.query AND (CAST(:source AS VARCHAR) IS NULL OR a.source = :source)
+    ),
+    ranked AS (
+        SELECT id, sum(rank) AS rank FROM hits GROUP BY id ORDER BY rank DESC LIMIT :limit
+    )
+    SELECT a.id, a.title, a.url, a.source, a.published_date, r.rank,
+           ts_headline('english', coalesce(a.cleaned_content, a.raw_content, ''), q.query,
+                       'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MinWords=10, MaxWords=30') AS snippet
+    FROM ranked r JOIN articles a ON a.id = r.id, q
+    ORDER BY r.rank DESC
+""")
+
+# bm25 : poids du titre, du contenu et des résumés ; plus petit = plus pertinent
+SQLITE_SEARCH = text(f"""
+    SELECT a.id, a.title, a.url, a.source, a.published_date,
+           -bm25(article_search, 10.0, 1.0, 2.0) AS rank,
+           snippet(article_search, 1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 30) AS snippet
+    FROM article_search JOIN articles a ON a.id = article_search.rowid
+    WHERE article_search MATCH :query AND (:source IS NULL OR a.source = :source)
+    ORDER BY bm25(article_search, 10.0, 1.0, 2.0)
+    LIMIT :limit
+""")
+
+
+def fts5_query(query: str) -> str:
+    """Quote each term of a free-text query for FTS5 (all terms must match)."""
+    return ' '.join(f'"{term}"' for term in TERM_RE.findall(query))
+
+
+def search_articles(conn, query: str, limit: int = 20, source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return the articles matching `query`, best first."""
+    if conn.dialect.name == 'postgresql':
+        rows = conn.execute(POSTGRES_SEARCH, {'query': query, 'limit': limit, 'source': source})
+    elif conn.dialect.name == 'sqlite':
+        match = fts5_query(query)
+        if not match:
+            return []
+        rows = conn.execute(SQLITE_SEARCH, {'query': match, 'limit': limit, 'source': source})
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {conn.dialect.name}")
+    return [dict(row._mapping) for row in rows]
@@ -0,0 +1,328 @@
+"""Incremental daily digests and trends.
+
+`TrendAggregator` keeps `DailyDigest` and `Trend` up to date as the batch
+processor commits articles and entities, without scanning the history:
+
+- `article_aggregates` records the day (publication date, else scraping
+  date), source and category under which each processed article is counted,
+  and `daily_mentions` counts the mentions of each keyword per day. Entities
+  are keywords, grouped by category (`ENTITY_CATEGORIES`);
+- `remove()` subtracts the contribution of articles about to be reprocessed
+  and `add()` adds that of the articles just written, both in the writer's
+  transaction; the work is proportional to the entities of those articles;
+- `refresh()` then recomputes the digests of the days and the trends of the
+  keywords that changed. A digest reads the counters of its day, a trend the
+  last `MONTH_DAYS` days of counters of its keyword;
+- windows slide with time: once a day, the trends still counting mentions in
+  the last month are refreshed by `roll()`, which only reads the last month
+  of counters.
+
+Top entities of a digest are the keywords with the most mentions that day;
+trending topics are the keywords mentioned that day whose mentions grew the
+most from the previous week (`growth_rate`).
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import Engine, and_, case, delete, func, insert, select, tuple_
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Article, ArticleAggregate, DailyDigest, DailyMention, Entity, Trend
+from aiwatcher.services.article_service import UPSERT_DIALECTS
+
+logger = logging.getLogger(__name__)
+
+WEEK_DAYS, MONTH_DAYS = 7, 30
+# Catégorie de tendance de chaque type d'entité NER
+ENTITY_CATEGORIES = {'PER': 'researcher', 'ORG': 'organization', 'MISC': 'model', 'LOC': 'location'}
+DIGEST_TOPS = {'top_researchers': 'researcher', 'top_organizations': 'organization', 'top_models': 'model'}
+# Taille des lots de lignes par requête (limite de variables de SQLite)
+BATCH_ROWS = 400
+
+Key = Tuple[str, str]
+
+
+def day_of(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+
+def entity_category(entity_type: str) -> str:
+    return ENTITY_CATEGORIES.get(entity_type, entity_type.lower())
+
+
+def batches(items: Sequence[Any], size: int = BATCH_ROWS) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Changes:
+    """Days and keywords whose aggregates must be refreshed."""
+
+    def __init__(self):
+        self.days: Set[datetime] = set()
+        self.keywords: Set[Key] = set()
+        # Articles ajoutés ou retirés par mot-clé, pour `Trend.related_articles`
+        self.added: Dict[Key, Set[int]] = {}
+        self.removed: Dict[Key, Set[int]] = {}
+
+
+class TrendAggregator:
+    """Maintains the daily counters, digests and trends in the writer's transaction."""
+
+    def __init__(self, top_k: Optional[int] = None, related_articles: Optional[int] = None):
+        self.top_k = top_k or settings.TREND_TOP_K
+        self.related_articles = related_articles or settings.TREND_RELATED_ARTICLES
+
+    def remove(self, conn, article_ids: Sequence[int], changes: Optional[Changes] = None) -> Changes:
+        """Subtract the contribution of articles counted before (call before deleting their entities)."""
+        changes = changes or Changes()
+        counted = dict(conn.execute(
+            select(ArticleAggregate.article_id, ArticleAggregate.date).where(ArticleAggregate.article_id.in_(article_ids))
+        ).all())
+        if not counted:
+            return changes
+        deltas = self._mentions(conn, counted, changes.removed)
+        self._add_mentions(conn, {key: (-mentions, -articles) for key, (mentions, articles) in deltas.items()})
+        conn.execute(delete(ArticleAggregate).where(ArticleAggregate.article_id.in_(list(counted))))
+        changes.days.update(counted.values())
+        changes.keywords.update((category, keyword) for _, category, keyword in deltas)
+        return changes
+
+    def add(self, conn, article_ids: Sequence[int], changes: Optional[Changes] = None) -> Changes:
+        """Count articles and their entities (call once they are written)."""
+        changes = changes or Changes()
+        rows = conn.execute(
+            select(
+                Article.id, Article.source, Article.category,
+                func.coalesce(Article.published_date, Article.scraped_date),
+            ).where(Article.id.in_(article_ids))
+        ).all()
+        if not rows:
+            return changes
+        counted = {article_id: day_of(date) for article_id, _, _, date in rows}
+        conn.execute(insert(ArticleAggregate), [
+            {'article_id': article_id, 'date': counted[article_id], 'source': source, 'category': category}
+            for article_id, source, category, _ in rows
+        ])
+        deltas = self._mentions(conn, counted, changes.added)
+        self._add_mentions(conn, deltas)
+        changes.days.update(counted.values())
+        changes.keywords.update((category, keyword) for _, category, keyword in deltas)
+        return changes
+
+    def refresh(self, conn, changes: Changes, now: Optional[datetime] = None):
+        """Recompute the trends and digests touched by `changes`, and slide the windows."""
+        today = day_of(now or datetime.now())
+        stale = conn.execute(
+            select(Trend.category, Trend.keyword).where(Trend.updated_date < today, Trend.month_mentions > 0)
+        ).all()
+        keywords = changes.keywords | {tuple(key) for key in stale}
+        if keywords:
+            self._refresh_trends(conn, sorted(keywords), changes, today)
+        for day in sorted(changes.days):
+            self._refresh_digest(conn, day)
+
+    def roll(self, conn, now: Optional[datetime] = None):
+        """Slide the trend windows to `now` (done by `refresh()` too)."""
+        self.refresh(conn, Changes(), now)
+
+    @staticmethod
+    def _mentions(conn, counted: Dict[int, datetime], articles: Dict[Key, Set[int]]) -> Dict[Tuple[datetime, str, str], Tuple[int, int]]:
+        """Mentions and distinct articles per (day, category, keyword) of the entities of `counted`.
+
+        The articles mentioning each keyword are added to `articles`.
+        """
+        mentions: Counter = Counter()
+        seen: Dict[Tuple[datetime, str, str], Set[int]] = {}
+        rows = conn.execute(
+            select(Entity.article_id, Entity.entity_type, func.coalesce(Entity.canonical_name, Entity.entity_text))
+            .where(Entity.article_id.in_(list(counted)))
+        )
+        for article_id, entity_type, keyword in rows:
+            category = entity_category(entity_type)
+            key = (counted[article_id], category, keyword)
+            mentions[key] += 1
+            seen.setdefault(key, set()).add(article_id)
+            articles.setdefault((category, keyword), set()).add(article_id)
+        return {key: (count, len(seen[key])) for key, count in mentions.items()}
+
+    @staticmethod
+    def _add_mentions(conn, deltas: Dict[Tuple[datetime, str, str], Tuple[int, int]]):
+        if not deltas:
+            return
+        insert_stmt = UPSERT_DIALECTS[conn.dialect.name]
+        rows = [
+            {'date': date, 'category': category, 'keyword': keyword, 'mentions': mentions, 'articles': articles}
+            for (date, category, keyword), (mentions, articles) in deltas.items()
+        ]
+        for batch in batches(rows):
+            stmt = insert_stmt(DailyMention).values(list(batch))
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[DailyMention.date, DailyMention.category, DailyMention.keyword],
+                set_={
+                    'mentions': DailyMention.mentions + stmt.excluded.mentions,
+                    'articles': DailyMention.articles + stmt.excluded.articles,
+                },
+            ))
+            # Seules les clés décrémentées peuvent tomber à zéro : pas de parcours de la table
+            emptied = [(row['date'], row['category'], row['keyword']) for row in batch if row['mentions'] < 0]
+            if emptied:
+                conn.execute(delete(DailyMention).where(
+                    tuple_(DailyMention.date, DailyMention.category, DailyMention.keyword).in_(emptied),
+                    DailyMention.mentions <= 0,
+                ))
+
+    def _refresh_trends(self, conn, keywords: Sequence[Key], changes: Changes, today: datetime):
+        week_start = today - timedelta(days=WEEK_DAYS - 1)
+        previous_start = week_start - timedelta(days=WEEK_DAYS)
+        month_start = today - timedelta(days=MONTH_DAYS - 1)
+        insert_stmt = UPSERT_DIALECTS[conn.dialect.name]
+        now = datetime.now()
+
+        for batch in batches(keywords):
+            key = tuple_(DailyMention.category, DailyMention.keyword)
+            windows = {
+                (category, keyword): (week, previous, month)
+                for category, keyword, week, previous, month in conn.execute(
+                    select(
+                        DailyMention.category,
+                        DailyMention.keyword,
+                        func.sum(case((DailyMention.date >= week_start, DailyMention.mentions), else_=0)),
+                        func.sum(case((and_(DailyMention.date >= previous_start, DailyMention.date < week_start), DailyMention.mentions), else_=0)),
+                        func.sum(case((DailyMention.date >= month_start, DailyMention.mentions), else_=0)),
+                    )
+                    .where(key.in_(list(batch)), DailyMention.date >= min(previous_start, month_start), DailyMention.date <= today)
+                    .group_by(DailyMention.category, DailyMention.keyword)
+                )
+            }
+            related = {
+                (category, keyword): articles or []
+                for category, keyword, articles in conn.execute(
+                    select(Trend.category, Trend.keyword, Trend.related_articles)
+                    .where(tuple_(Trend.category, Trend.keyword).in_(list(batch)))
+                )
+            }
+
+            rows = []
+            for category, keyword in batch:
+                week, previous, month = windows.get((category, keyword), (0, 0, 0))
+                removed = changes.removed.get((category, keyword), set())
+                added = changes.added.get((category, keyword), set())
+                # Articles les plus récents en tête
+                articles = sorted(added, reverse=True) + [
+                    article_id for article_id in related.get((category, keyword), [])
+                    if article_id not in removed and article_id not in added
+                ]
+                rows.append({
+                    'keyword': keyword,
+                    'category': category,
+                    'week_mentions': int(week or 0),
+                    'month_mentions': int(month or 0),
+                    'growth_rate': (int(week or 0) - int(previous or 0)) / max(int(previous or 0), 1),
+                    'related_articles': articles[:self.related_articles],
+                    'updated_date': now,
+                })
+            stmt = insert_stmt(Trend).values(rows)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[Trend.keyword, Trend.category],
+                set_={name: getattr(stmt.excluded, name) for name in (
+                    'week_mentions', 'month_mentions', 'growth_rate', 'related_articles', 'updated_date',
+                )},
+            ))
+
+    def _refresh_digest(self, conn, day: datetime):
+        counts = conn.execute(
+            select(ArticleAggregate.source, ArticleAggregate.category, func.count())
+            .where(ArticleAggregate.date == day)
+            .group_by(ArticleAggregate.source, ArticleAggregate.category)
+        ).all()
+        if not counts:
+            conn.execute(delete(DailyDigest).where(DailyDigest.date == day))
+            return
+
+        by_source: Counter = Counter()
+        by_category: Counter = Counter()
+        for source, category, count in counts:
+            by_source[source] += count
+            if category:
+                by_category[category] += count
+        row: Dict[str, Any] = {
+            'date': day,
+            'total_articles': sum(by_source.values()),
+            'articles_by_source': dict(by_source),
+            'articles_by_category': dict(by_category),
+            'updated_date': datetime.now(),
+        }
+        for column, category in DIGEST_TOPS.items():
+            row[column] = list(conn.execute(
+                select(DailyMention.keyword)
+                .where(DailyMention.date == day, DailyMention.category == category)
+                .order_by(DailyMention.mentions.desc(), DailyMention.keyword)
+                .limit(self.top_k)
+            ).scalars())
+        # Un mot-clé présent dans plusieurs catégories n'apparaît qu'une fois
+        row['trending_topics'] = list(conn.execute(
+            select(Trend.keyword)
+            .join(DailyMention, and_(DailyMention.keyword == Trend.keyword, DailyMention.category == Trend.category))
+            .where(DailyMention.date == day)
+            .group_by(Trend.keyword)
+            .order_by(func.max(Trend.growth_rate).desc(), func.max(Trend.week_mentions).desc(), Trend.keyword)
+            .limit(self.top_k)
+        ).scalars())
+
+        stmt = UPSERT_DIALECTS[conn.dialect.name](DailyDigest).values(row)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyDigest.date],
+            set_={name: getattr(stmt.excluded, name) for name in row if name != 'date'},
+        ))
+
+
+def aggregate_articles(engine: Engine, chunk_size: int = 500) -> int:
+    """Count the processed articles missing from the aggregates; return how many were added."""
+    aggregator = TrendAggregator()
+    last_id, added = 0, 0
+    while True:
+        with engine.begin() as conn:
+            ids = list(conn.execute(
+                select(Article.id)
+                .outerjoin(ArticleAggregate, ArticleAggregate.article_id == Article.id)
+                .where(Article.is_processed.is_(True), ArticleAggregate.article_id.is_(None), Article.id > last_id)
+                .order_by(Article.id)
+                .limit(chunk_size)
+            ).scalars())
+            if not ids:
+                return added
+            aggregator.refresh(conn, aggregator.add(conn, ids))
+        last_id = ids[-1]
+        added += len(ids)
+        logger.info("Aggregated %d articles", added)
+
+
+def list_digests(conn, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Digests of the days in `[start, end]`, newest first."""
+    rows = conn.execute(
+        select(*DailyDigest.__table__.columns)
+        .where(DailyDigest.date >= day_of(start), DailyDigest.date <= day_of(end))
+        .order_by(DailyDigest.date.desc())
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def list_trends(conn, category: Optional[str] = None, order: str = 'week_mentions', limit: int = 20) -> List[Dict[str, Any]]:
+    """Trends with mentions in the last month, by decreasing `order` column."""
+    if order not in ('week_mentions', 'month_mentions', 'growth_rate'):
+        raise ValueError(f"Cannot order trends by {order!r}")
+    stmt = select(*Trend.__table__.columns).where(Trend.month_mentions > 0)
+    if category is not None:
+        stmt = stmt.where(Trend.category == category)
+    stmt = stmt.order_by(getattr(Trend, order).desc(), Trend.week_mentions.desc(), Trend.keyword).limit(limit)
+    return [dict(row._mapping) for row in conn.execute(stmt)]
+
+
+if __name__ == '__main__':
+    # Agrégation des articles traités avant la mise en place des compteurs
+    from aiwatcher.database.connection import get_engine
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    print(f"Aggregated {aggregate_articles(get_engine())} articles")
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine
+
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Base
+from aiwatcher.database.search import create_search_index
+
+
+@pytest.fixture(autouse=True)
+def local_state(monkeypatch):
+    """Keep the caches, job queue and response versions in process, whatever REDIS_URL says."""
+    from aiwatcher.services import cache_service
+
+    monkeypatch.setattr(settings, 'REDIS_URL', '')
+    for name in ('_store', '_cache', '_response_cache'):
+        if hasattr(cache_service, name):
+            monkeypatch.setattr(cache_service, name, None)
+    monkeypatch.setattr(cache_service, '_data_version', (None, 0.0))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """SQLite database with the schema and the FTS5 search index."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'aiwatcher.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        create_search_index(conn)
+    yield engine
+    engine.dispose()
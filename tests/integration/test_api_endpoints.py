@@ -0,0 +1,162 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from starlette.requests import Request
+
+from aiwatcher.api.main import app
+from aiwatcher.api.middleware import response_key
+from aiwatcher.api.routers import articles
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Article
+from aiwatcher.services import cache_service, job_service
+from aiwatcher.services.cache_service import invalidate_responses
+from aiwatcher.services.job_service import JobManager, LocalJobBackend
+
+
+class LosingBackend(LocalJobBackend):
+    """Backend whose jobs disappear, as when Redis is flushed."""
+
+    def load(self, job_id):
+        return None
+
+
+class CountingBackend(LocalJobBackend):
+    """Backend recording every write of a job record."""
+
+    def __init__(self):
+        super().__init__()
+        self.saved = []
+
+    def save(self, job):
+        self.saved.append(job.to_json())
+        super().save(job)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, 'INLINE_LATENCY_BUDGET', 0.2)
+    return TestClient(app)
+
+
+def use_manager(monkeypatch, manager):
+    monkeypatch.setattr(job_service, '_manager', manager)
+    return manager
+
+
+def test_entities_inline_when_the_job_finishes_in_time(client, monkeypatch):
+    monkeypatch.setitem(job_service.JOB_HANDLERS, 'entities', lambda job, emit: [])
+    manager = use_manager(monkeypatch, JobManager(LocalJobBackend(), workers=1)).start()
+    try:
+        response = client.post('/entities', json={'text': 'OpenAI and Google.'})
+    finally:
+        manager.stop()
+    assert response.status_code == 200
+    assert response.json() == {'entities': []}
+
+
+def test_pending_job_is_accepted(client, monkeypatch):
+    use_manager(monkeypatch, JobManager(LocalJobBackend(), workers=1))
+    response = client.post('/summarize', json={'text': 'A short text.'})
+    assert response.status_code == 202
+    assert response.json()['status'] == 'queued'
+
+
+def test_lost_job_is_unavailable(client, monkeypatch):
+    for path in ('/summarize', '/entities'):
+        use_manager(monkeypatch, JobManager(LosingBackend(), workers=1))
+        response = client.post(path, json={'text': 'A short text.'})
+        assert response.status_code == 503
+
+
+def test_job_events_are_stored_apart_from_the_job(client, monkeypatch):
+    def handler(job, emit):
+        for n in range(3):
+            emit({'event': 'chunk', 'index': n})
+        return {'chunks': 3}
+
+    monkeypatch.setitem(job_service.JOB_HANDLERS, 'entities', handler)
+    backend = CountingBackend()
+    manager = use_manager(monkeypatch, JobManager(backend, workers=1))
+    job = manager.submit('entities', {'text': 'A long input text.'})
+    manager._run(backend.load(job.id))
+
+    # Enregistrements du job : soumis, en cours, terminé ; aucun par événement
+    assert [json.loads(raw)['status'] for raw in backend.saved] == ['queued', 'running', 'done']
+    assert all('events' not in json.loads(raw) for raw in backend.saved)
+
+    events = [{'event': 'chunk', 'index': n} for n in range(3)]
+    response = client.get(f'/jobs/{job.id}')
+    assert response.status_code == 200
+    assert response.json()['events'] == events and response.json()['result'] == {'chunks': 3}
+
+    lines = [json.loads(line) for line in client.get(f'/jobs/{job.id}/events').text.splitlines()]
+    assert lines[:3] == events
+    assert lines[3]['event'] == 'done' and lines[3]['job']['events'] == events
+    assert client.get('/jobs/missing').status_code == 404
+    assert client.get('/jobs/missing/events').status_code == 404
+
+
+def test_summary_is_streamed_as_json_lines(client, monkeypatch):
+    summary = {'short_summary': 's', 'medium_summary': 'm', 'long_summary': 'l', 'model_used': 'fake', 'model_version': None}
+
+    def handler(job, emit):
+        emit({'event': 'chunk', 'index': 0, 'total': 2, 'summary': 'first'})
+        emit({'event': 'chunk', 'index': 1, 'total': 2, 'summary': 'second'})
+        emit({'event': 'merge', 'level': 1, 'summaries': ['both']})
+        return {**summary, 'chunks': 2}
+
+    monkeypatch.setitem(job_service.JOB_HANDLERS, 'summarize', handler)
+    manager = use_manager(monkeypatch, JobManager(LocalJobBackend(), workers=1)).start()
+    try:
+        response = client.post('/summarize', json={'text': 'A long text. ' * 50, 'stream': True})
+    finally:
+        manager.stop()
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event['event'] for event in events] == ['queued', 'chunk', 'chunk', 'merge', 'final']
+    assert len({event.get('job_id') for event in events[::4]}) == 1
+    assert events[-1]['chunks'] == 2 and events[-1]['summary'] == summary
+
+
+def test_article_list_is_cached_and_revalidated(client, engine, monkeypatch):
+    monkeypatch.setattr(articles, 'get_engine', lambda: engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Article).values(title='First', url='https://example.org/1', source='a', content_hash='1'))
+
+    first = client.get('/articles')
+    second = client.get('/articles')
+    assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+    assert second.json() == first.json()
+    etag = first.headers['ETag']
+    assert client.get('/articles', headers={'If-None-Match': etag}).status_code == 304
+
+    with engine.begin() as conn:
+        conn.execute(insert(Article).values(title='Second', url='https://example.org/2', source='a', content_hash='2'))
+    invalidate_responses()
+    third = client.get('/articles', headers={'If-None-Match': etag})
+    assert third.status_code == 200 and third.headers['X-Cache'] == 'MISS'
+    assert len(third.json()['items']) == 2
+
+
+def test_revalidation_does_not_run_the_endpoint(client, engine, monkeypatch):
+    monkeypatch.setattr(articles, 'get_engine', lambda: engine)
+    etag = client.get('/articles').headers['ETag']
+
+    def unreachable():
+        raise AssertionError('the endpoint ran')
+
+    monkeypatch.setattr(articles, 'get_engine', unreachable)
+    # Même après éviction de la réponse en cache, l'ETag se revalide sans requête
+    monkeypatch.setattr(cache_service, '_response_cache', None)
+    response = client.get('/articles', headers={'If-None-Match': f'W/{etag}, "other"'})
+    assert response.status_code == 304 and response.headers['ETag'] == etag
+
+
+def test_response_key_keeps_query_values_apart():
+    def key(query):
+        return response_key(Request({'type': 'http', 'path': '/articles', 'query_string': query.encode(), 'headers': []}), '1')
+
+    assert key('q=a%26b%3Dc') != key('q=a&b=c')
+    assert key('b=2&a=1&a=0') == key('a=0&a=1&b=2')
@@ -0,0 +1,192 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from aiwatcher.ai_models import model_manager
+from aiwatcher.ai_models.model_manager import ModelManager, load_backend, load_model, loaded_model, recorded_parity
+from aiwatcher.core.config import settings
+
+MB = 1024 ** 2
+
+
+class FakeWeights:
+    def __init__(self, size):
+        self.size = size
+
+    def numel(self):
+        return self.size
+
+    def element_size(self):
+        return 1
+
+
+class FakeModel:
+    def __init__(self, size):
+        self.weights = FakeWeights(size)
+
+    def state_dict(self):
+        return {'weight': self.weights}
+
+
+class FakeEngine:
+    size = 100 * MB
+    # Modèles présents en mémoire au moment de chaque chargement
+    resident_at_load = []
+    loads = 0
+
+    def __init__(self):
+        self.model = None
+        self.tokenizer = None
+
+    def load(self):
+        FakeEngine.resident_at_load.append(sum(engine.model is not None for engine in ENGINES))
+        FakeEngine.loads += 1
+        self.tokenizer = 'tokenizer'
+        self.model = FakeModel(self.size)
+        ENGINES.append(self)
+        return self
+
+    def unload(self):
+        self.model = None
+
+
+ENGINES = []
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(model_manager, 'MODEL_ENGINES', {
+        name: f'{__name__}:FakeEngine' for name in ('summarizer', 'ner', 'embedder')
+    })
+    monkeypatch.setattr(FakeEngine, 'resident_at_load', [])
+    monkeypatch.setattr(FakeEngine, 'loads', 0)
+    ENGINES.clear()
+    manager = ModelManager(max_loaded=1, memory_budget_gb=1)
+    monkeypatch.setattr(model_manager, '_manager', manager)
+    return manager
+
+
+def test_evicted_engine_is_reloaded_through_the_manager(manager):
+    summarizer = manager.get('summarizer')
+    manager.get('ner')
+    assert summarizer.model is None
+    assert summarizer.tokenizer == 'tokenizer'
+
+    model, tokenizer = loaded_model('summarizer', summarizer)
+
+    assert model is summarizer.model and tokenizer == 'tokenizer'
+    assert manager.states() == {'summarizer': 'loaded', 'ner': 'unloaded', 'embedder': 'unloaded'}
+
+
+def test_eviction_happens_before_the_load(manager):
+    manager.get('summarizer')
+    manager.get('ner')
+    manager.get('summarizer')
+
+    assert FakeEngine.resident_at_load == [0, 0, 0]
+    assert manager.sizes == {'summarizer': 100 * MB, 'ner': 100 * MB}
+
+
+def test_memory_budget_is_checked_with_the_known_size(manager):
+    manager.max_loaded = 3
+    manager.memory_budget = 250 * MB
+    for name in ('summarizer', 'ner', 'embedder'):
+        manager.get(name)
+    # Taille encore inconnue : l'éviction n'a lieu qu'après le chargement
+    assert list(manager.loaded) == ['ner', 'embedder']
+    assert FakeEngine.resident_at_load == [0, 1, 2]
+
+    # Taille connue : ner part avant que summarizer soit rechargé
+    manager.get('summarizer')
+    assert list(manager.loaded) == ['embedder', 'summarizer']
+    assert FakeEngine.resident_at_load[-1] == 1
+
+
+def test_unmanaged_engine_must_be_loaded_explicitly(manager):
+    with pytest.raises(RuntimeError):
+        loaded_model('summarizer', FakeEngine())
+    assert FakeEngine.loads == 0
+
+
+@pytest.fixture(scope='module')
+def tiny_model(tmp_path_factory):
+    """A small random BERT token classifier and its word-level tokenizer, saved locally."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import BertConfig, BertForTokenClassification, PreTrainedTokenizerFast
+
+    words = ['[PAD]', '[UNK]', '[CLS]', '[SEP]'] + sorted({word for text in model_manager.PARITY_TEXTS for word in text.split()})
+    backend = Tokenizer(models.WordLevel({word: i for i, word in enumerate(words)}, unk_token='[UNK]'))
+    backend.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, pad_token='[PAD]', unk_token='[UNK]', cls_token='[CLS]', sep_token='[SEP]')
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(words), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=128, num_labels=3,
+    )
+    path = str(tmp_path_factory.mktemp('models') / 'tiny-ner')
+    BertForTokenClassification(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path, tokenizer
+
+
+@pytest.fixture
+def optimized_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'OPTIMIZED_MODELS_DIR', str(tmp_path / 'optimized'))
+
+
+def linear_modules(model):
+    return {type(module).__module__ for name, module in model.named_modules() if name.endswith(('query', 'classifier'))}
+
+
+def test_int8_backend_is_checked_once_against_fp32(tiny_model, optimized_dir, monkeypatch):
+    path, tokenizer = tiny_model
+    config = {'model_name': path, 'backend': 'torch-int8', 'min_parity': 0.9}
+    _, model, backend = load_backend(config, 'token-classification', tokenizer)
+    assert backend == 'torch-int8'
+    assert all('quantized' in module for module in linear_modules(model))
+    assert recorded_parity(path)['torch-int8'] >= 0.9
+
+    # Le résultat enregistré dispense de refaire la vérification
+    def check_parity(*args, **kwargs):
+        raise AssertionError('parity checked twice')
+
+    monkeypatch.setattr(model_manager, 'check_parity', check_parity)
+    assert load_backend(config, 'token-classification', tokenizer)[2] == 'torch-int8'
+
+
+def test_backend_below_min_parity_falls_back_to_fp32(tiny_model, optimized_dir):
+    path, tokenizer = tiny_model
+    model_manager.record_parity(path, 'torch-int8', 0.5)
+    _, model, backend = load_backend({'model_name': path, 'backend': 'torch-int8', 'min_parity': 0.9}, 'token-classification', tokenizer)
+    assert backend == 'torch'
+    assert not any('quantized' in module for module in linear_modules(model))
+
+
+def test_onnx_int8_export_is_cached(tiny_model, optimized_dir, monkeypatch):
+    pytest.importorskip('optimum.onnxruntime')
+    path, tokenizer = tiny_model
+    config = {'model_name': path, 'backend': 'onnx-int8', 'min_parity': 0.9}
+    _, model, backend = load_backend(config, 'token-classification', tokenizer)
+    assert backend == 'onnx-int8' and type(model).__name__ == 'ORTModelForTokenClassification'
+    assert sorted(name for name in os.listdir(model_manager.optimized_dir(path, 'onnx-int8')) if name.endswith('.onnx')) == ['model_quantized.onnx']
+    assert model_manager.model_memory_bytes(SimpleNamespace(model=model)) > 0
+
+    # Deuxième chargement : ni export ni quantification
+    monkeypatch.setattr('optimum.onnxruntime.ORTQuantizer.from_pretrained', lambda *args, **kwargs: pytest.fail('quantized twice'))
+    assert load_backend(config, 'token-classification', tokenizer)[2] == 'onnx-int8'
+
+
+def test_onnx_int8_falls_back_to_torch_int8_without_optimum(tiny_model, optimized_dir, monkeypatch):
+    path, _ = tiny_model
+
+    def load_onnx_model(*args, **kwargs):
+        raise ImportError('optimum')
+
+    monkeypatch.setattr(model_manager, 'load_onnx_model', load_onnx_model)
+    assert load_model(path, 'token-classification', 'onnx-int8')[1] == 'torch-int8'
+    with pytest.raises(ImportError):
+        load_model(path, 'token-classification', 'onnx')
+    with pytest.raises(ValueError):
+        load_model(path, 'token-classification', 'tensorrt')
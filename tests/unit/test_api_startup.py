@@ -0,0 +1,40 @@
+"""Import-time budget of the API.
+
+Every uvicorn worker and every pod restart imports `aiwatcher.api.main`, so it
+must not pull in the model or scraping stacks and must stay within
+`IMPORT_BUDGET` seconds (`AIWATCHER_IMPORT_BUDGET` overrides it on slow
+machines). Each measure runs in a fresh interpreter.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+IMPORT_BUDGET = float(os.environ.get('AIWATCHER_IMPORT_BUDGET', '1.0'))
+HEAVY_MODULES = ('torch', 'transformers', 'optimum', 'numpy', 'scrapy', 'pandas')
+
+MEASURE = f"""
+import json, sys, time
+start = time.perf_counter()
+import aiwatcher.api.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def import_api() -> dict:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [os.path.abspath(SRC), os.environ.get('PYTHONPATH')]))}
+    output = subprocess.run([sys.executable, '-c', MEASURE], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_api_import_skips_heavy_modules():
+    assert import_api()['heavy'] == []
+
+
+def test_api_import_within_budget():
+    # Meilleur de trois mesures, la première compile aussi les .pyc
+    seconds = min(import_api()['seconds'] for _ in range(3))
+    assert seconds < IMPORT_BUDGET, f"importing aiwatcher.api.main took {seconds:.2f}s (budget {IMPORT_BUDGET}s)"
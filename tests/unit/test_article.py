@@ -0,0 +1,67 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from aiwatcher.core import article as article_module
+from aiwatcher.core.article import Article, read_jsonl, read_msgpack, write_jsonl, write_msgpack
+
+DATES = [
+    None,
+    datetime(2024, 5, 1, 12, 30, 15, 123456),
+    datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+    datetime(1950, 7, 14, 8, 0, 0, 500),
+    # Au-delà des 34 bits du timestamp 64 bits
+    datetime(2600, 1, 1),
+]
+
+
+def make_articles():
+    return [
+        Article(
+            title=f'Titre {n} — "quoted"', link=f'https://example.org/{n}', date=date, source='hf',
+            content='x' * (n * 100), img=None if n % 2 else 'https://example.org/a.png',
+            keywords=['llm', 'é'] * n, authors=[f'author {n}'],
+        )
+        for n, date in enumerate(DATES)
+    ]
+
+
+def test_aware_and_string_dates_are_stored_in_utc():
+    assert make_articles()[2].date == datetime(2024, 5, 1, 10, 30)
+    assert Article('t', 'l', '2024-05-01T12:30:00+02:00', 's', 'c').date == datetime(2024, 5, 1, 10, 30)
+    assert Article('t', 'l', '', 's', 'c').date is None
+
+
+def test_unparseable_date_is_logged(caplog):
+    with caplog.at_level('WARNING', logger='aiwatcher.core.article'):
+        assert Article('t', 'https://example.org/1', 'yesterday', 'hf', 'c').date is None
+        assert Article('t', 'https://example.org/2', '  ', 'hf', 'c').date is None
+    assert [record.getMessage() for record in caplog.records] == [
+        "Unparseable date 'yesterday' for article https://example.org/1 (hf)",
+    ]
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_jsonl_round_trip(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(article_module, 'orjson', None)
+    articles = make_articles()
+    buffer = io.BytesIO()
+    assert write_jsonl(articles, buffer) == len(articles)
+    buffer.seek(0)
+    assert list(read_jsonl(buffer)) == articles
+
+
+def test_msgpack_round_trip():
+    articles = make_articles()
+    buffer = io.BytesIO()
+    assert write_msgpack(articles, buffer) == len(articles)
+    buffer.seek(0)
+    assert list(read_msgpack(buffer)) == articles
+    assert Article.from_msgpack(articles[3].to_msgpack()) == articles[3]
+
+
+def test_truncated_msgpack_record_is_rejected():
+    with pytest.raises(ValueError):
+        Article.from_msgpack(make_articles()[1].to_msgpack()[:-3])
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, select, update
+
+from aiwatcher.database.models import Article
+from aiwatcher.services import article_service
+from aiwatcher.services.article_service import ArticleWriter, list_articles
+
+
+def add_articles(engine, dates, source='a'):
+    with engine.begin() as conn:
+        conn.execute(insert(Article), [
+            {
+                'title': f'title {n}', 'url': f'https://example.org/{source}/{n}', 'source': source,
+                'published_date': date, 'raw_content': f'content {source} {n}', 'content_hash': f'{source}{n}',
+            }
+            for n, date in enumerate(dates)
+        ])
+
+
+def all_pages(conn, limit, **filters):
+    ids, cursor = [], None
+    while True:
+        items, cursor = list_articles(conn, fields=['id', 'published_date'], limit=limit, cursor=cursor, **filters)
+        ids.extend(item['id'] for item in items)
+        if cursor is None:
+            return ids
+
+
+def expected_order(conn, **filters):
+    rows, _ = list_articles(conn, fields=['id', 'published_date', 'source'], limit=500)
+    rows = [row for row in rows if all(row[key] == value for key, value in filters.items())]
+    dated = sorted((row for row in rows if row['published_date']), key=lambda row: (row['published_date'], row['id']), reverse=True)
+    undated = sorted((row['id'] for row in rows if not row['published_date']), reverse=True)
+    return [row['id'] for row in dated] + undated
+
+
+def test_pages_cover_dated_then_undated_articles(engine):
+    day = datetime(2024, 1, 1)
+    # Dates répétées et articles sans date, de part et d'autre d'une page
+    add_articles(engine, [day + timedelta(days=n % 4) if n % 5 else None for n in range(23)])
+    add_articles(engine, [day + timedelta(days=n % 3) if n % 4 else None for n in range(11)], source='b')
+    with engine.connect() as conn:
+        expected = expected_order(conn)
+        assert len(expected) == 34
+        for limit in (1, 3, 7, 34, 50):
+            assert all_pages(conn, limit) == expected
+        assert all_pages(conn, 4, source='b') == expected_order(conn, source='b')
+
+
+def test_cursor_queries_use_the_keyset_indexes(engine):
+    add_articles(engine, [datetime(2024, 1, 1)] * 3)
+    with engine.connect() as conn:
+        _, cursor = list_articles(conn, limit=1)
+        plans = []
+        for source in (None, 'a'):
+            statements = []
+
+            def record(statement):
+                if statement.lstrip().upper().startswith('SELECT'):
+                    statements.append(statement)
+
+            conn.connection.driver_connection.set_trace_callback(record)
+            list_articles(conn, limit=1, cursor=cursor, source=source)
+            conn.connection.driver_connection.set_trace_callback(None)
+            for statement in statements:
+                plans.append(' '.join(row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement)))
+    assert len(plans) == 2
+    # Un intervalle d'index, dans l'ordre de la page, sans tri ni OR
+    for plan in plans:
+        assert plan.startswith('SEARCH articles USING') and 'TEMP B-TREE' not in plan and 'MULTI-INDEX' not in plan, plan
+    assert 'ix_articles_source_published_date_id' in plans[1]
+
+
+def item(n, content, link=None):
+    return {'title': f'title {n}', 'link': link or f'https://example.org/{n}', 'source': 'a', 'content': content, 'date': '2024-01-02'}
+
+
+def stored(engine):
+    with engine.connect() as conn:
+        return {
+            url: (content, processed)
+            for url, content, processed in conn.execute(select(Article.url, Article.raw_content, Article.is_processed))
+        }
+
+
+def test_writer_upserts_changed_articles_only(engine):
+    with ArticleWriter(engine, batch_size=100, flush_interval=3600) as writer:
+        # La dernière version d'une URL dans un lot l'emporte
+        assert writer.add_many([item(1, 'first draft'), item(2, 'second'), item(1, 'first')]) == 0
+    assert writer.written == 2
+    assert stored(engine) == {'https://example.org/1': ('first', False), 'https://example.org/2': ('second', False)}
+
+    with engine.begin() as conn:
+        conn.execute(update(Article).values(is_processed=True))
+    writer = ArticleWriter(engine, batch_size=100, flush_interval=3600)
+    # Contenu inchangé : intact ; contenu modifié : à retraiter ; même contenu sous une autre URL : ignoré
+    writer.add_many([item(1, 'first'), item(2, 'second, updated'), item(3, 'first', link='https://mirror.org/1')])
+    assert writer.flush() == 1
+    assert stored(engine) == {'https://example.org/1': ('first', True), 'https://example.org/2': ('second, updated', False)}
+
+
+def test_writer_flushes_full_batches(engine):
+    writer = ArticleWriter(engine, batch_size=3, flush_interval=3600)
+    assert [writer.add(item(n, f'content {n}')) for n in range(7)] == [0, 0, 3, 0, 0, 3, 0]
+    assert writer.add({'title': 'no link'}) == 0
+    assert writer.flush() == 1 and writer.flush() == 0
+    assert len(stored(engine)) == 7
+
+
+def test_large_flushes_are_split_under_the_parameter_limit(engine, monkeypatch):
+    # 14 colonnes par ligne : 3 lignes par requête
+    monkeypatch.setitem(article_service.MAX_BIND_PARAMS, 'sqlite', 50)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement.split()[0], len(parameters)))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    text = ' '.join(f'word{n}' for n in range(60))
+    writer = ArticleWriter(engine, batch_size=100, flush_interval=3600)
+    # Le même contenu sous deux URL de requêtes différentes n'est écrit qu'une fois
+    writer.add_many([item(n, f'{text} {n}') for n in range(9)] + [item(9, f'{text} 0', link='https://mirror.org/0')])
+    assert writer.flush() == 9
+    event.remove(engine, 'before_cursor_execute', record)
+
+    assert max(count for _, count in statements) <= 50
+    # Quatre tranches, la dernière ne contenant que la copie
+    assert len([name for name, _ in statements if name == 'INSERT']) == 3
+    with engine.connect() as conn:
+        canonical = dict(conn.execute(select(Article.url, Article.canonical_id)).all())
+    # Les quasi-doublons sont reliés d'une requête à l'autre
+    assert len(canonical) == 9 and sorted(set(canonical.values()), key=str) == [1, None]
@@ -0,0 +1,142 @@
+"""Batch processing with deterministic stand-ins for the models."""
+
+import threading
+
+import pytest
+from sqlalchemy import insert, select
+
+import batch_process
+from aiwatcher.ai_models.ner_extractor import EntityResult
+from aiwatcher.core.config import settings
+from aiwatcher.database.models import Article, Entity, Summary
+
+TEXT = 'OpenAI released a model that researchers at Stanford evaluated on reasoning tasks.'
+
+
+class FakeServer:
+    max_batch_size = 2
+
+    def start(self):
+        return self
+
+
+class FakeExtractor:
+    """Finds 'OpenAI' and fails on texts containing 'boom'."""
+
+    def extract_batch(self, texts, store=None):
+        if any('boom' in text for text in texts):
+            raise RuntimeError('extraction failed')
+        results = []
+        for text in texts:
+            start = text.find('OpenAI')
+            results.append([] if start < 0 else [EntityResult(
+                entity_text='OpenAI', entity_type='ORG', position_start=start, position_end=start + 6,
+                sentence_index=0, confidence_score=0.99, context=text, model_used='fake',
+            )])
+        return results
+
+
+class FakeManager:
+    def get(self, name):
+        assert name == 'ner'
+        return FakeExtractor()
+
+
+@pytest.fixture
+def summarized(monkeypatch):
+    """Texts passed to the summarizer, in call order."""
+    calls = []
+    lock = threading.Lock()
+
+    def summarize_text(text):
+        with lock:
+            calls.append(text)
+        return {'short_summary': text[:20], 'medium_summary': text[:40], 'long_summary': text, 'model_used': 'fake'}
+
+    monkeypatch.setattr(settings, 'EMBEDDINGS_ENABLED', False)
+    monkeypatch.setattr(batch_process, 'summarize_text', summarize_text)
+    monkeypatch.setattr(batch_process, 'get_summarization_server', FakeServer)
+    monkeypatch.setattr(batch_process, 'get_model_manager', FakeManager)
+    monkeypatch.setattr(batch_process, 'get_token_store', lambda: None)
+    return calls
+
+
+def add_articles(engine, contents, canonical=None):
+    canonical = canonical or {}
+    with engine.begin() as conn:
+        conn.execute(insert(Article), [
+            {
+                'id': n, 'title': f'title {n}', 'url': f'https://example.org/{n}', 'source': 's',
+                'raw_content': content, 'content_hash': f'hash {n}', 'canonical_id': canonical.get(n),
+            }
+            for n, content in enumerate(contents, start=1)
+        ])
+
+
+def processed_ids(conn):
+    return list(conn.execute(select(Article.id).where(Article.is_processed.is_(True)).order_by(Article.id)).scalars())
+
+
+def test_near_duplicates_reuse_the_canonical_results(engine, summarized):
+    add_articles(engine, [TEXT, 'Breaking: ' + TEXT, 'Unrelated news about robots.'], canonical={2: 1})
+
+    assert batch_process.process(engine, chunk_size=10, workers=1) == 3
+
+    # Un appel par texte source : le doublon réutilise le texte de l'article canonique
+    assert sorted(summarized) == sorted([TEXT, 'Unrelated news about robots.'])
+    with engine.connect() as conn:
+        summaries = dict(conn.execute(select(Summary.article_id, Summary.long_summary)).all())
+        assert summaries[1] == summaries[2] == TEXT
+        entities = conn.execute(
+            select(Entity.article_id, Entity.position_start, Entity.position_end, Entity.sentence_index).order_by(Entity.article_id)
+        ).all()
+    # Les positions du texte canonique ne valent pas pour le doublon
+    assert entities == [(1, 0, 6, 0), (2, None, None, None)]
+
+
+def test_failed_chunk_is_isolated_and_retried(engine, summarized):
+    add_articles(engine, [TEXT, TEXT + ' one', TEXT + ' boom', TEXT + ' three', TEXT + ' four', TEXT + ' five'])
+
+    assert batch_process.process(engine, chunk_size=2, workers=1) == 4
+    with engine.connect() as conn:
+        assert processed_ids(conn) == [1, 2, 5, 6]
+        assert conn.execute(select(Summary.article_id).where(Summary.article_id.in_([3, 4]))).all() == []
+
+    with engine.begin() as conn:
+        conn.execute(Article.__table__.update().where(Article.id == 3).values(raw_content=TEXT + ' two'))
+    assert batch_process.process(engine, chunk_size=2, workers=1) == 2
+    with engine.connect() as conn:
+        assert processed_ids(conn) == [1, 2, 3, 4, 5, 6]
+
+
+def test_run_resumes_after_a_crash(engine, summarized, monkeypatch):
+    add_articles(engine, [f'{TEXT} {n}' for n in range(5)])
+    write = batch_process.write
+
+    def crashing_write(engine, chunk, aggregator=None):
+        if chunk.rows[0]['id'] == 3:
+            raise RuntimeError('crash')
+        return write(engine, chunk, aggregator)
+
+    monkeypatch.setattr(batch_process, 'write', crashing_write)
+    assert batch_process.process(engine, chunk_size=2, workers=1) == 3
+    with engine.connect() as conn:
+        assert processed_ids(conn) == [1, 2, 5]
+        # La transaction du lot a été annulée en entier
+        assert conn.execute(select(Summary.article_id).where(Summary.article_id.in_([3, 4]))).all() == []
+
+    monkeypatch.setattr(batch_process, 'write', write)
+    calls = len(summarized)
+    assert batch_process.process(engine, chunk_size=2, workers=1) == 2
+    with engine.connect() as conn:
+        assert processed_ids(conn) == [1, 2, 3, 4, 5]
+        assert sorted(conn.execute(select(Summary.article_id)).scalars()) == [1, 2, 3, 4, 5]
+    # Les résumés des articles repris viennent du cache
+    assert len(summarized) == calls
+
+
+def test_limit_processes_the_first_articles_only(engine, summarized):
+    add_articles(engine, [f'{TEXT} {n}' for n in range(5)])
+    assert batch_process.process(engine, chunk_size=2, workers=1, limit=3) == 3
+    with engine.connect() as conn:
+        assert processed_ids(conn) == [1, 2, 3]
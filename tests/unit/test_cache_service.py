@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aiwatcher.services.cache_service import InferenceCache, LocalStore
+
+
+def test_concurrent_misses_compute_once():
+    cache = InferenceCache(LocalStore(), max_entries=10, ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'summary': 'done'}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(cache.get_or_compute, 'key', compute) for _ in range(8)]
+        assert started.wait(5)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{'summary': 'done'}] * 8
+    assert cache.inflight == {}
+    # Un autre cache sur le même stockage lit la valeur sans calculer
+    assert InferenceCache(cache.store).get_or_compute('key', lambda: pytest.fail('computed twice')) == {'summary': 'done'}
+
+
+def test_failed_computation_is_not_cached():
+    cache = InferenceCache(LocalStore(), max_entries=10, ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('model crashed')
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(cache.get_or_compute, 'key', fail)
+        assert started.wait(5)
+        follower = pool.submit(cache.get_or_compute, 'key', lambda: pytest.fail('computed twice'))
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result(5)
+
+    assert cache.get('key') is None
+    assert cache.get_or_compute('key', lambda: 42) == 42
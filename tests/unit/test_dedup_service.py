@@ -0,0 +1,57 @@
+import random
+
+from sqlalchemy import insert
+
+from aiwatcher.database.models import Article
+from aiwatcher.preprocessing.minhash import MinHasher
+from aiwatcher.services.dedup_service import NearDuplicateIndex, canonical_article_ids
+
+
+def story(seed, edits=0):
+    generator = random.Random(seed)
+    text = [f'w{generator.randrange(5000)}' for _ in range(300)]
+    for position in random.Random(seed + edits).sample(range(len(text)), edits):
+        text[position] = 'edited'
+    return ' '.join(text)
+
+
+def add_stories(engine, count):
+    with engine.begin() as conn:
+        conn.execute(insert(Article), [
+            {'id': n, 'title': f't{n}', 'url': f'u{n}', 'source': 's', 'content_hash': str(n)} for n in range(1, count + 1)
+        ])
+
+
+def test_near_duplicates_link_to_the_oldest_article(engine):
+    add_stories(engine, 6)
+    index = NearDuplicateIndex(MinHasher(), threshold=0.8)
+    with engine.begin() as conn:
+        assert index.index(conn, [(1, story(1)), (2, story(2))]) == {1: None, 2: None}
+        # Doublon d'un doublon : rattaché à l'original ; doublons dans le même lot
+        assert index.index(conn, [(3, story(1, edits=2)), (4, story(1, edits=4)), (5, story(2, edits=3)), (6, '')]) == {
+            3: 1, 4: 1, 5: 2,
+        }
+        assert canonical_article_ids(conn, [1, 3, 4, 5, 6]) == {1: 1, 3: 1, 4: 1, 5: 2, 6: 6}
+
+        # Contenu réécrit : l'article n'est plus un doublon
+        assert index.index(conn, [(4, story(3))]) == {4: None}
+        assert canonical_article_ids(conn, [4]) == {4: 4}
+
+
+def test_threshold_bounds_the_estimated_similarity(engine):
+    add_stories(engine, 2)
+    # Similarité estimée 0.79, avec des bandes communes
+    with engine.begin() as conn:
+        assert NearDuplicateIndex(MinHasher(), threshold=0.8).index(conn, [(1, story(1)), (2, story(1, edits=7))]) == {
+            1: None, 2: None,
+        }
+        assert NearDuplicateIndex(MinHasher(), threshold=0.75).index(conn, [(2, story(1, edits=7))]) == {2: 1}
+
+
+def test_fingerprints_ignore_the_page_boilerplate(engine):
+    add_stories(engine, 2)
+    menu = ' '.join(f'menu{n}' for n in range(150))
+    page = f'<html><body><nav>{menu}</nav><article><p>{story(1)}</p></article><footer>{menu}</footer></body></html>'
+    with engine.begin() as conn:
+        # Le texte brut partage moins de 70 % de ses shingles avec l'article
+        assert NearDuplicateIndex(MinHasher(), threshold=0.8).index(conn, [(1, story(1)), (2, page)]) == {1: None, 2: 1}
@@ -0,0 +1,48 @@
+import numpy as np
+from sqlalchemy import insert
+
+from aiwatcher.database.models import Article
+from aiwatcher.services import embedding_service
+from aiwatcher.services.embedding_service import EmbeddingIndex, similar_articles
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_search_ranks_live_rows_and_skips_excluded(tmp_path):
+    index = EmbeddingIndex(str(tmp_path))
+    index.add([1, 2, 3], np.stack([unit(1, 0), unit(1, 1), unit(0, 1)]))
+    # Le dernier vecteur d'un article remplace le précédent
+    index.add([3], unit(1, 0.1)[None])
+
+    assert len(index) == 3
+    assert [article_id for article_id, _ in index.search(unit(1, 0), k=3)] == [1, 3, 2]
+    assert [article_id for article_id, _ in index.search(unit(1, 0), k=3, exclude=[1, 42])] == [3, 2]
+    # Un second lecteur charge les lignes écrites par le premier
+    assert [article_id for article_id, _ in EmbeddingIndex(str(tmp_path)).search(unit(0, 1), k=1)] == [2]
+
+
+def test_similar_articles_leave_out_the_duplicate_group(tmp_path, engine, monkeypatch):
+    index = EmbeddingIndex(str(tmp_path))
+    monkeypatch.setattr(embedding_service, '_index', index)
+    with engine.begin() as conn:
+        conn.execute(insert(Article), [
+            {'id': n, 'title': f't{n}', 'url': f'u{n}', 'source': 's', 'content_hash': str(n), 'canonical_id': canonical}
+            for n, canonical in ((1, None), (2, 1), (3, 1), (4, None), (5, None))
+        ])
+    index.add([1, 2, 3, 4, 5], np.stack([unit(1, 0), unit(1, 0.01), unit(1, 0.02), unit(1, 0.5), unit(0, 1)]))
+
+    with engine.connect() as conn:
+        statements = []
+        conn.connection.driver_connection.set_trace_callback(statements.append)
+        # Depuis un doublon : l'original et les autres doublons sont exclus
+        results = similar_articles(conn, 2, limit=3)
+        conn.connection.driver_connection.set_trace_callback(None)
+        plans = [row[3] for statement in statements if statement.lstrip().upper().startswith('SELECT')
+                 for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement)]
+
+        assert [result['id'] for result in results] == [4, 5]
+        assert similar_articles(conn, 42) is None
+    assert not [plan for plan in plans if plan.startswith('SCAN articles')]
@@ -0,0 +1,120 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+from aiwatcher.ai_models.ner_extractor import NERExtractor
+
+PIECE_RE = re.compile(r'[A-Za-z]{1,4}|\d+|[^\w\s]')
+WORD_RE = re.compile(r'\w+|[^\w\s]')
+ENTITIES = {'Google': 'ORG', 'OpenAI': 'ORG', 'DeepMind': 'ORG', 'Hinton': 'PER', 'Bengio': 'PER'}
+LABELS = ['O', 'B-ORG', 'I-ORG', 'B-PER', 'I-PER']
+PAD, CLS, SEP = 0, 1, 2
+
+
+class FakeTokenizer:
+    """Cuts words into pieces of four letters; one id per (word, piece index)."""
+
+    name_or_path = 'fake-ner'
+
+    def __init__(self):
+        self.vocab = {}
+        self.pieces = {}
+
+    def __len__(self):
+        return 1000
+
+    def __call__(self, texts, **kwargs):
+        ids, offsets = [], []
+        for text in texts:
+            text_ids, text_offsets = [], []
+            for word in WORD_RE.finditer(text):
+                for i, piece in enumerate(PIECE_RE.finditer(word.group())):
+                    key = (word.group(), i)
+                    token_id = self.vocab.setdefault(key, len(self.vocab) + 3)
+                    self.pieces[token_id] = key
+                    text_ids.append(token_id)
+                    text_offsets.append((word.start() + piece.start(), word.start() + piece.end()))
+            ids.append(text_ids)
+            offsets.append(text_offsets)
+        return {'input_ids': ids, 'offset_mapping': offsets}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [CLS] + list(ids) + [SEP]
+
+    def pad(self, inputs, return_tensors=None):
+        width = max(len(ids) for ids in inputs['input_ids'])
+        return {
+            'input_ids': torch.tensor([ids + [PAD] * (width - len(ids)) for ids in inputs['input_ids']]),
+            'attention_mask': torch.tensor([[1] * len(ids) + [0] * (width - len(ids)) for ids in inputs['input_ids']]),
+        }
+
+
+class FakeModel:
+    """Labels entity words, but misses the tokens at the edges of a window."""
+
+    config = SimpleNamespace(id2label=dict(enumerate(LABELS)))
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def __call__(self, input_ids, attention_mask):
+        logits = torch.zeros(*input_ids.shape, len(LABELS))
+        for row, ids in enumerate(input_ids.tolist()):
+            last = ids.index(SEP) - 1
+            for position, token_id in enumerate(ids):
+                if token_id in (PAD, CLS, SEP):
+                    continue
+                word, piece = self.tokenizer.pieces[token_id]
+                entity_type = ENTITIES.get(word)
+                if entity_type is None or position in (1, last):
+                    logits[row, position, 0] = 1.0
+                else:
+                    logits[row, position, LABELS.index(('B-' if piece == 0 else 'I-') + entity_type)] = 5.0
+        return SimpleNamespace(logits=logits)
+
+
+def extractor(window_tokens=512, stride=128):
+    tokenizer = FakeTokenizer()
+    config = {'model_name': 'fake-ner', 'window_tokens': window_tokens, 'stride': stride, 'batch_size': 4, 'context_chars': 10}
+    return NERExtractor(config, model=FakeModel(tokenizer), tokenizer=tokenizer)
+
+
+def spans(entities):
+    return [(entity.entity_text, entity.entity_type, entity.position_start, entity.position_end) for entity in entities]
+
+
+def test_punctuation_is_not_part_of_the_entity():
+    text = 'Today Google, Meta and (OpenAI) agreed.'
+    entities = extractor().extract(text)
+    assert spans(entities) == [
+        ('Google', 'ORG', text.index('Google'), text.index('Google') + 6),
+        ('OpenAI', 'ORG', text.index('OpenAI'), text.index('OpenAI') + 6),
+    ]
+    assert entities[0].context == 'Today Google, Meta and'
+
+
+def test_sliding_windows_match_a_single_window():
+    text = (
+        'Early in the day Google and DeepMind published a paper. '
+        'Then Hinton, Bengio and OpenAI commented on it at length. '
+        'Later that week the DeepMind team replied to Hinton again, and nobody else did.'
+    )
+    texts = [text, 'Nothing to see here. ' + text + ' The end.']
+    expected = [spans(entities) for entities in extractor().extract_batch(texts)]
+    assert [name for name, *_ in expected[0]] == ['Google', 'DeepMind', 'Hinton', 'Bengio', 'OpenAI', 'DeepMind', 'Hinton']
+
+    # Petites fenêtres : la plupart des tokens sont au bord d'une fenêtre et au milieu d'une autre
+    for window_tokens, stride in ((8, 3), (8, 4), (11, 5)):
+        results = extractor(window_tokens, stride).extract_batch(texts)
+        assert [spans(entities) for entities in results] == expected
+    assert [entity.sentence_index for entity in results[0]] == [0, 0, 1, 1, 1, 2, 2]
+
+
+def test_window_must_be_longer_than_the_stride():
+    with pytest.raises(ValueError):
+        extractor(window_tokens=6, stride=4).extract('Google')
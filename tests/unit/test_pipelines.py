@@ -0,0 +1,59 @@
+import pytest
+
+from aiwatcher.core.article import Article, read_jsonl
+from aiwatcher.scraper import pipelines
+from aiwatcher.scraper.pipelines import JsonLinesPipeline, JsonLinesSink
+
+
+def article(n):
+    return Article(title=f'Title {n}', link=f'https://example.org/{n}', date='2024-05-01', source='hf', content=f'Body {n}')
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return list(read_jsonl(f))
+
+
+def test_articles_are_on_disk_before_the_spider_closes(tmp_path):
+    path = str(tmp_path / 'raw' / 'articles.jsonl')
+    pipeline = JsonLinesPipeline(path, flush_every=2)
+    pipeline.open_spider()
+    for n in range(3):
+        assert pipeline.process_item(article(n)) is not None
+    # Vidé tous les `flush_every` articles, rien n'est gardé en mémoire
+    assert [item.title for item in read(path)] == ['Title 0', 'Title 1']
+    pipeline.close_spider()
+    assert read(path) == [article(n) for n in range(3)]
+
+
+def test_spiders_share_one_sink_per_path(tmp_path):
+    path = str(tmp_path / 'articles.jsonl')
+    first, second = JsonLinesPipeline(path), JsonLinesPipeline(path)
+    first.open_spider()
+    second.open_spider()
+    assert first.sink is second.sink
+
+    first.process_item(article(1))
+    second.process_item({'title': 'Title 2', 'link': 'https://example.org/2', 'date': None, 'source': 'mit', 'content': 'Body 2'})
+    first.close_spider()
+    assert not first.sink.file.closed
+    second.process_item(article(3))
+    second.close_spider()
+    assert second.sink.file.closed and JsonLinesSink._open_sinks == {}
+    assert [item.title for item in read(path)] == ['Title 1', 'Title 2', 'Title 3']
+
+
+@pytest.mark.skipif(pipelines.zstd is None, reason='zstd is not available')
+def test_zstd_output_is_a_compressed_stream(tmp_path):
+    path = str(tmp_path / 'articles.jsonl.zst')
+    pipeline = JsonLinesPipeline(path, compression='zstd')
+    pipeline.open_spider()
+    pipeline.process_item(article(1))
+    pipeline.close_spider()
+    with pipelines.zstd.open(path, 'rb') as f:
+        assert list(read_jsonl(f)) == [article(1)]
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        JsonLinesSink(str(tmp_path / 'articles.jsonl'), compression='gzip')
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from aiwatcher.preprocessing.minhash import MinHasher, estimate_similarity, shingles
+
+
+def words(count, seed):
+    generator = random.Random(seed)
+    return [f'w{generator.randrange(5000)}' for _ in range(count)]
+
+
+def edited(text_words, changes, seed):
+    generator = random.Random(seed)
+    result = list(text_words)
+    for position in generator.sample(range(len(result)), changes):
+        result[position] = 'edited'
+    return ' '.join(result)
+
+
+def jaccard(first, second, size=5):
+    first, second = shingles(first, size), shingles(second, size)
+    return len(first & second) / len(first | second)
+
+
+def test_shingles_of_short_and_empty_texts():
+    assert shingles('One, two  THREE', size=5) == {'one two three'}
+    assert shingles('a b c d', size=2) == {'a b', 'b c', 'c d'}
+    assert shingles('?!', size=5) == set()
+
+
+@pytest.mark.parametrize('changes', [0, 2, 10, 40])
+def test_signatures_estimate_the_jaccard_similarity(changes):
+    hasher = MinHasher()
+    base = words(400, seed=1)
+    first, second = ' '.join(base), edited(base, changes, seed=changes)
+    estimate = estimate_similarity(hasher.signature(first), hasher.signature(second))
+    assert estimate == pytest.approx(jaccard(first, second), abs=0.12)
+
+
+def test_band_keys_select_near_duplicates_only():
+    hasher = MinHasher(num_perm=128, bands=16)
+    base = words(400, seed=2)
+    keys = set(hasher.band_keys(hasher.signature(' '.join(base))))
+    assert len(keys) == 16
+
+    # Similarité ~0.95 : au moins une bande commune ; textes sans rapport : aucune
+    near = set(hasher.band_keys(hasher.signature(edited(base, 2, seed=3))))
+    other = set(hasher.band_keys(hasher.signature(' '.join(words(400, seed=4)))))
+    assert keys & near
+    assert not keys & other
+
+
+def test_signatures_are_stable_across_hashers():
+    text = ' '.join(words(50, seed=5))
+    assert (MinHasher(seed=1).signature(text) == MinHasher(seed=1).signature(text)).all()
+    # Sans mots, la signature est constante
+    assert (MinHasher().signature('') == MinHasher().signature('?!')).all()
+    with pytest.raises(ValueError):
+        MinHasher(num_perm=100, bands=16)
@@ -0,0 +1,178 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from scrapy import Request, signals
+from scrapy.http import HtmlResponse, Response
+from scrapy.utils.test import get_crawler
+from twisted.python.failure import Failure
+
+from aiwatcher.core.article import Article
+from aiwatcher.core.config import settings
+from aiwatcher.scraper.get_articles import SCRAPERS
+from aiwatcher.scraper.huggingface_scraper import HuggingFaceScraper
+from aiwatcher.scraper.mit_news_scraper import MITNewsScraper
+from aiwatcher.scraper.papers_with_code_scraper import PapersWithCodeScraper
+from aiwatcher.scraper.rate_limiter import MAX_DELAY, BackoffMiddleware
+
+LISTING = HtmlResponse(url='https://example.org/blog', body=b'<html></html>')
+BODY = '<html><body><article><p>{}</p></article></body></html>'
+
+
+@pytest.fixture
+def make_spider(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'SEEN_INDEX_PATH', str(tmp_path / 'seen.sqlite'))
+
+    def make(max_articles=2, incremental=True):
+        monkeypatch.setattr(settings, 'CRAWL_INCREMENTAL', incremental)
+        crawler = get_crawler(HuggingFaceScraper)
+        spider = HuggingFaceScraper.from_crawler(crawler, max_articles=max_articles)
+        return crawler, spider
+
+    return make
+
+
+def fetch(spider, path, text='A model was released.', status=200):
+    request = spider.follow_article(LISTING, path, {'title': path, 'link': path, 'date': None, 'source': 'hf'})
+    if request is None:
+        return None
+    response = HtmlResponse(url=request.url, body=BODY.format(text).encode(), status=status, request=request)
+    return list(spider.parse_article(response, **request.cb_kwargs))
+
+
+def written(crawler, spider, items):
+    for item in items:
+        crawler.signals.send_catch_log(signals.item_scraped, item=item, response=None, spider=spider)
+
+
+def test_pages_are_seen_only_once_written(make_spider):
+    crawler, spider = make_spider()
+    items = fetch(spider, '/a')
+    assert len(items) == 1
+    # Article perdu avant l'écriture : la page sera redemandée
+    crawler.signals.send_catch_log(signals.item_dropped, item=items[0], response=None, exception=None, spider=spider)
+    assert spider.seen.get('https://example.org/a') is None
+
+    items = fetch(spider, '/a')
+    written(crawler, spider, items)
+    assert spider.seen.get('https://example.org/a') is not None
+    assert spider._unrecorded == {}
+    spider.closed('finished')
+
+
+def test_skipped_and_unchanged_pages_do_not_use_capacity(make_spider):
+    crawler, spider = make_spider(max_articles=2)
+    written(crawler, spider, fetch(spider, '/a'))
+    spider.closed('finished')
+    crawler, spider = make_spider(max_articles=2)
+
+    # Page récente : pas de requête
+    assert fetch(spider, '/a') is None
+    spider.seen.revisit_after = 0
+    assert fetch(spider, '/a') == []
+    assert fetch(spider, '/a', status=304) == []
+    assert spider.has_capacity()
+
+    assert len(fetch(spider, '/b')) == 1
+    assert spider.has_capacity()
+    assert len(fetch(spider, '/c')) == 1
+    assert not spider.has_capacity()
+    spider.closed('finished')
+
+
+def test_downloads_in_flight_hold_capacity(make_spider):
+    _, spider = make_spider(max_articles=1, incremental=False)
+    request = spider.follow_article(LISTING, '/a', {'title': 'a', 'link': '/a', 'date': None, 'source': 'hf'})
+    assert not spider.has_capacity()
+    # Sans index, une réponse 304 est ignorée
+    response = HtmlResponse(url=request.url, body=b'', status=304, request=request)
+    assert list(spider.parse_article(response, **request.cb_kwargs)) == []
+    assert spider.has_capacity()
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'fixtures', 'pages')
+
+
+def fixture_response(spider_class, name, url=None, request=None):
+    with open(os.path.join(FIXTURES, spider_class.config_key, name), 'rb') as f:
+        return HtmlResponse(url=url or request.url, body=f.read(), encoding='utf-8', request=request)
+
+
+def test_article_pages_are_chained_requests(monkeypatch):
+    monkeypatch.setattr(settings, 'CRAWL_INCREMENTAL', False)
+    spider = HuggingFaceScraper(max_articles=2)
+    requests = list(spider.parse(fixture_response(HuggingFaceScraper, 'listing.html', HuggingFaceScraper.start_urls[0])))
+    # Le listing ne télécharge rien lui-même : une requête par article, dans la limite de max_articles
+    assert [request.callback for request in requests] == [spider.parse_article] * 2
+    assert spider.pending_articles == 2 and not spider.has_capacity()
+
+    request = requests[0]
+    items = list(spider.parse_article(fixture_response(HuggingFaceScraper, 'articles/000.html', request=request), **request.cb_kwargs))
+    assert len(items) == 1 and isinstance(items[0], Article)
+    assert items[0].link == request.url and items[0].title == request.cb_kwargs['article']['title']
+    assert items[0].content.startswith('Evaluating speech recognition')
+    assert 'Section 0' not in items[0].content and 'Copyright' not in items[0].content
+    assert (spider.scraped_articles, spider.pending_articles) == (1, 1)
+
+
+def test_failed_article_download_falls_back_to_the_listing(monkeypatch):
+    monkeypatch.setattr(settings, 'CRAWL_INCREMENTAL', False)
+    spider = MITNewsScraper(max_articles=2)
+    article = {'title': 'a', 'link': 'https://news.mit.edu/a', 'date': None, 'source': 'mit'}
+    with_fallback = spider.follow_article(LISTING, '/a', article, fallback_content='The description.')
+    without = spider.follow_article(LISTING, '/b', article)
+
+    def fail(request):
+        failure = Failure(TimeoutError('timed out'))
+        failure.request = request
+        return list(spider.article_failed(failure))
+
+    assert [item.content for item in fail(with_fallback)] == ['The description.']
+    assert fail(without) == []
+    assert (spider.scraped_articles, spider.pending_articles) == (1, 0)
+
+
+@pytest.mark.parametrize('spider_class', SCRAPERS, ids=lambda spider_class: spider_class.config_key)
+def test_benchmark_fixtures_match_the_spiders(spider_class, monkeypatch):
+    monkeypatch.setattr(settings, 'CRAWL_INCREMENTAL', False)
+    spider = spider_class(max_articles=100)
+    response = fixture_response(spider_class, 'listing.html', spider_class.start_urls[0])
+
+    outputs = [output for output in spider.parse(response) if output is not None]
+    articles = [output.cb_kwargs['article'] if isinstance(output, Request) else output.to_dict()
+                for output in outputs if not isinstance(output, Request) or output.callback != spider.parse]
+    assert len(articles) == 24
+    assert all(article['title'] and article['link'].startswith('http') and article['date'] for article in articles)
+    assert len(os.listdir(os.path.join(FIXTURES, spider_class.config_key, 'articles'))) == 3
+
+
+def test_crawler_settings_come_from_the_source_config():
+    for spider_class, delay, concurrency, timeout in ((HuggingFaceScraper, 1.0, 4, 10), (PapersWithCodeScraper, 2.0, 2, 15)):
+        crawler_settings = get_crawler(spider_class).settings
+        assert crawler_settings.getfloat('DOWNLOAD_DELAY') == delay
+        assert crawler_settings.getfloat('AUTOTHROTTLE_START_DELAY') == delay
+        assert crawler_settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN') == concurrency
+        assert crawler_settings.getint('DOWNLOAD_TIMEOUT') == timeout
+        assert 'aiwatcher.scraper.rate_limiter.BackoffMiddleware' in crawler_settings.getdict('DOWNLOADER_MIDDLEWARES')
+
+
+def test_backoff_doubles_the_slot_delay_up_to_the_maximum():
+    slot = SimpleNamespace(delay=0.5)
+    crawler = SimpleNamespace(
+        settings=get_crawler(HuggingFaceScraper).settings,
+        engine=SimpleNamespace(downloader=SimpleNamespace(slots={'example.org': slot})),
+        spider=SimpleNamespace(logger=SimpleNamespace(info=lambda message: None)),
+    )
+    middleware = BackoffMiddleware.from_crawler(crawler)
+    request = Request('https://example.org/a', meta={'download_slot': 'example.org'})
+
+    def answer(status, **headers):
+        response = Response(request.url, status=status, headers=headers)
+        assert middleware.process_response(request, response) is response
+        return slot.delay
+
+    assert answer(200) == 0.5
+    # Au moins une seconde, puis doublement ; Retry-After l'emporte s'il est plus long
+    assert [answer(503), answer(500), answer(429, **{'Retry-After': '30'}), answer(429)] == [1.0, 2.0, 30.0, MAX_DELAY]
+    assert answer(429, **{'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT'}) == MAX_DELAY
+    assert middleware.process_response(Request('https://other.org/'), Response('https://other.org/', status=503)).status == 503
@@ -0,0 +1,64 @@
+from sqlalchemy import insert
+
+from aiwatcher.database.models import Article, Summary
+from aiwatcher.services.search_service import POSTGRES_SEARCH, fts5_query, search_articles
+
+
+def add_article(conn, n, title, content, source='a', summary=None):
+    conn.execute(insert(Article).values(
+        id=n, title=title, url=f'https://example.org/{n}', source=source, raw_content=content, content_hash=str(n),
+    ))
+    if summary is not None:
+        conn.execute(insert(Summary).values(article_id=n, medium_summary=summary, model_used='test'))
+
+
+def test_title_matches_rank_first(engine):
+    with engine.begin() as conn:
+        add_article(conn, 1, 'Weekly roundup', 'A new transformer model was released.')
+        add_article(conn, 2, 'Transformer models get faster', 'Inference costs keep falling.')
+        add_article(conn, 3, 'Robotics news', 'Nothing about language models.')
+
+        results = search_articles(conn, 'transformer')
+
+    assert [result['id'] for result in results] == [2, 1]
+    assert results[0]['rank'] > results[1]['rank']
+    assert '<mark>' in results[1]['snippet']
+
+
+def test_summary_matches_are_found(engine):
+    with engine.begin() as conn:
+        add_article(conn, 1, 'Weekly roundup', 'Several announcements.', summary='Mistral released a sparse model.')
+        add_article(conn, 2, 'Robotics news', 'Nothing relevant.')
+
+        assert [result['id'] for result in search_articles(conn, 'sparse mistral')] == [1]
+
+
+def test_source_filter_applies_before_the_limit(engine):
+    with engine.begin() as conn:
+        # Les articles de la source a sont mieux classés que ceux de b
+        for n in range(1, 6):
+            add_article(conn, n, 'Diffusion diffusion', 'diffusion', source='a')
+        for n in range(6, 9):
+            add_article(conn, n, 'Roundup', 'diffusion', source='b')
+        add_article(conn, 9, 'Roundup', 'other', source='b', summary='diffusion')
+
+        results = search_articles(conn, 'diffusion', limit=3, source='b')
+        everything = search_articles(conn, 'diffusion', limit=3)
+
+    assert len(results) == 3 and {result['source'] for result in results} == {'b'}
+    assert {result['source'] for result in everything} == {'a'}
+
+
+def test_query_without_terms_returns_nothing(engine):
+    with engine.begin() as conn:
+        add_article(conn, 1, 'Anything', 'content')
+        assert search_articles(conn, '?! --') == []
+    assert fts5_query('GPT-4 "release" OR') == '"GPT" "4" "release" "OR"'
+
+
+def test_postgres_filters_the_source_in_every_branch():
+    sql = POSTGRES_SEARCH.text
+    hits = sql[sql.index('hits AS'):sql.index('ranked AS')]
+    branches = hits.split('UNION ALL')
+    assert len(branches) == 2
+    assert all('a.source = :source' in branch for branch in branches)
@@ -0,0 +1,111 @@
+import threading
+
+import pytest
+
+from aiwatcher.ai_models.summarizer import SummarizationServer, SummaryResult
+
+
+class FakeSummarizer:
+    """Summarizes a text as its first words; one token per word."""
+
+    def __init__(self, context_words=10, summary_words=3):
+        self.config = {'model_name': 'fake-summarizer'}
+        self.context_words = context_words
+        self.summary_words = summary_words
+        self.vocab = {}
+        self.words = []
+        self.batches = []
+        self.lock = threading.Lock()
+        self.fail = False
+
+    def load(self):
+        return self
+
+    def ids(self, text):
+        with self.lock:
+            return [self.vocab.setdefault(word, len(self.vocab)) for word in text.split()]
+
+    def encode(self, text):
+        return self.ids(text)[:self.context_words]
+
+    def chunk(self, text, store=None):
+        ids = self.ids(text)
+        return [ids[i:i + self.context_words] for i in range(0, len(ids), self.context_words)]
+
+    def decode(self, ids):
+        words = {token: word for word, token in self.vocab.items()}
+        return ' '.join(words[token] for token in ids)
+
+    def summarize_ids(self, batch):
+        self.batches.append([len(ids) for ids in batch])
+        if self.fail:
+            raise RuntimeError('out of memory')
+        summaries = [self.decode(ids[:self.summary_words]) for ids in batch]
+        return [SummaryResult(summary, summary, self.decode(ids), 'fake-summarizer') for summary, ids in zip(summaries, batch)]
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def serve(summarizer, **kwargs):
+        server = SummarizationServer(summarizer, **kwargs)
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.stop()
+
+
+def test_pending_requests_are_batched(serve):
+    summarizer = FakeSummarizer()
+    server = serve(summarizer, max_batch_size=4, max_wait_ms=200)
+    texts = [f'text{n} about models' for n in range(10)]
+    futures = [server.submit(text) for text in texts]
+    assert [future.result(5).medium_summary for future in futures] == texts
+    assert summarizer.batches == [[3] * 4, [3] * 4, [3] * 2]
+
+
+def test_batches_group_inputs_of_similar_length(serve):
+    summarizer = FakeSummarizer()
+    server = serve(summarizer, max_batch_size=8, max_wait_ms=200, length_buckets=[4, 10])
+    texts = ['short one', 'a much longer text with many words', 'short two', 'another long text with several words']
+    assert [result.long_summary for result in server.summarize_many(texts)] == texts
+    assert sorted(summarizer.batches) == [[2, 2], [7, 6]]
+
+
+def test_a_failed_batch_fails_its_requests_only(serve):
+    summarizer = FakeSummarizer()
+    server = serve(summarizer, max_batch_size=2, max_wait_ms=200)
+    summarizer.fail = True
+    futures = [server.submit(f'text {n}') for n in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+    summarizer.fail = False
+    assert server.summarize('text again', timeout=5).medium_summary == 'text again'
+
+
+def test_long_texts_are_summarized_by_map_reduce(serve):
+    summarizer = FakeSummarizer(context_words=10, summary_words=3)
+    server = serve(summarizer, max_batch_size=16, max_wait_ms=20)
+    text = ' '.join(f'w{n}' for n in range(100))
+    events = list(server.summarize_chunked(text))
+
+    # 10 morceaux de 10 mots -> 30 mots de résumés partiels -> 3 groupes -> 9 mots
+    assert [event['event'] for event in events] == ['chunk'] * 10 + ['merge', 'final']
+    assert [event['summary'] for event in events[:10]] == [f'w{n} w{n + 1} w{n + 2}' for n in range(0, 100, 10)]
+    assert events[10] == {'event': 'merge', 'level': 1, 'summaries': ['w0 w1 w2', 'w31 w32 w40', 'w62 w70 w71']}
+    assert events[11]['chunks'] == 10 and events[11]['summary']['medium_summary'] == 'w0 w1 w2'
+    # Les morceaux sont résumés dans un même lot
+    assert summarizer.batches[0] == [10] * 10
+
+
+def test_short_texts_yield_the_final_event_only(serve):
+    server = serve(FakeSummarizer(), max_wait_ms=20)
+    assert list(server.summarize_chunked('a short text')) == [{
+        'event': 'final', 'chunks': 1,
+        'summary': {'short_summary': 'a short text', 'medium_summary': 'a short text', 'long_summary': 'a short text',
+                    'model_used': 'fake-summarizer', 'model_version': None},
+    }]
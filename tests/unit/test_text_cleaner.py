@@ -0,0 +1,79 @@
+from parsel import Selector
+
+from aiwatcher.preprocessing.text_cleaner import CleanedText, clean_text, extract_main_text, html_to_text, preprocess_texts
+from aiwatcher.preprocessing.utils import detect_language
+
+PARAGRAPH = 'Researchers released a new model that improves reasoning on several benchmarks. '
+MENU = '<nav><a href="/">Home</a> <a href="/blog">Blog</a></nav>'
+FOOTER = '<footer><p>Copyright and legal notices for every page of this site.</p></footer>'
+
+
+def page(body):
+    return f'<html><head><title>Blog</title><script>var tracking = 1;</script></head><body>{body}</body></html>'
+
+
+def test_main_content_is_found_without_a_selector():
+    html = page(
+        f'<header>{MENU}</header><div class="sidebar"><p>Short teaser.</p></div>'
+        f'<div class="post"><p>{PARAGRAPH * 3}</p><p>Second <b>bold</b> point<script>ads()</script> here.</p></div>{FOOTER}'
+    )
+    text = extract_main_text(html)
+    assert text == (PARAGRAPH * 3).strip() + ' Second bold point here.'
+
+
+def test_article_element_needs_enough_text():
+    html = page(f'{MENU}<article><p>{PARAGRAPH * 3}</p><aside>Related posts</aside></article>')
+    assert extract_main_text(html) == (PARAGRAPH * 3).strip()
+
+    # Un <article> trop court est une vignette : l'heuristique prend le relais
+    html = page(f'<article><p>Teaser.</p></article><div><p>{PARAGRAPH * 3}</p></div>{FOOTER}')
+    assert extract_main_text(html) == (PARAGRAPH * 3).strip()
+
+
+def test_source_selectors_win_over_the_heuristics():
+    html = page(f'<div class="blog-content"><p>Short post.</p></div><article><p>{PARAGRAPH * 3}</p></article>')
+    assert extract_main_text(html, ['div.missing', 'div.blog-content']) == 'Short post.'
+    # Le sélecteur d'une réponse Scrapy évite de reparser la page
+    assert extract_main_text(Selector(text=html), ['div.blog-content']) == 'Short post.'
+
+
+def test_pages_without_text():
+    assert html_to_text('  ') == ''
+    assert extract_main_text(page(f'{MENU}{FOOTER}')) == ''
+
+
+class SplitTokenizer:
+    """Tokenizer stand-in: one id per word (its length), counts its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, truncation=False, max_length=None, **kwargs):
+        self.calls.append(len(texts))
+        ids = [[len(word) for word in text.split()] for text in texts]
+        return {'input_ids': [text_ids[:max_length] if truncation else text_ids for text_ids in ids]}
+
+
+def test_clean_text_normalizes_entities_unicode_and_whitespace():
+    assert clean_text('Caf&eacute; &amp; e\ufb03cient\u00a0models\u200b  \n\tnow\x00.') == 'Café & efficient models now.'
+    assert clean_text('<p>First&nbsp;point.</p>\n<p>Second   point.</p>') == 'First point. Second point.'
+    assert clean_text(None) == clean_text('') == ''
+
+
+def test_preprocess_texts_fills_the_derived_columns():
+    english = 'The model is trained on the web and it is released to the public. ' * 30
+    french = "Le modèle est entraîné sur des données publiques et il est disponible pour la recherche."
+    results = preprocess_texts([english, french, None])
+    assert results[0].word_count == 14 * 30 and results[0].reading_time == 3 and results[0].language == 'en'
+    assert (results[1].word_count, results[1].reading_time, results[1].language) == (15, 1, 'fr')
+    assert results[2] == CleanedText('', 0, 0, 'en')
+    assert results[1].columns() == {'cleaned_content': french, 'word_count': 15, 'reading_time': 1, 'language': 'fr'}
+    # Trop peu de mots vides pour conclure : langue par défaut
+    assert detect_language('Transformers scale.', default='und') == 'und'
+
+
+def test_preprocess_texts_tokenizes_the_batch_in_one_call():
+    tokenizer = SplitTokenizer()
+    results = preprocess_texts(['<p>One  two three</p>', 'Four&nbsp;five', ''], tokenizer=tokenizer, max_tokens=2)
+    assert tokenizer.calls == [3]
+    assert [result.input_ids for result in results] == [[3, 3], [4, 4], []]
@@ -0,0 +1,110 @@
+import re
+
+import numpy as np
+
+from aiwatcher.preprocessing.tokenizer import TokenStore, chunk_text, encode_texts
+
+CLS, SEP = 1, 2
+
+
+class WordTokenizer:
+    """Fast-tokenizer stand-in with one token per word; counts the texts it encodes."""
+
+    name_or_path = 'fake-words'
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.vocab = {}
+        self.encoded = 0
+
+    def __len__(self):
+        return self.size
+
+    def __call__(self, texts, add_special_tokens=True, truncation=False, max_length=None, return_offsets_mapping=False, **kwargs):
+        self.encoded += len(texts)
+        ids, offsets = [], []
+        for text in texts:
+            words = list(re.finditer(r'\S+', text))
+            if truncation:
+                words = words[:max_length]
+            ids.append([self.vocab.setdefault(word.group(), len(self.vocab) + 3) for word in words])
+            offsets.append([word.span() for word in words])
+        output = {'input_ids': ids}
+        if return_offsets_mapping:
+            output['offset_mapping'] = offsets
+        return output
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [CLS] + list(ids) + [SEP]
+
+
+def sentence(n, words=4):
+    return ' '.join(f's{n}w{i}' for i in range(words - 1)) + f' s{n}end.'
+
+
+def test_chunks_keep_sentences_whole():
+    tokenizer = WordTokenizer()
+    text = ' '.join(sentence(n) for n in range(5))
+    chunks = chunk_text(text, tokenizer, max_tokens=10)
+    # Deux phrases de quatre mots par morceau, plus les tokens spéciaux
+    assert [len(chunk) for chunk in chunks] == [10, 10, 6]
+    assert all(chunk[0] == CLS and chunk[-1] == SEP for chunk in chunks)
+    ids = tokenizer([text])['input_ids'][0]
+    assert [token for chunk in chunks for token in chunk[1:-1]] == ids
+
+
+def test_long_sentences_are_cut_to_the_budget():
+    tokenizer = WordTokenizer()
+    text = sentence(0, words=20) + ' ' + sentence(1, words=3)
+    chunks = chunk_text(text, tokenizer, max_tokens=10)
+    # La fin de la phrase coupée partage son morceau avec la phrase suivante
+    assert [len(chunk) - 2 for chunk in chunks] == [8, 8, 7]
+    assert chunk_text('', tokenizer, max_tokens=10) == []
+
+
+def test_store_round_trips_the_encodings(tmp_path):
+    path = str(tmp_path / 'tokens' / 'store.sqlite')
+    texts = ['First text here.', 'Second one.']
+    small, large = WordTokenizer(), WordTokenizer(size=1 << 17)
+    large.name_or_path = 'fake-words-large'
+    store = TokenStore(path)
+    expected = {name: encode_texts(tokenizer, texts, store) for name, tokenizer in (('small', small), ('large', large))}
+    store.close()
+
+    store = TokenStore(path)
+    for name, tokenizer in (('small', small), ('large', large)):
+        encoded = tokenizer.encoded
+        found = encode_texts(tokenizer, texts, store)
+        # Relu depuis le disque, sans repasser par le tokenizer
+        assert tokenizer.encoded == encoded
+        for encoding, reference in zip(found, expected[name]):
+            assert encoding.ids.tolist() == reference.ids.tolist()
+            assert encoding.offsets.tolist() == reference.offsets.tolist()
+        assert found[0].offsets.tolist() == [[0, 5], [6, 10], [11, 16]]
+    assert found[0].ids.dtype == np.uint32 and expected['small'][0].ids.dtype == np.uint16
+    store.close()
+
+
+def test_only_unknown_texts_are_tokenized(tmp_path):
+    tokenizer = WordTokenizer()
+    store = TokenStore(':memory:')
+    encode_texts(tokenizer, ['known text.'], store)
+    assert tokenizer.encoded == 1
+    encodings = encode_texts(tokenizer, ['known text.', 'new text.', 'new text.'], store)
+    assert tokenizer.encoded == 2
+    assert [len(encoding) for encoding in encodings] == [2, 2, 2]
+
+    # Un autre tokenizer a ses propres entrées
+    other = WordTokenizer()
+    other.name_or_path = 'other-words'
+    encode_texts(other, ['known text.'], store)
+    assert other.encoded == 1
+
+    text = ' '.join(sentence(n) for n in range(5))
+    assert chunk_text(text, tokenizer, 10, store) == chunk_text(text, tokenizer, 10)
+    encoded = tokenizer.encoded
+    chunk_text(text, tokenizer, 10, store)
+    assert tokenizer.encoded == encoded
@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select, update
+
+from aiwatcher.database.models import Article, ArticleAggregate, DailyDigest, DailyMention, Entity, Trend
+from aiwatcher.services.trend_service import TrendAggregator, aggregate_articles, day_of
+
+
+TYPES = ['PER', 'ORG', 'MISC', 'LOC']
+KEYWORDS = ['OpenAI', 'Mistral', 'Hinton', 'Paris', 'Llama']
+
+
+def add_processed_articles(engine, count, generator, today):
+    with engine.begin() as conn:
+        for n in range(1, count + 1):
+            conn.execute(insert(Article).values(
+                id=n, title=f't{n}', url=f'u{n}', source=generator.choice(['a', 'b']), content_hash=str(n),
+                category=generator.choice([None, 'research']), is_processed=True,
+                published_date=today - timedelta(days=generator.randrange(40), hours=generator.randrange(24)),
+            ))
+            write_entities(conn, n, generator)
+
+
+def write_entities(conn, article_id, generator):
+    conn.execute(delete(Entity).where(Entity.article_id == article_id))
+    for _ in range(generator.randrange(4)):
+        conn.execute(insert(Entity).values(
+            article_id=article_id, entity_text=generator.choice(KEYWORDS), entity_type=generator.choice(TYPES),
+            model_used='test',
+        ))
+
+
+def snapshot(engine):
+    with engine.connect() as conn:
+        return (
+            conn.execute(select(DailyMention.date, DailyMention.category, DailyMention.keyword, DailyMention.mentions, DailyMention.articles)
+                         .order_by(DailyMention.date, DailyMention.category, DailyMention.keyword)).all(),
+            conn.execute(select(ArticleAggregate.article_id, ArticleAggregate.date, ArticleAggregate.source, ArticleAggregate.category)
+                         .order_by(ArticleAggregate.article_id)).all(),
+            conn.execute(select(Trend.category, Trend.keyword, Trend.week_mentions, Trend.month_mentions, Trend.growth_rate)
+                         .where(Trend.month_mentions > 0).order_by(Trend.category, Trend.keyword)).all(),
+            conn.execute(select(DailyDigest.date, DailyDigest.total_articles, DailyDigest.articles_by_source, DailyDigest.articles_by_category,
+                                DailyDigest.top_researchers, DailyDigest.top_organizations, DailyDigest.top_models)
+                         .order_by(DailyDigest.date)).all(),
+        )
+
+
+def check_trending_topics(engine):
+    """Each digest lists every keyword of its day once (the order follows the growth at refresh time)."""
+    with engine.connect() as conn:
+        keywords = {}
+        for date, keyword in conn.execute(select(DailyMention.date, DailyMention.keyword)):
+            keywords.setdefault(date, set()).add(keyword)
+        for date, topics in conn.execute(select(DailyDigest.date, DailyDigest.trending_topics)):
+            assert len(topics) == len(set(topics)) and set(topics) == keywords.get(date, set())
+
+
+def test_incremental_trends_match_a_full_recompute(engine):
+    generator = random.Random(7)
+    today = day_of(datetime.now())
+    add_processed_articles(engine, 60, generator, today)
+    aggregator = TrendAggregator()
+    for start in range(1, 61, 7):
+        with engine.begin() as conn:
+            aggregator.refresh(conn, aggregator.add(conn, list(range(start, min(start + 7, 61)))))
+
+    # Retraitement : contribution retirée, nouvelles entités et dates, puis ajout
+    for _ in range(4):
+        ids = generator.sample(range(1, 61), 10)
+        with engine.begin() as conn:
+            changes = aggregator.remove(conn, ids)
+            for article_id in ids:
+                conn.execute(update(Article).where(Article.id == article_id).values(
+                    published_date=today - timedelta(days=generator.randrange(40)),
+                ))
+                write_entities(conn, article_id, generator)
+            aggregator.refresh(conn, aggregator.add(conn, ids, changes))
+
+    incremental = snapshot(engine)
+    check_trending_topics(engine)
+    with engine.connect() as conn:
+        assert conn.execute(select(DailyMention).where(DailyMention.mentions <= 0)).all() == []
+
+    with engine.begin() as conn:
+        for table in (DailyMention, ArticleAggregate, Trend, DailyDigest):
+            conn.execute(delete(table))
+    assert aggregate_articles(engine, chunk_size=9) == 60
+    assert snapshot(engine) == incremental
+    check_trending_topics(engine)
+    assert incremental[2] and incremental[3]